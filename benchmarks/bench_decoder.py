@@ -0,0 +1,105 @@
+"""
+Micro-benchmark del decodificador de respuestas de la API.
+
+Compara la implementación original (decode_response_reference) con la optimizada
+(decode_response), con y sin orjson, y el modo DecodePool con varios procesos.
+Verifica que todas las variantes devuelvan exactamente el mismo resultado.
+
+Uso:
+    python benchmarks/bench_decoder.py --academicos 2000 --repeat 20
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+import decoder
+from decoder import DecodePool, decode_response, decode_response_reference, encode_response
+
+
+def build_payload(n_academicos: int, seed: int = 42) -> dict:
+    """Genera una respuesta sintética de academicos con texto acentuado y algunos '%'"""
+    rng = random.Random(seed)
+    nombres = ['José', 'María', 'Ñuñoa', 'Andrés', 'Verónica', 'Müller', 'Pérez']
+    academicos = []
+    for i in range(n_academicos):
+        academicos.append({
+            'id_persona': 100000 + i,
+            'nombre_completo': f"{rng.choice(nombres)} {rng.choice(nombres)} {i}",
+            'jerarquia': rng.choice(['Profesor Titular', 'Profesor Asociado', 'Instructor']),
+            'jornada': rng.randint(11, 44),
+            'indice_h': round(rng.random() * 40, 2),
+            'descripcion': f"Investigación en {rng.choice(nombres)} con 100% de dedicación",
+        })
+    return {'total_resultado': n_academicos, 'academicos': academicos}
+
+
+def timeit(fn, payload: str, repeat: int) -> float:
+    """Mejor tiempo (segundos) de repeat ejecuciones"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del decodificador de respuestas")
+    parser.add_argument('--academicos', type=int, default=2000, help="Académicos en el payload sintético")
+    parser.add_argument('--repeat', type=int, default=20, help="Repeticiones por variante")
+    parser.add_argument('--pool-workers', type=int, default=4, help="Procesos del DecodePool")
+    parser.add_argument('--pool-payloads', type=int, default=64, help="Payloads decodificados en el modo pool")
+    args = parser.parse_args()
+
+    data = build_payload(args.academicos)
+    encoded = encode_response(data)
+    size_mb = len(encoded) / 1e6
+
+    expected = decode_response_reference(encoded)
+    assert expected == data, "El payload sintético no hace round-trip"
+
+    variantes = {'referencia': decode_response_reference}
+    orjson_backend = decoder.orjson
+
+    def rapido_json(text):
+        decoder.orjson = None
+        try:
+            return decode_response(text)
+        finally:
+            decoder.orjson = orjson_backend
+
+    variantes['rapido (json)'] = rapido_json
+    if orjson_backend is not None:
+        variantes['rapido (orjson)'] = decode_response
+
+    print(f"Payload: {args.academicos} académicos, {size_mb:.2f} MB codificados")
+    base = None
+    for nombre, fn in variantes.items():
+        assert fn(encoded) == expected, f"{nombre} no coincide con la referencia"
+        t = timeit(fn, encoded, args.repeat)
+        base = base or t
+        print(f"  {nombre:<18} {t * 1000:8.2f} ms  {size_mb / t:8.1f} MB/s  x{base / t:.2f}")
+
+    # Modo pool: varios hilos de red entregando payloads al pool de procesos
+    payloads = [encoded] * args.pool_payloads
+    for workers in (0, args.pool_workers):
+        pool = DecodePool(workers)
+        try:
+            pool.decode(encoded)  # calentar procesos
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(workers, 1) * 2) as threads:
+                resultados = list(threads.map(pool.decode, payloads))
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.close()
+        assert all(r == expected for r in resultados)
+        modo = f"pool {workers} procesos" if workers else "en línea"
+        print(f"  {modo:<18} {elapsed * 1000:8.2f} ms  {size_mb * len(payloads) / elapsed:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
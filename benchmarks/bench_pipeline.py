@@ -0,0 +1,179 @@
+"""
+Benchmark de extremo a extremo del pipeline contra la API simulada (benchmarks/mock_api.py).
+
+Levanta el servidor simulado en un hilo, genera un config.yaml temporal que apunta a él
+(PORTAFOLIO_CONFIG) y ejecuta PortafolioScraper completo dentro de un directorio de trabajo temporal.
+Reporta requests/s, bytes/s, errores y el tiempo de cada estado; las métricas detalladas quedan
+en output/ del directorio de trabajo (ver --workdir). Con --runs > 1 cada ejecución
+parte con --full-refresh; con --cache las siguientes se sirven desde la caché de respuestas.
+Con --workers N la etapa por académico la ejecutan N procesos main.py --queue en paralelo; luego
+el coordinador integra sus resultados y sigue hasta --until. Con --pipelined los estados se
+encadenan por flujos (main.py --pipelined) en lugar de ejecutarse uno tras otro.
+
+Uso:
+    python benchmarks/bench_pipeline.py --unidades 5 --academicos 40 --latency-ms 30 --max-workers 8
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import yaml
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+from mock_api import MockPortafolioAPI, add_mock_arguments, mock_options
+
+
+def build_config(args: argparse.Namespace, base_url: str) -> dict:
+    """Config del repositorio con la URL del servidor simulado y los parámetros del benchmark"""
+    with open(project_root / "src" / "config.yaml", 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config['api']['base_url'] = base_url
+    scraping = config['scraping']
+    scraping['max_workers'] = args.max_workers
+    scraping['pool_size'] = max(args.max_workers, scraping.get('pool_size', 10))
+    scraping['requests_per_second'] = args.rps
+    scraping['delay'] = args.retry_delay
+    config.setdefault('cache', {})['enabled'] = args.cache
+    config.setdefault('storage', {})['backend'] = args.storage
+    # Con el controlador adaptativo --max-workers y --rps son los techos de concurrencia y tasa
+    adaptive = config.setdefault('adaptive', {})
+    adaptive['enabled'] = args.adaptive
+    adaptive['max_concurrency'] = args.max_workers
+    adaptive['initial_concurrency'] = min(adaptive.get('initial_concurrency', args.max_workers), args.max_workers)
+    adaptive['max_rps'] = args.rps
+    config.setdefault('hedging', {})['enabled'] = args.hedge
+    config.setdefault('deadlines', {})['task_seconds'] = args.task_seconds
+    return config
+
+
+def close_scraper(scraper) -> None:
+    scraper.api_client.close()
+    scraper.journal.close()
+    scraper.write_metrics()
+
+
+def run_workers(count: int, verbose: bool) -> bool:
+    """Lanza count workers main.py --queue sobre el directorio actual y espera que terminen"""
+    output = None if verbose else subprocess.DEVNULL
+    processes = [
+        subprocess.Popen([sys.executable, str(project_root / "main.py"), '--queue', '--worker-id', f"bench-{index}"],
+                         stdout=output, stderr=output)
+        for index in range(count)
+    ]
+    return all([process.wait() == 0 for process in processes])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline completo contra la API simulada")
+    add_mock_arguments(parser)
+    parser.add_argument('--max-workers', type=int, default=4, help="scraping.max_workers")
+    parser.add_argument('--rps', type=float, default=1000.0, help="scraping.requests_per_second del cliente")
+    parser.add_argument('--retry-delay', type=float, default=0.05, help="scraping.delay entre reintentos")
+    parser.add_argument('--storage', choices=['files', 'segments'], default='segments', help="storage.backend")
+    parser.add_argument('--cache', action='store_true', help="Habilita la caché de respuestas")
+    parser.add_argument('--hedge', action='store_true', help="Habilita las requests duplicadas (hedging)")
+    parser.add_argument('--task-seconds', type=float, default=0, help="deadlines.task_seconds (0: sin plazo)")
+    parser.add_argument('--no-adaptive', dest='adaptive', action='store_false',
+                        help="Deshabilita el controlador adaptativo de concurrencia y tasa")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos worker (--queue) para la etapa por académico; 1: en el mismo proceso")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="Encadena los estados por flujos (main.py --pipelined); no se combina con --workers")
+    parser.add_argument('--runs', type=int, default=1, help="Ejecuciones consecutivas (cada una con full refresh)")
+    parser.add_argument('--until', default='POR_ACADEMICO', help="Último estado a ejecutar (BRONZE_LOADER requiere DB)")
+    parser.add_argument('--workdir', help="Directorio de trabajo (por defecto uno temporal que se elimina)")
+    parser.add_argument('--verbose', action='store_true', help="Muestra los logs del pipeline")
+    parser.add_argument('--profile', action='store_true', help="Perfila cada estado (reportes en output/profiles)")
+    args = parser.parse_args()
+    if args.pipelined and args.workers > 1:
+        parser.error("--pipelined no se combina con --workers")
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='portafolio_bench_')).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    with MockPortafolioAPI(yaml.safe_load(open(project_root / "src" / "config.yaml", encoding='utf-8'))['api']['endpoints'],
+                           mock_options(args)) as api:
+        config_file = workdir / "config.yaml"
+        with open(config_file, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(build_config(args, api.base_url), f, allow_unicode=True)
+        os.environ['PORTAFOLIO_CONFIG'] = str(config_file)
+        os.chdir(workdir)
+        import main as pipeline
+
+        print(f"Mock API: {args.unidades} unidades x {args.academicos} académicos, latencia {args.latency_ms} ms, "
+              f"errores {args.error_rate:.0%}, max_rps {args.max_rps or '-'}")
+        print(f"Cliente: max_workers {args.max_workers}, rps {args.rps}, storage {args.storage}, "
+              f"caché {'sí' if args.cache else 'no'}, "
+              f"adaptativo {'sí' if args.adaptive else 'no'}, "
+              f"hedging {'sí' if args.hedge else 'no'}, workers {args.workers}, "
+              f"encadenado {'sí' if args.pipelined else 'no'}")
+        for run in range(1, args.runs + 1):
+            scraper = pipeline.PortafolioScraper(full_refresh=True, profile=args.profile, pipelined=args.pipelined)
+            if not args.verbose:
+                logging.getLogger().setLevel(logging.WARNING)
+            server_before = dict(api.stats)
+            start = time.perf_counter()
+            worker_seconds = None
+            try:
+                if args.workers > 1:
+                    # Coordinador hasta PROFESORES, workers en paralelo y coordinador otra vez para integrar
+                    ok = scraper.run(until=pipeline.ScrapingState.PROFESORES)
+                    stage_timings = dict(scraper.stage_timings)
+                    close_scraper(scraper)
+                    if ok:
+                        worker_start = time.perf_counter()
+                        ok = run_workers(args.workers, args.verbose)
+                        worker_seconds = time.perf_counter() - worker_start
+                    scraper = pipeline.PortafolioScraper(profile=args.profile)
+                    if not args.verbose:
+                        logging.getLogger().setLevel(logging.WARNING)
+                    ok = scraper.run(until=pipeline.ScrapingState[args.until]) and ok
+                    scraper.stage_timings = {**stage_timings, **{
+                        state: seconds for state, seconds in scraper.stage_timings.items() if state not in stage_timings
+                    }}
+                else:
+                    ok = scraper.run(until=pipeline.ScrapingState[args.until])
+            finally:
+                stats = dict(scraper.api_client.stats)
+                cache = scraper.api_client.cache
+                cache_hits = cache.hits if cache is not None else 0
+                controller = scraper.api_client.controller
+                adaptive = controller.snapshot() if controller is not None else None
+                close_scraper(scraper)
+            elapsed = time.perf_counter() - start
+            throttled = api.stats['throttled'] - server_before['throttled']
+
+            print(f"\nEjecución {run}: {'OK' if ok else 'FALLÓ'} en {elapsed:.2f} s")
+            if worker_seconds is not None:
+                # El cliente de cada worker vive en otro proceso: se cuentan las respuestas del servidor
+                stats['requests'] = api.stats['requests'] - server_before['requests']
+                stats['bytes'] = api.stats['bytes'] - server_before['bytes']
+            print(f"  requests   {stats['requests']:8d}  {stats['requests'] / elapsed:10.1f} req/s")
+            print(f"  recibidos  {stats['bytes'] / 1e6:8.2f} MB {stats['bytes'] / 1e6 / elapsed:8.2f} MB/s")
+            print(f"  errores    {stats['errors']:8d}  (429: {throttled})")
+            if args.cache:
+                print(f"  caché      {cache_hits:8d}  aciertos")
+            if args.hedge:
+                print(f"  hedging    {stats['hedged']:8d}  duplicadas, {stats['hedge_wins']} ganadas")
+            if stats['deadline_exceeded']:
+                print(f"  plazos     {stats['deadline_exceeded']:8d}  consultas sin terminar")
+            if adaptive:
+                print(f"  adaptativo límite {adaptive['limit']}, {adaptive['rate']} req/s, "
+                      f"p95 {adaptive['p95_ms']} ms, {adaptive['decreases']} reducciones")
+            if worker_seconds is not None:
+                print(f"  {'WORKERS':<14} {worker_seconds:8.2f} s  ({args.workers} procesos --queue)")
+            for state, seconds in scraper.stage_timings.items():
+                print(f"  {state:<14} {seconds:8.2f} s")
+
+    if not args.workdir:
+        os.chdir(project_root)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
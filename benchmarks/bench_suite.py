@@ -0,0 +1,392 @@
+"""
+Suite de benchmarks de las rutas críticas con datos sintéticos, comparada contra una línea base.
+
+Genera con los mismos generadores de benchmarks/mock_api.py (sin requests HTTP) un roster de
+--unidades x --academicos académicos y las publicaciones de cada uno, y mide, con el mejor tiempo
+de --repeat ejecuciones:
+
+    decode_roster          APIClient._decode_response sobre el roster completo codificado
+    decode_publicaciones   APIClient._decode_response sobre la respuesta de publicaciones de cada académico
+    raw_write              RawStore.write de cada respuesta de publicaciones y RawStore.save
+    roster_rebuild         RosterIndex.rebuild desde las unidades y académicos guardados (SQLite)
+    roster_iter            RosterIndex.iter_academicos, el recorrido de los run_workflow
+    bronze_read_canonical  RawStore.read_canonical: lectura y verificación del hash de cada archivo (granularity file)
+    bronze_explode_records explode_records: JSON canónico y hash de cada registro (granularity record)
+    bronze_copy            BulkWriter con COPY a bronze.publications_raw; solo con --db (DB_* del entorno)
+
+bronze_copy envía los lotes sin commit y hace rollback al terminar cada ejecución: la base de datos
+no se modifica, pero la tabla bronze.publications_raw debe existir.
+
+Los resultados se guardan en JSON (--output). Si existe la línea base (--baseline) se compara cada caso
+y el proceso termina con código 1 si alguno es más lento que la base en más de --threshold (y en más de
+--min-delta-ms, para no reportar ruido en casos muy cortos). --save-baseline guarda los resultados
+como nueva línea base. Solo se comparan resultados con los mismos parámetros de datos.
+
+Uso:
+    python benchmarks/bench_suite.py --unidades 5 --academicos 200 --save-baseline
+    python benchmarks/bench_suite.py --unidades 5 --academicos 200          # compara contra la base
+    python benchmarks/bench_suite.py --unidades 50 --academicos 2000 --entidades 5000 --cases decode_roster roster_iter
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import yaml
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_api import MockOptions, MockPortafolioAPI
+from decoder import encode_response
+
+CASES = (
+    'decode_roster',
+    'decode_publicaciones',
+    'raw_write',
+    'roster_rebuild',
+    'roster_iter',
+    'bronze_read_canonical',
+    'bronze_explode_records',
+    'bronze_copy',
+)
+DEFAULT_RESULTS = Path(__file__).parent / "results"
+# Parámetros que deben coincidir con los de la línea base para comparar
+DATA_PARAMS = ('unidades', 'academicos', 'publicaciones', 'texto', 'duplicados', 'entidades', 'storage', 'seed')
+
+
+def build_config(args: argparse.Namespace) -> dict:
+    """Config del repositorio con el backend de almacenamiento del benchmark y sin caché de respuestas"""
+    with open(project_root / "src" / "config.yaml", 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config.setdefault('storage', {})['backend'] = args.storage
+    config.setdefault('cache', {})['enabled'] = False
+    config['scraping']['decode_workers'] = 0
+    return config
+
+
+def measure(run: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None,
+            teardown: Optional[Callable[[], None]] = None) -> float:
+    """Mejor tiempo (segundos) de repeat ejecuciones; setup y teardown no se miden"""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+        if teardown is not None:
+            teardown()
+    return best
+
+
+class BenchSuite:
+    """Datos sintéticos y casos de la suite; se ejecuta dentro del directorio de trabajo (rutas de config.yaml)"""
+
+    def __init__(self, args: argparse.Namespace):
+        # Los módulos del proyecto se importan después de apuntar PORTAFOLIO_CONFIG al config del benchmark
+        from api_client import APIClient
+        from raw_store import RawStore
+        self.args = args
+        self.logger = logging.getLogger('bench_suite')
+        self.api_client = APIClient()
+        self.raw_store = RawStore()
+        self._generate()
+        self._stored = False
+
+    def _generate(self) -> None:
+        """Roster y publicaciones sintéticas, y sus respuestas codificadas como las entrega la API"""
+        args = self.args
+        options = MockOptions(unidades=args.unidades, academicos=args.academicos, publicaciones=args.publicaciones,
+                              texto=args.texto, duplicados=args.duplicados, seed=args.seed)
+        with open(project_root / "src" / "config.yaml", 'r', encoding='utf-8') as f:
+            endpoints = yaml.safe_load(f)['api']['endpoints']
+        with MockPortafolioAPI(endpoints, options) as api:
+            self.unidades = api.respond('unidades', {})
+            self.rosters = {
+                unidad['id']: api.respond('academicos', {'reparticion': unidad['id'], 'limite': args.academicos})
+                for unidad in self.unidades
+            }
+            academicos = list({
+                profesor['id_persona']: profesor
+                for roster in self.rosters.values() if roster for profesor in roster['academicos']
+            }.values())
+            ids = [profesor['id_persona'] for profesor in academicos]
+            if args.entidades:
+                ids = ids[:args.entidades]
+            # Los académicos sin publicaciones responden 204 y los scrapers no guardan nada
+            self.publicaciones = {}
+            for id_persona in ids:
+                data = api.respond('publicaciones', {'id_persona': id_persona, 'limite': 10 ** 9})
+                if data is not None:
+                    self.publicaciones[id_persona] = data
+
+        self.academicos = len(academicos)
+        self.roster_encoded = encode_response({'total_resultado': len(academicos), 'academicos': academicos})
+        self.publicaciones_encoded = [encode_response(data) for data in self.publicaciones.values()]
+        self.registros = sum(len(data['academicos'][0]['publicaciones']) for data in self.publicaciones.values())
+        self.raw_bytes = sum(len(self.raw_store.canonical_bytes(data)) for data in self.publicaciones.values())
+
+    def _write_publicaciones(self) -> None:
+        for id_persona, data in self.publicaciones.items():
+            self.raw_store.write('publicaciones', id_persona, data)
+        self.raw_store.save()
+
+    def _ensure_stored(self) -> None:
+        """Guarda (sin medir) las unidades, los rosters y las publicaciones que leen los demás casos"""
+        if self._stored:
+            return
+        from raw_store import RawStore
+        self.raw_store.write('unidades', RawStore.UNIDADES_ID, self.unidades)
+        for unidad_id, roster in self.rosters.items():
+            if roster is not None:
+                self.raw_store.write('academicos', unidad_id, roster)
+        self._write_publicaciones()
+        self._stored = True
+
+    # --- Casos: cada uno retorna (segundos, elementos, bytes) ------------------
+
+    def decode_roster(self) -> Tuple[float, int, int]:
+        seconds = measure(lambda: self.api_client._decode_response(self.roster_encoded), self.args.repeat)
+        return seconds, self.academicos, len(self.roster_encoded)
+
+    def decode_publicaciones(self) -> Tuple[float, int, int]:
+        def run():
+            for encoded in self.publicaciones_encoded:
+                self.api_client._decode_response(encoded)
+        seconds = measure(run, self.args.repeat)
+        return seconds, len(self.publicaciones_encoded), sum(len(encoded) for encoded in self.publicaciones_encoded)
+
+    def raw_write(self) -> Tuple[float, int, int]:
+        def setup():
+            self.raw_store.clear()
+            self._stored = False
+        seconds = measure(self._write_publicaciones, self.args.repeat, setup=setup)
+        return seconds, len(self.publicaciones), self.raw_bytes
+
+    def roster_rebuild(self) -> Tuple[float, int, int]:
+        from roster import RosterIndex
+        self._ensure_stored()
+        indexes: List[Any] = []
+
+        def setup():
+            # Un índice nuevo por ejecución: la primera construcción, no una actualización
+            db_file = Path(f"bench_roster_{len(indexes)}.sqlite")
+            db_file.unlink(missing_ok=True)
+            indexes.append(RosterIndex(db_file))
+
+        def teardown():
+            indexes[-1].close()
+
+        seconds = measure(lambda: indexes[-1].rebuild(self.raw_store, self.logger), self.args.repeat,
+                          setup=setup, teardown=teardown)
+        return seconds, self.academicos, 0
+
+    def roster_iter(self) -> Tuple[float, int, int]:
+        from roster import RosterIndex
+        self._ensure_stored()
+        index = RosterIndex(Path("bench_roster_iter.sqlite"))
+        try:
+            index.rebuild(self.raw_store, self.logger)
+            seconds = measure(lambda: sum(1 for _ in index.iter_academicos()), self.args.repeat)
+        finally:
+            index.close()
+        return seconds, self.academicos, 0
+
+    def bronze_read_canonical(self) -> Tuple[float, int, int]:
+        self._ensure_stored()
+
+        def run():
+            for id_persona in self.publicaciones:
+                self.raw_store.read_canonical('publicaciones', id_persona)
+        seconds = measure(run, self.args.repeat)
+        return seconds, len(self.publicaciones), self.raw_bytes
+
+    def bronze_explode_records(self) -> Tuple[float, int, int]:
+        from bronze_loader import explode_records
+        self._ensure_stored()
+        raws = [(id_persona, self.raw_store.read_bytes('publicaciones', id_persona)) for id_persona in self.publicaciones]
+
+        def run():
+            for id_persona, raw in raws:
+                explode_records('publicaciones', id_persona, raw)
+        seconds = measure(run, self.args.repeat)
+        return seconds, self.registros, self.raw_bytes
+
+    def bronze_copy(self) -> Optional[Tuple[float, int, int]]:
+        if not self.args.db:
+            return None
+        import psycopg2
+        from bronze_loader import SOURCE_SYSTEM, BulkWriter
+        self._ensure_stored()
+        rows = []
+        for id_persona in self.publicaciones:
+            raw_json, record_hash, total = self.raw_store.read_canonical('publicaciones', id_persona)
+            raw_file = self.raw_store.path_for('publicaciones', id_persona)
+            rows.append((id_persona, SOURCE_SYSTEM, total or 0, raw_json, str(raw_file), record_hash))
+        columns = ('academic_id', 'source_system', 'total_publications', 'raw_json', 'file_name', 'record_hash')
+        settings = self.raw_store.config.bronze_loader
+        conn = psycopg2.connect(host=os.getenv('DB_HOST'), dbname=os.getenv('DB_NAME'),
+                                user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'))
+
+        def run():
+            # Sin commit: cada ejecución termina con rollback y la tabla queda como estaba
+            writer = BulkWriter(conn, 'publications_raw', columns, method=settings.get('method', 'copy'),
+                                batch_size=settings.get('batch_size', 500), commit_interval=len(rows) + 1)
+            for row in rows:
+                writer.add(row)
+            writer.flush()
+
+        try:
+            seconds = measure(run, self.args.repeat, teardown=conn.rollback)
+        finally:
+            conn.rollback()
+            conn.close()
+        return seconds, len(rows), self.raw_bytes
+
+    def run(self, cases: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Ejecuta los casos pedidos, en el orden de CASES"""
+        results = {}
+        for case in CASES:
+            if case not in cases:
+                continue
+            measured = getattr(self, case)()
+            if measured is None:
+                print(f"  {case:<24} omitido (requiere --db)")
+                continue
+            seconds, items, n_bytes = measured
+            results[case] = {
+                'seconds': seconds,
+                'items': items,
+                'bytes': n_bytes,
+                'items_per_second': items / seconds if seconds else None,
+            }
+            rate = f"{n_bytes / 1e6 / seconds:8.1f} MB/s" if n_bytes and seconds else ""
+            print(f"  {case:<24} {seconds * 1000:10.2f} ms  {items / seconds if seconds else 0:12.0f} elem/s  {rate}")
+        return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta: float,
+            thresholds: Dict[str, float]) -> List[str]:
+    """
+    Compara los resultados con la línea base e imprime la tabla
+
+    Returns:
+        Casos más lentos que la base más allá de su umbral
+    """
+    regressions = []
+    print(f"\n  {'caso':<24} {'base ms':>10} {'actual ms':>10} {'cambio':>8}")
+    for case, result in results['results'].items():
+        base = baseline['results'].get(case)
+        if base is None:
+            print(f"  {case:<24} {'-':>10} {result['seconds'] * 1000:10.2f}   (sin base)")
+            continue
+        change = result['seconds'] / base['seconds'] - 1 if base['seconds'] else 0.0
+        limit = thresholds.get(case, threshold)
+        regressed = change > limit and result['seconds'] - base['seconds'] > min_delta
+        if regressed:
+            regressions.append(case)
+        print(f"  {case:<24} {base['seconds'] * 1000:10.2f} {result['seconds'] * 1000:10.2f} {change:+8.1%}"
+              f"{'  REGRESIÓN (umbral ' + format(limit, '.0%') + ')' if regressed else ''}")
+    return regressions
+
+
+def parse_thresholds(values: List[str], parser: argparse.ArgumentParser) -> Dict[str, float]:
+    """Umbrales por caso de --threshold-for CASO=FRACCIÓN"""
+    thresholds = {}
+    for value in values:
+        case, _, fraction = value.partition('=')
+        if case not in CASES or not fraction:
+            parser.error(f"--threshold-for espera CASO=FRACCIÓN con un caso de {', '.join(CASES)}: {value}")
+        thresholds[case] = float(fraction)
+    return thresholds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de las rutas críticas con datos sintéticos")
+    defaults = MockOptions()
+    parser.add_argument('--unidades', type=int, default=defaults.unidades, help="Unidades académicas")
+    parser.add_argument('--academicos', type=int, default=200, help="Académicos por unidad")
+    parser.add_argument('--publicaciones', type=int, default=defaults.publicaciones, help="Publicaciones promedio por académico")
+    parser.add_argument('--texto', type=int, default=defaults.texto, help="Caracteres de texto libre por registro")
+    parser.add_argument('--duplicados', type=float, default=defaults.duplicados,
+                        help="Fracción de académicos repetidos en la unidad anterior")
+    parser.add_argument('--entidades', type=int, default=0,
+                        help="Académicos con publicaciones generadas (0: todos); acota los casos por entidad")
+    parser.add_argument('--seed', type=int, default=defaults.seed, help="Semilla de los datos sintéticos")
+    parser.add_argument('--storage', choices=['files', 'segments'], default='segments', help="storage.backend")
+    parser.add_argument('--repeat', type=int, default=5, help="Ejecuciones por caso (se reporta la mejor)")
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES), help="Casos a ejecutar")
+    parser.add_argument('--db', action='store_true',
+                        help="Ejecuta bronze_copy contra la base de datos de DB_HOST, DB_NAME, DB_USER y DB_PASSWORD")
+    parser.add_argument('--output', type=Path, default=DEFAULT_RESULTS / "latest.json", help="Resultados en JSON")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_RESULTS / "baseline.json", help="Línea base")
+    parser.add_argument('--save-baseline', action='store_true', help="Guarda los resultados como línea base")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Fracción de tiempo adicional sobre la base que cuenta como regresión")
+    parser.add_argument('--threshold-for', action='append', default=[], metavar='CASO=FRACCIÓN',
+                        help="Umbral de un caso (se puede repetir)")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help="Diferencia mínima con la base para reportar una regresión")
+    parser.add_argument('--workdir', help="Directorio de trabajo (por defecto uno temporal que se elimina)")
+    args = parser.parse_args()
+    thresholds = parse_thresholds(args.threshold_for, parser)
+    output = args.output.resolve()
+    baseline_file = args.baseline.resolve()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='portafolio_suite_')).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    config_file = workdir / "config.yaml"
+    with open(config_file, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(build_config(args), f, allow_unicode=True)
+    os.environ['PORTAFOLIO_CONFIG'] = str(config_file)
+    os.chdir(workdir)
+    try:
+        suite = BenchSuite(args)
+        print(f"Datos: {args.unidades} unidades x {args.academicos} académicos ({suite.academicos} distintos), "
+              f"{len(suite.publicaciones)} con {suite.registros} publicaciones, {suite.raw_bytes / 1e6:.2f} MB canónicos, "
+              f"storage {args.storage}, mejor de {args.repeat}")
+        results = {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {name: getattr(args, name) for name in DATA_PARAMS},
+            'results': suite.run(args.cases),
+        }
+        suite.api_client.close()
+    finally:
+        os.chdir(project_root)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados en {output}")
+
+    regressions = []
+    if baseline_file.exists() and not args.save_baseline:
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != results['params']:
+            print(f"La línea base {baseline_file} usa otros parámetros de datos ({baseline.get('params')}): no se compara")
+        else:
+            print(f"Comparación con {baseline_file} ({baseline.get('created_at')})")
+            regressions = compare(results, baseline, args.threshold, args.min_delta_ms / 1000, thresholds)
+    if args.save_baseline:
+        baseline_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(output, baseline_file)
+        print(f"Línea base guardada en {baseline_file}")
+    if regressions:
+        print(f"\nRegresiones: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Servidor local que imita la API del Portafolio Académico.
+
+Responde los mismos endpoints de config.yaml (unidades, academicos, publicaciones, proyectos, tesis)
+con datos sintéticos deterministas, paginados con limite/pagina y codificados en el mismo formato
+que entrega la API real (base64 invertido sobre JSON con %-encoding), de modo que APIClient los
+decodifique sin cambios. Permite simular latencia, errores 5xx y límites de tasa (429 con Retry-After).
+
+Uso:
+    python benchmarks/mock_api.py --port 8000 --unidades 5 --academicos 40 --latency-ms 50
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+from decoder import encode_response
+from rate_limiter import TokenBucket
+
+NOMBRES = ['José', 'María', 'Ñuñoa', 'Andrés', 'Verónica', 'Müller', 'Pérez', 'Camila', 'Ignacio']
+
+
+@dataclass
+class MockOptions:
+    """Tamaño de los datos sintéticos y comportamiento del servidor"""
+    unidades: int = 5
+    academicos: int = 40  # académicos por unidad
+    publicaciones: int = 30  # promedio por académico
+    proyectos: int = 8
+    tesis: int = 5
+    texto: int = 200  # caracteres de texto libre por registro
+    duplicados: float = 0.0  # fracción de académicos de cada unidad que también están en la anterior
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    slow_rate: float = 0.0  # fracción de requests que tardan slow_ms adicionales (latencia de cola)
+    slow_ms: float = 0.0
+    error_rate: float = 0.0  # fracción de requests que responden 500
+    max_rps: float = 0.0  # requests por segundo antes de responder 429 (0: sin límite)
+    retry_after: int = 1  # segundos informados en Retry-After
+    seed: int = 42
+
+
+class _NamedThreadingHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer cuyos hilos por conexión se llaman mock-api-* (el profiler los ignora)"""
+
+    def process_request(self, request, client_address):
+        thread = threading.Thread(target=self.process_request_thread, args=(request, client_address),
+                                  name=f"mock-api-{client_address[1]}", daemon=self.daemon_threads)
+        thread.start()
+
+
+class MockPortafolioAPI:
+    """Servidor HTTP con hilos que sirve los datos sintéticos; se puede usar como context manager"""
+
+    def __init__(self, endpoints: Dict[str, str], options: Optional[MockOptions] = None,
+                 host: str = '127.0.0.1', port: int = 0, base_path: str = '/api'):
+        self.options = options or MockOptions()
+        self.routes = {f"{base_path}{path}": name for name, path in endpoints.items()}
+        self.base_path = base_path
+        self.stats = {'requests': 0, 'bytes': 0, 'errors': 0, 'throttled': 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.options.seed)
+        self._limiter = TokenBucket(self.options.max_rps, max(1.0, self.options.max_rps)) if self.options.max_rps else None
+        self._server = _NamedThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.base_path}"
+
+    def start(self) -> 'MockPortafolioAPI':
+        """Inicia el servidor en un hilo de fondo"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Detiene el servidor"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockPortafolioAPI':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- Datos sintéticos -------------------------------------------------
+
+    def _text(self, rng: random.Random) -> str:
+        """Texto libre acentuado, con algún '%' para ejercitar el %-encoding"""
+        words = []
+        while sum(len(w) + 1 for w in words) < self.options.texto:
+            words.append(rng.choice(NOMBRES + ['investigación', 'análisis', '100%', 'años']))
+        return ' '.join(words)
+
+    def _count(self, rng: random.Random, mean: int) -> int:
+        """Cantidad de registros de un académico, alrededor del promedio"""
+        return max(0, int(rng.gauss(mean, mean / 3))) if mean else 0
+
+    def unidades(self) -> List[Dict[str, Any]]:
+        return [{'id': 1000 + u, 'nombre': f"Facultad Sintética {u}"} for u in range(self.options.unidades)]
+
+    def academicos(self, reparticion: int) -> List[Dict[str, Any]]:
+        unidad = reparticion - 1000
+        if not 0 <= unidad < self.options.unidades:
+            return []
+        rng = random.Random(self.options.seed * 7919 + reparticion)
+        n = self.options.academicos
+        # Los primeros 'shared' académicos son los últimos de la unidad anterior
+        shared = min(n // 2, int(n * self.options.duplicados)) if unidad > 0 else 0
+        return [{
+            'id_persona': 100000 + ((unidad - 1) * 10000 + n - shared + i if i < shared else unidad * 10000 + i),
+            'nombre_completo': f"{rng.choice(NOMBRES)} {rng.choice(NOMBRES)} {i}",
+            'jerarquia': rng.choice(['Profesor Titular', 'Profesor Asociado', 'Instructor']),
+            'jornada': rng.randint(11, 44),
+        } for i in range(self.options.academicos)]
+
+    def registros(self, endpoint: str, id_persona: int) -> List[Dict[str, Any]]:
+        rng = random.Random(f"{self.options.seed}:{endpoint}:{id_persona}")
+        n = self._count(rng, getattr(self.options, endpoint))
+        if endpoint == 'publicaciones':
+            return [{'id_publicacion': id_persona * 1000 + i, 'titulo': self._text(rng), 'anio': rng.randint(1990, 2025),
+                     'tipo': rng.choice(['Artículo', 'Libro', 'Capítulo']), 'autores': self._text(rng)[:80]}
+                    for i in range(n)]
+        if endpoint == 'proyectos':
+            return [{'id_proyecto': id_persona * 1000 + i, 'titulo': self._text(rng), 'anio_inicio': rng.randint(2015, 2025),
+                     'fuente': rng.choice(['ANID', 'FONDECYT', 'CORFO']), 'rol': rng.choice(['Responsable', 'Coinvestigador'])}
+                    for i in range(n)]
+        return [{'titulo': self._text(rng), 'autores': self._text(rng)[:60], 'anio': rng.randint(2000, 2025),
+                 'facultad': f"Facultad Sintética {id_persona // 10000 % 100}", 'profesor_guia': str(id_persona),
+                 'comision': '', 'url': f"https://example.invalid/tesis/{id_persona}/{i}", 'fuente': 'mock'}
+                for i in range(n)]
+
+    def respond(self, endpoint: str, params: Dict[str, str]) -> Optional[Any]:
+        """Respuesta paginada de un endpoint con la misma forma que la API real; None para 204"""
+        if endpoint == 'unidades':
+            return self.unidades()
+
+        limit = int(params.get('limite', 200))
+        page = int(params.get('pagina', 1))
+        if endpoint == 'academicos':
+            records = self.academicos(int(params.get('reparticion', 0)))
+        else:
+            records = self.registros(endpoint, int(params.get('id_persona', 0)))
+        if not records:
+            return None
+        chunk = records[(page - 1) * limit:page * limit]
+        total = len(records)
+        if endpoint == 'academicos':
+            return {'total_resultado': total, 'academicos': chunk}
+        if endpoint == 'proyectos':
+            return {'total_resultado': total, 'academicos': {'proyectos': chunk}}
+        return {'total_resultado': total, 'academicos': [{'id_persona': int(params['id_persona']), endpoint: chunk}]}
+
+    # --- HTTP -------------------------------------------------------------
+
+    def _fault(self) -> Tuple[Optional[int], Dict[str, str]]:
+        """Decide si la request se limita (429) o falla (500) según las opciones"""
+        if self._limiter is not None and not self._limiter.try_acquire():
+            return 429, {'Retry-After': str(self.options.retry_after)}
+        with self._lock:
+            failed = self._rng.random() < self.options.error_rate
+        return (500, {}) if failed else (None, {})
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = api.routes.get(url.path)
+                options = api.options
+                delay_ms = options.latency_ms + random.uniform(-1, 1) * options.jitter_ms
+                if options.slow_rate and random.random() < options.slow_rate:
+                    delay_ms += options.slow_ms
+                if delay_ms > 0:
+                    time.sleep(delay_ms / 1000)
+                if endpoint is None:
+                    return self._send(404, b'')
+                status, headers = api._fault()
+                if status is not None:
+                    with api._lock:
+                        api.stats['throttled' if status == 429 else 'errors'] += 1
+                    return self._send(status, b'', headers)
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                data = api.respond(endpoint, params)
+                if data is None:
+                    return self._send(204, b'')
+                self._send(200, encode_response(data).encode('ascii'))
+
+            def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    if body:
+                        self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente abandonó la request (timeout, plazo agotado o hedging)
+                    self.close_connection = True
+                    return
+                with api._lock:
+                    api.stats['requests'] += 1
+                    api.stats['bytes'] += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Agrega al parser las opciones de MockOptions"""
+    defaults = MockOptions()
+    parser.add_argument('--unidades', type=int, default=defaults.unidades, help="Unidades académicas")
+    parser.add_argument('--academicos', type=int, default=defaults.academicos, help="Académicos por unidad")
+    parser.add_argument('--publicaciones', type=int, default=defaults.publicaciones, help="Publicaciones promedio por académico")
+    parser.add_argument('--proyectos', type=int, default=defaults.proyectos, help="Proyectos promedio por académico")
+    parser.add_argument('--tesis', type=int, default=defaults.tesis, help="Tesis promedio por académico")
+    parser.add_argument('--texto', type=int, default=defaults.texto, help="Caracteres de texto libre por registro")
+    parser.add_argument('--duplicados', type=float, default=defaults.duplicados,
+                        help="Fracción de académicos repetidos en la unidad anterior")
+    parser.add_argument('--latency-ms', type=float, default=defaults.latency_ms, help="Latencia de cada respuesta")
+    parser.add_argument('--jitter-ms', type=float, default=defaults.jitter_ms, help="Variación aleatoria de la latencia")
+    parser.add_argument('--slow-rate', type=float, default=defaults.slow_rate, help="Fracción de respuestas lentas")
+    parser.add_argument('--slow-ms', type=float, default=defaults.slow_ms, help="Latencia adicional de las respuestas lentas")
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help="Fracción de respuestas 500")
+    parser.add_argument('--max-rps', type=float, default=defaults.max_rps, help="Requests/s antes de responder 429 (0: sin límite)")
+    parser.add_argument('--retry-after', type=int, default=defaults.retry_after, help="Segundos informados en Retry-After")
+    parser.add_argument('--seed', type=int, default=defaults.seed, help="Semilla de los datos sintéticos")
+
+
+def mock_options(args: argparse.Namespace) -> MockOptions:
+    """Construye MockOptions a partir de los argumentos de add_mock_arguments"""
+    return MockOptions(**{name: getattr(args, name) for name in MockOptions.__dataclass_fields__})
+
+
+def main() -> None:
+    import yaml
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API del Portafolio Académico")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    with open(project_root / "src" / "config.yaml", 'r', encoding='utf-8') as f:
+        endpoints = yaml.safe_load(f)['api']['endpoints']
+    api = MockPortafolioAPI(endpoints, mock_options(args), host=args.host, port=args.port)
+    print(f"Mock API en {api.base_url} (Ctrl+C para detener)")
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,121 @@
 from enum import Enum, auto
+from contextlib import nullcontext
+import argparse
 import logging
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import sys
 # Agregar el directorio raíz del proyecto al path de Python
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
 
 # Ahora importar los módulos locales
 from src.config import Config
+from src.api_client import APIClient
 from src.get_profesors import ScraperAcademicos
-from src.get_publicaciones import PublicacionesScraper
-from src.get_projects import ProyectosScraper
+from src.get_por_academico import PorAcademicoScraper
+from src.get_tesis import TesisScraper
+from src.processed_layer import ProcessedLayerBuilder
 from src.get_unidades import UnidadesScraper
 from src.bronze_loader import BronzeLoader
+from src.run_journal import RunJournal
+# Los módulos de src se importan entre sí sin prefijo: así main usa la misma instancia del registro de métricas
+from metrics import REGISTRY, STAGE_SECONDS
+from profiler import StageProfiler
+from pipeline import StageGraph, Stream
+from raw_store import RawStore
+from work_queue import WorkQueue, default_worker_id
 
 class ScrapingState(Enum):
     """Estados del proceso de scraping"""
     INIT = auto()
     UNIDADES = auto()
     PROFESORES = auto()
-    PUBLICACIONES = auto()
-    PROYECTOS = auto()
+    POR_ACADEMICO = auto()
+    TESIS = auto()
+    PROCESADOS = auto()
     BRONZE_LOADER = auto()
 
 
 class PortafolioScraper:
-    def __init__(self):
+    def __init__(self, full_refresh: bool = False, resume: bool = False, replay: bool = False,
+                 profile: bool = False, shard: Optional[Tuple[int, int]] = None, queue: bool = False,
+                 worker_id: Optional[str] = None, pipelined: bool = False):
         self.config = Config()
+        # Sin full_refresh el crawl es incremental: se conserva raw_data y el manifiesto
+        self.full_refresh = full_refresh
+        # Con resume se omiten los estados y tareas que el journal registra como completados
+        self.resume = resume
+        # Con replay todas las respuestas se sirven desde la caché, sin acceder a la red
+        self.replay = replay
+        # Con pipelined los estados se encadenan por flujos en lugar de ejecutarse uno tras otro
+        self.pipelined = pipelined
         # Configurar logging primero
         self._setup_logging()
         # Crear logger específico para esta clase
         self.logger = logging.getLogger(self.__class__.__name__)
-        # Crear directorios necesarios
-        self._init_process()
+        # Duración (segundos) de cada estado ejecutado en run()
+        self.stage_timings: Dict[str, float] = {}
+        # Con shard o queue el proceso es un worker: solo ejecuta POR_ACADEMICO sobre su parte de los
+        # académicos y escribe en su propio directorio, que el coordinador integra después
+        self.worker_id: Optional[str] = None
+        journal_file = Path(self.config.journal.get('file', 'raw_data/run_journal.jsonl'))
+        if shard is not None or queue:
+            self.worker_id = worker_id or (f"shard-{shard[0]}-of-{shard[1]}" if shard else default_worker_id())
+            journal_file = RawStore.use_worker(self.worker_id) / journal_file.name
+            self.logger.info(f"Proceso worker {self.worker_id}")
+        # Con profile cada estado se perfila (CPU por muestreo y memoria con tracemalloc)
+        self.profiler = self._build_profiler() if profile else None
+        self.journal = RunJournal(
+            journal_file,
+            resume=resume,
+            fsync=self.config.journal.get('fsync', False)
+        )
+        # Con metrics.port > 0 las métricas se sirven en /metrics mientras corre el proceso
+        metrics_port = self.config.metrics.get('port', 0)
+        self.metrics_server = REGISTRY.serve(metrics_port) if metrics_port else None
+        if self.metrics_server is not None:
+            self.logger.info(f"Métricas en http://127.0.0.1:{metrics_port}/metrics")
+        # Cliente HTTP compartido: un único pool de conexiones keep-alive para todos los scrapers
+        self.api_client = APIClient(replay=replay)
         # Inicializar scrapers
-        self.unidades_scraper = UnidadesScraper()
-        self.academicos_scraper = ScraperAcademicos()
-        self.publicaciones_scraper = PublicacionesScraper()
-        self.project_scraper = ProyectosScraper()
+        self.unidades_scraper = UnidadesScraper(api_client=self.api_client)
+        self.academicos_scraper = ScraperAcademicos(
+            api_client=self.api_client, journal=self.journal.scope(ScrapingState.PROFESORES.name)
+        )
+        self.por_academico_scraper = PorAcademicoScraper(
+            api_client=self.api_client, journal=self.journal.scope(ScrapingState.POR_ACADEMICO.name),
+            shard=shard, queue=WorkQueue.default() if queue else None, worker_id=self.worker_id
+        )
+        self.tesis_scraper = TesisScraper(api_client=self.api_client)
+
+    def _build_profiler(self) -> StageProfiler:
+        """Crea el profiler por estado según la sección profiling de config.yaml"""
+        profiling = self.config.profiling
+        output_dir = Path(profiling.get('output_dir', 'output/profiles'))
+        return StageProfiler(
+            output_dir / self.worker_id if self.worker_id else output_dir,
+            top_n=profiling.get('top_n', 15),
+            interval=profiling.get('interval_ms', 10) / 1000,
+            trace_memory=profiling.get('trace_memory', True),
+            memory_frames=profiling.get('memory_frames', 1),
+        )
 
     def _init_process(self):
-        """Limpia las carpetas de salida y crea las necesarias"""
+        """Prepara las carpetas de salida; con full_refresh las limpia por completo"""
         import shutil
         
-        self.logger.info("Iniciando limpieza de directorios")
         total_paths = len(self.config.paths)
+        if not self.full_refresh:
+            for path in self.config.paths.values():
+                Path(path).mkdir(parents=True, exist_ok=True)
+            self.logger.info(f"Modo incremental: se conservan {total_paths} directorios y el manifiesto del crawl")
+            return True
+
+        self.logger.info("Iniciando limpieza de directorios")
+        # El manifiesto y los segmentos son compartidos por todos los scrapers del proceso
+        self.unidades_scraper.raw_store.clear()
         
         # Limpiar y crear directorios necesarios
         for idx, (path_name, path) in enumerate(self.config.paths.items(), 1):
@@ -83,59 +154,215 @@ class PortafolioScraper:
         self.logger.info("Obteniendo profesores para cada repartición")
         return self.academicos_scraper.run_workflow()
 
-    def _scrape_publicaciones(self) -> bool:
-        """Obtiene las publicaciones"""
-        self.logger.info("******* Obteniendo publicaciones *******")
-        return self.publicaciones_scraper.run_workflow()
-    
-    def _scrape_proyectos(self) -> bool:
-        """Obtiene los proyectos"""
-        self.logger.info("******* Obteniendo proyectos *******")
-        return self.project_scraper.run_workflow()
+    def _scrape_por_academico(self) -> bool:
+        """Obtiene publicaciones, proyectos y tesis en una sola pasada por académico"""
+        self.logger.info("******* Obteniendo publicaciones, proyectos y tesis *******")
+        self._merge_workers()
+        return self.por_academico_scraper.run_workflow()
     
+    def _scrape_tesis(self) -> bool:
+        """Completa las tesis pendientes y construye todas_las_tesis.csv"""
+        self.logger.info("******* Consolidando tesis *******")
+        self._merge_workers()
+        return self.tesis_scraper.run_workflow()
+
+    def _build_procesados(self) -> bool:
+        """Aplana publicaciones y proyectos en la capa procesada (Parquet)"""
+        self.logger.info("******* Construyendo capa procesada *******")
+        self._merge_workers()
+        return ProcessedLayerBuilder().run_workflow()
+
     def _bronze_loader(self) -> bool:
         """Carga los datos en la base de datos"""
         self.logger.info("******* Cargando datos en la base de datos *******")
-        bronze_loader = BronzeLoader()
+        self._merge_workers()
+        bronze_loader = BronzeLoader(journal=self.journal.scope(ScrapingState.BRONZE_LOADER.name))
         return bronze_loader.run_workflow()
     
-    def run(self) -> None:
-        """Ejecuta el proceso completo de scraping"""
+    def _merge_workers(self) -> None:
+        """En el coordinador, integra lo descargado por los workers que ya terminaron (--shard/--queue)"""
+        if self.worker_id is not None:
+            return
+        merged = self.por_academico_scraper.raw_store.merge_workers()
+        if merged:
+            self.logger.info(f"{merged} entidades integradas desde los workers")
+
+    def _stage_seconds(self, name: str) -> Optional[float]:
+        """Plazo configurado para un estado (deadlines.stage_seconds); None o 0 sin plazo"""
+        stage_seconds = self.config.deadlines.get('stage_seconds') or {}
+        return stage_seconds.get(name, stage_seconds.get('default'))
+
+    def _finish_stage(self, name: str, success: bool, seconds: float) -> None:
+        """Registra la duración y el resultado de un estado del grafo (--pipelined)"""
+        self.stage_timings[name] = seconds
+        STAGE_SECONDS.set(seconds, stage=name)
+        if success:
+            self.journal.mark_state_done(name)
+            self.logger.info(f"✅ {name} completado en {seconds:.2f}s")
+        else:
+            self.logger.error(f"❌ FALLO en {name} después de {seconds:.2f}s")
+
+    def _run_pipelined(self, until: Optional[ScrapingState] = None) -> bool:
+        """
+        Ejecuta los estados como un grafo con flujos (--pipelined): cada unidad descargada habilita a sus
+        académicos en POR_ACADEMICO, y las unidades, rosters y respuestas guardadas pasan a BRONZE_LOADER
+        mientras sigue el crawl. TESIS y PROCESADOS consolidan el roster completo: esperan a POR_ACADEMICO.
+        """
+        settings = self.config.pipeline
+        queue_size = settings.get('queue_size', 1000)
+        poll_seconds = settings.get('poll_seconds', 0.1)
+        states = list(ScrapingState)
+        if until is not None:
+            states = states[:states.index(until) + 1]
+        if self.resume:
+            self.logger.info("Con --pipelined se retoma por tarea según el journal; los estados se ejecutan todos")
+
+        unidades = Stream('unidades', queue_size) if ScrapingState.PROFESORES in states else None
+        academicos = Stream('academicos', queue_size) if ScrapingState.POR_ACADEMICO in states else None
+        bronze: Dict[str, Stream] = {}
+        if ScrapingState.BRONZE_LOADER in states:
+            bronze = {endpoint: Stream(f"bronze-{endpoint}", queue_size) for endpoint in BronzeLoader.ENDPOINTS.values()}
+        vistos = set()
+
+        def present(*streams: Optional[Stream]) -> List[Stream]:
+            return [stream for stream in streams if stream is not None]
+
+        def scrape_unidades() -> bool:
+            data = self._scrape_unidades()
+            if not data:
+                return False
+            for unidad in data:
+                if unidades is not None:
+                    unidades.put(unidad)
+            if bronze:
+                bronze['unidades'].put(RawStore.UNIDADES_ID)
+            return True
+
+        def emit_unidad(unidad_id: int) -> None:
+            """Entrega a los estados siguientes los académicos de una unidad recién guardada"""
+            if bronze:
+                bronze['academicos'].put(unidad_id)
+            if academicos is None:
+                return
+            raw_store = self.academicos_scraper.raw_store
+            for profesor in raw_store.iter_records('academicos', unidad_id, ('academicos',)):
+                id_persona = profesor.get('id_persona')
+                if id_persona is not None and id_persona not in vistos:
+                    vistos.add(id_persona)
+                    academicos.put((id_persona, profesor.get('nombre_completo')))
+
+        def scrape_profesores() -> bool:
+            self.logger.info("Obteniendo profesores para cada repartición a medida que llegan las unidades")
+            return self.academicos_scraper.run_workflow(unidades=unidades, on_unidad=emit_unidad)
+
+        def scrape_por_academico() -> bool:
+            self.logger.info("******* Obteniendo publicaciones, proyectos y tesis a medida que llegan los académicos *******")
+            self._merge_workers()
+            on_entity = (lambda endpoint, id_persona: bronze[endpoint].put(id_persona)) if bronze else None
+            return self.por_academico_scraper.run_workflow(
+                academicos=academicos.iter_idle(poll_seconds), on_entity=on_entity
+            )
+
+        def bronze_loader() -> bool:
+            self.logger.info("******* Cargando datos en la base de datos a medida que se descargan *******")
+            loader = BronzeLoader(journal=self.journal.scope(ScrapingState.BRONZE_LOADER.name))
+            return loader.run_workflow(streams=bronze)
+
+        graph = StageGraph(on_finish=self._finish_stage)
+        graph.add(ScrapingState.INIT.name, self._init_process)
+        nodes = {
+            ScrapingState.UNIDADES: dict(run=scrape_unidades, after=['INIT'],
+                                         outputs=present(unidades, bronze.get('unidades'))),
+            ScrapingState.PROFESORES: dict(run=scrape_profesores, after=['INIT'], inputs=present(unidades),
+                                           outputs=present(academicos, bronze.get('academicos'))),
+            ScrapingState.POR_ACADEMICO: dict(run=scrape_por_academico, after=['INIT'], inputs=present(academicos),
+                                              outputs=present(*(bronze.get(endpoint) for endpoint in PorAcademicoScraper.ENDPOINTS))),
+            ScrapingState.TESIS: dict(run=self._scrape_tesis, after=['PROFESORES', 'POR_ACADEMICO']),
+            ScrapingState.PROCESADOS: dict(run=self._build_procesados, after=['POR_ACADEMICO']),
+            ScrapingState.BRONZE_LOADER: dict(run=bronze_loader, after=['INIT'], inputs=list(bronze.values())),
+        }
+        for state in states[1:]:
+            graph.add(state.name, **nodes[state])
+
+        self.logger.info(f"Estados encadenados: {', '.join(state.name for state in states)}")
+        profiling = self.profiler.profile('PIPELINE') if self.profiler else nullcontext()
+        with profiling, self.api_client.stage('PIPELINE', self._stage_seconds('PIPELINE')):
+            success = graph.run()
+        if not success:
+            fallidos = [name for name, ok in graph.results.items() if not ok]
+            self.logger.error(f"🛑 Estados con errores: {', '.join(fallidos)}")
+        return success
+
+    def run(self, until: Optional[ScrapingState] = None) -> None:
+        """
+        Ejecuta el proceso completo de scraping
+
+        Args:
+            until: Último estado a ejecutar (por defecto todos)
+        """
         import time
         start_time = time.time()
         
         self.logger.info("="*60)
         self.logger.info("INICIANDO PROCESO DE SCRAPING DEL PORTAFOLIO ACADÉMICO")
         self.logger.info("="*60)
+        if self.replay:
+            self.logger.info("Modo replay: las respuestas se sirven desde la caché, sin acceder a la red")
+
+        if self.pipelined:
+            if not self._run_pipelined(until):
+                return False
+            total_duration = time.time() - start_time
+            self.logger.info("="*60)
+            self.logger.info(f"🎉 PROCESO COMPLETO FINALIZADO EXITOSAMENTE")
+            self.logger.info(
+                f"⏱️  Tiempo total: {total_duration:.2f} segundos; suma de los estados: "
+                f"{sum(self.stage_timings.values()):.2f} segundos"
+            )
+            self.logger.info("="*60)
+            return True
         
         # Mapeo de estados a funciones
         state_processors = {
             ScrapingState.INIT: self._init_process,
             ScrapingState.UNIDADES: self._scrape_unidades,
             ScrapingState.PROFESORES: self._scrape_profesores,
-            ScrapingState.PUBLICACIONES: self._scrape_publicaciones,
-            ScrapingState.PROYECTOS: self._scrape_proyectos,
+            ScrapingState.POR_ACADEMICO: self._scrape_por_academico,
+            ScrapingState.TESIS: self._scrape_tesis,
+            ScrapingState.PROCESADOS: self._build_procesados,
             ScrapingState.BRONZE_LOADER: self._bronze_loader,
         }
 
-        total_states = len(ScrapingState)
+        # Un worker solo ejecuta la etapa por académico; el resto lo hace el coordinador
+        states = [ScrapingState.POR_ACADEMICO] if self.worker_id else list(ScrapingState)
+        total_states = len(states)
         
         # Ejecutar cada proceso en orden
-        for idx, state in enumerate(ScrapingState, 1):
+        for idx, state in enumerate(states, 1):
             step_start_time = time.time()
             self.logger.info(f"📋 PASO {idx}/{total_states}: {state.name}")
             self.logger.info("-" * 40)
+
+            if self.resume and self.journal.is_state_done(state.name):
+                self.logger.info(f"⏭️  {state.name} completado en la ejecución anterior, omitiendo")
+                self.logger.info("")
+                continue
             
             if state in state_processors:
                 try:
-                    success = state_processors[state]()
+                    profiling = self.profiler.profile(state.name) if self.profiler else nullcontext()
+                    with profiling, self.api_client.stage(state.name, self._stage_seconds(state.name)):
+                        success = state_processors[state]()
                     step_duration = time.time() - step_start_time
+                    self.stage_timings[state.name] = step_duration
+                    STAGE_SECONDS.set(step_duration, stage=state.name)
                     
                     if not success:
                         self.logger.error(f"❌ FALLO en {state.name} después de {step_duration:.2f}s")
                         self.logger.error("🛑 Deteniendo proceso por error")
                         return False
                     
+                    self.journal.mark_state_done(state.name)
                     self.logger.info(f"✅ {state.name} completado en {step_duration:.2f}s")
                     
                 except Exception as e:
@@ -147,6 +374,9 @@ class PortafolioScraper:
                 self.logger.warning(f"⚠️  No hay procesador definido para {state.name}")
             
             self.logger.info("")  # Línea en blanco para separar pasos
+            if state == until:
+                self.logger.info(f"Proceso detenido tras {state.name} (--until)")
+                break
         
         total_duration = time.time() - start_time
         self.logger.info("="*60)
@@ -155,12 +385,111 @@ class PortafolioScraper:
         self.logger.info("="*60)
         return True
 
+    def write_metrics(self) -> None:
+        """Escribe las métricas (texto de Prometheus) y el resumen JSON de la ejecución"""
+        metrics_config = self.config.metrics
+        try:
+            if metrics_config.get('textfile'):
+                REGISTRY.write_textfile(self._output_path(metrics_config['textfile']))
+            if metrics_config.get('summary_file'):
+                REGISTRY.write_summary(self._output_path(metrics_config['summary_file']), extra={
+                    'stage_seconds': self.stage_timings,
+                    'api': dict(self.api_client.stats),
+                })
+                self.logger.info(f"Resumen de métricas en {self._output_path(metrics_config['summary_file'])}")
+        except OSError as e:
+            self.logger.error(f"No se pudieron escribir las métricas: {str(e)}")
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+
+    def _output_path(self, path: str) -> Path:
+        """Ruta de un archivo de salida; en un worker lleva su nombre para no pisar la de otros procesos"""
+        path = Path(path)
+        return path.with_name(f"{path.stem}.{self.worker_id}{path.suffix}") if self.worker_id else path
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Convierte 'i/n' en (i, n) con 0 <= i < n"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Formato esperado i/n (por ejemplo 0/4): {value}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Se requiere 0 <= i < n: {value}")
+    return index, count
+
+def parse_args() -> argparse.Namespace:
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Scraper del Portafolio Académico")
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Retoma la ejecución anterior desde la primera tarea pendiente según el journal"
+    )
+    parser.add_argument(
+        '--full-refresh',
+        action='store_true',
+        help="Borra raw_data y el manifiesto y descarga todo de nuevo (por defecto el crawl es incremental)"
+    )
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help="Sirve todas las respuestas desde la caché de respuestas, sin acceder a la red"
+    )
+    parser.add_argument(
+        '--until',
+        choices=[state.name for state in ScrapingState],
+        help="Último estado a ejecutar (por ejemplo POR_ACADEMICO para omitir la carga en la base de datos)"
+    )
+    parser.add_argument(
+        '--pipelined',
+        action='store_true',
+        help="Encadena los estados: POR_ACADEMICO y BRONZE_LOADER avanzan a medida que llegan unidades y académicos"
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Perfila CPU y memoria de cada estado (reportes en profiling.output_dir)"
+    )
+    workers = parser.add_mutually_exclusive_group()
+    workers.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        help="Worker: ejecuta POR_ACADEMICO solo para los académicos del shard I de N (0 <= I < N)"
+    )
+    workers.add_argument(
+        '--queue',
+        action='store_true',
+        help="Worker: ejecuta POR_ACADEMICO tomando académicos de la cola compartida (work_queue.db_file)"
+    )
+    parser.add_argument(
+        '--worker-id',
+        help="Nombre del worker (por defecto shard-I-of-N con --shard, máquina-pid con --queue)"
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
     import time
     script_start = time.time()
+    args = parse_args()
     
-    scraper = PortafolioScraper()
-    success = scraper.run()
+    if args.worker_id and not (args.shard or args.queue):
+        exit("--worker-id requiere --shard o --queue")
+    if args.full_refresh and (args.shard or args.queue):
+        exit("--full-refresh solo se usa en el coordinador")
+    if args.pipelined and (args.shard or args.queue):
+        exit("--pipelined solo se usa en el coordinador")
+    scraper = PortafolioScraper(
+        full_refresh=args.full_refresh, resume=args.resume, replay=args.replay, profile=args.profile,
+        shard=args.shard, queue=args.queue, worker_id=args.worker_id, pipelined=args.pipelined
+    )
+    try:
+        success = scraper.run(until=ScrapingState[args.until] if args.until else None)
+    finally:
+        scraper.api_client.close()
+        scraper.journal.close()
+        scraper.write_metrics()
     
     script_duration = time.time() - script_start
     
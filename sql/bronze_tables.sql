@@ -0,0 +1,41 @@
+-- Tablas bronze agregadas después de las originales (unidades_raw, academics_raw, publications_raw y
+-- projects_raw). Es idempotente: se puede ejecutar sobre una base existente.
+--   psql -h $DB_HOST -d $DB_NAME -U $DB_USER -f sql/bronze_tables.sql
+
+CREATE SCHEMA IF NOT EXISTS bronze;
+
+-- Tesis (estado TESIS). Sin esta tabla BronzeLoader omite la carga de tesis con una advertencia.
+CREATE TABLE IF NOT EXISTS bronze.theses_raw (
+    id SERIAL PRIMARY KEY,
+    academic_id INTEGER,
+    source_system TEXT,
+    total_theses INTEGER,
+    raw_json JSONB,
+    file_name TEXT,
+    record_hash TEXT UNIQUE,
+    loaded_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- Una fila por publicación o proyecto (bronze_loader.granularity: record). Solo se usan si se elige
+-- esa granularidad; en ese caso deben existir.
+CREATE TABLE IF NOT EXISTS bronze.publication_records_raw (
+    id SERIAL PRIMARY KEY,
+    academic_id INTEGER,
+    source_system TEXT,
+    record_id TEXT,
+    raw_json JSONB,
+    file_name TEXT,
+    record_hash TEXT UNIQUE,
+    loaded_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS bronze.project_records_raw (
+    id SERIAL PRIMARY KEY,
+    academic_id INTEGER,
+    source_system TEXT,
+    record_id TEXT,
+    raw_json JSONB,
+    file_name TEXT,
+    record_hash TEXT UNIQUE,
+    loaded_at TIMESTAMPTZ DEFAULT now()
+);
@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from rate_limiter import TokenBucket
+
+
+class AdaptiveController:
+    """
+    Control adaptativo AIMD de la concurrencia y la tasa de requests, según la respuesta del servidor.
+    Mientras las respuestas son exitosas y la latencia p95 se mantiene cerca de su línea base,
+    el límite de requests en vuelo y la tasa del token bucket crecen de forma aditiva; ante un 429,
+    un 5xx, un timeout o un alza del p95 ambos se reducen de forma multiplicativa (a lo más una vez
+    por cooldown). Un Retry-After del servidor detiene todas las requests hasta que se cumpla.
+    """
+    def __init__(self, rate_limiter: TokenBucket, initial_concurrency: int = 4, min_concurrency: int = 1,
+                 max_concurrency: int = 16, min_rps: float = 1.0, max_rps: float = 50.0, increase: float = 1.0,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0, window: int = 50,
+                 cooldown_seconds: float = 2.0):
+        self.rate_limiter = rate_limiter
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.min_rps = min_rps
+        self.max_rps = max(min_rps, max_rps)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown_seconds = cooldown_seconds
+        self.logger = logging.getLogger('adaptive_controller')
+
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.rate = min(max(rate_limiter.rate, self.min_rps), self.max_rps)
+        self.rate_limiter.set_rate(self.rate)
+        self.in_flight = 0
+        self.decreases = 0
+        self._cond = threading.Condition()
+        self._latencies = deque(maxlen=window)
+        self._samples = 0
+        self._p95: Optional[float] = None
+        self._baseline_p95: Optional[float] = None
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+
+    @contextmanager
+    def slot(self, acquired: bool = False) -> Iterator[None]:
+        """Reserva un lugar entre las requests en vuelo y un token del rate limiter (salvo que ya se reservó)"""
+        if not acquired:
+            self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self) -> None:
+        """Espera a que haya lugar bajo el límite actual y a que termine cualquier pausa por Retry-After"""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                self._cond.wait(timeout=pause if pause > 0 else 0.5)
+            self.in_flight += 1
+        self.rate_limiter.acquire()
+
+    def try_acquire(self) -> bool:
+        """Reserva un lugar y un token solo si ambos están disponibles de inmediato (requests opcionales)"""
+        with self._cond:
+            if self._paused_until > time.monotonic() or self.in_flight >= int(self.limit):
+                return False
+            if not self.rate_limiter.try_acquire():
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Libera el lugar de una request terminada"""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self, latency: float) -> None:
+        """Registra una respuesta exitosa; sube los límites salvo que el p95 indique congestión"""
+        with self._cond:
+            self._latencies.append(latency)
+            self._samples += 1
+            if self._samples % 10 == 0 and len(self._latencies) >= self._latencies.maxlen // 2:
+                ordered = sorted(self._latencies)
+                self._p95 = ordered[int(0.95 * (len(ordered) - 1))]
+                if self._baseline_p95 is None:
+                    self._baseline_p95 = self._p95
+                elif self._p95 > self._baseline_p95 * self.latency_tolerance:
+                    self._decrease(f"p95 {self._p95 * 1000:.0f} ms sobre la línea base {self._baseline_p95 * 1000:.0f} ms")
+                    return
+                else:
+                    # La línea base sigue lentamente al p95 sano
+                    self._baseline_p95 = 0.9 * self._baseline_p95 + 0.1 * self._p95
+            self._increase()
+
+    def on_failure(self, reason: str, retry_after: Optional[float] = None) -> None:
+        """Registra un 429, 5xx o timeout; reduce los límites y respeta Retry-After"""
+        with self._cond:
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                self.logger.warning(f"Servidor pide esperar {retry_after:.1f}s (Retry-After)")
+            self._decrease(reason)
+
+    def _increase(self) -> None:
+        """Aumento aditivo: +increase en concurrencia por cada ventana de requests exitosas y +increase req/s por segundo"""
+        previous = int(self.limit)
+        self.limit = min(self.max_concurrency, self.limit + self.increase / self.limit)
+        self.rate = min(self.max_rps, self.rate + self.increase / self.rate)
+        self.rate_limiter.set_rate(self.rate)
+        if int(self.limit) != previous:
+            self.logger.info(f"Concurrencia adaptativa: {previous} -> {int(self.limit)} ({self.rate:.1f} req/s)")
+            self._cond.notify_all()
+
+    def _decrease(self, reason: str) -> None:
+        """Reducción multiplicativa, a lo más una vez por cooldown"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        self._last_decrease = now
+        previous = int(self.limit)
+        self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+        self.rate = max(self.min_rps, self.rate * self.decrease_factor)
+        self.rate_limiter.set_rate(self.rate)
+        self.decreases += 1
+        self.logger.warning(
+            f"Concurrencia adaptativa: {previous} -> {int(self.limit)} ({self.rate:.1f} req/s) por {reason}"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual del controlador"""
+        with self._cond:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'rate': round(self.rate, 2),
+                'p95_ms': round(self._p95 * 1000, 1) if self._p95 is not None else None,
+                'decreases': self.decreases,
+            }
@@ -1,27 +1,459 @@
 # api_client.py
 import requests
-import base64
-import json
-import urllib.parse
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+import logging
+import math
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Union
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+from config import Config
+from rate_limiter import TokenBucket
+from decoder import DecodeError, DecodePool
+from response_cache import ResponseCache
+from adaptive_controller import AdaptiveController
+from deadline import Deadline
+import metrics
 
-class APIClient:    
-    def __init__(self):
-        None
+class APIClient:
+    """
+    Transporte HTTP compartido por todos los scrapers.
+    Mantiene una sesión con pool de conexiones keep-alive y headers preconstruidos,
+    de modo que cada request reutiliza la conexión TCP/TLS en vez de abrir una nueva.
+    Todas las requests pasan por un único rate limiter, compartido entre hilos.
+    Con la caché de respuestas activa, las consultas ya descargadas se sirven desde disco;
+    en modo replay solo se sirven desde la caché, sin acceder a la red.
+    Los reintentos con backoff, los plazos por tarea y por estado y las requests duplicadas
+    (hedging) contra la latencia de cola se resuelven aquí para todos los scrapers.
+    """
+    # Ruta hasta la lista paginada dentro de la respuesta de cada endpoint
+    RECORDS_PATH: Dict[str, Sequence[Union[str, int]]] = {
+        'unidades': (),
+        'academicos': ('academicos',),
+        'publicaciones': ('academicos', 0, 'publicaciones'),
+        'proyectos': ('academicos', 'proyectos'),
+        'tesis': ('academicos', 0, 'tesis'),
+    }
 
-    def _decode_response(self, encoded_text: str) -> Dict[str, Any]:
-        """Decodifica la respuesta de la API"""
+    def __init__(self, replay: bool = False):
+        self.config = Config()
+        self.logger = self._setup_logger()
+        self.replay = replay
+        self.cache = self._build_cache()
+        # Contadores de tráfico de red (requests enviadas, bytes recibidos, respuestas con error)
+        self.stats = {'requests': 0, 'bytes': 0, 'errors': 0, 'hedged': 0, 'hedge_wins': 0, 'deadline_exceeded': 0}
+        self._stats_lock = threading.Lock()
+        self.base_url = self.config.api_base_url
+        self.session = self._build_session()
+        self.rate_limiter = self._build_rate_limiter()
+        # Con adaptive.enabled la concurrencia y la tasa se ajustan según las respuestas del servidor
+        self.controller = self._build_controller()
+        # Executor compartido para descargar en paralelo las páginas restantes
+        self._page_executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix='page'
+        )
+        # Plazo de cada tarea (todas las páginas e intentos de una entidad) y del estado en curso (ver stage)
+        self.task_seconds = self.config.deadlines.get('task_seconds')
+        self._stage_deadline: Optional[Deadline] = None
+        # Con hedging.enabled, una request sin respuesta tras el percentil de latencia se duplica
+        self.hedging = self.config.hedging
+        self._latencies = deque(maxlen=self.hedging.get('window', 200))
+        self._latency_samples = 0
+        self._hedge_delay: Optional[float] = None
+        self._hedge_executor = ThreadPoolExecutor(
+            max_workers=4 * self.max_in_flight,
+            thread_name_prefix='hedge'
+        ) if self.hedging.get('enabled', False) else None
+        # Con decode_workers > 0 la decodificación se hace en un pool de procesos
+        self.decode_pool = DecodePool(self.config.scraping_config.get('decode_workers', 0))
+
+    def _setup_logger(self) -> logging.Logger:
+        """Retorna el logger configurado"""
+        return logging.getLogger('api_client')
+
+    def _build_session(self) -> requests.Session:
+        """Crea la sesión HTTP con pool de conexiones y headers por defecto"""
+        pool_size = self.config.scraping_config.get('pool_size', 10)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.config.api_headers)
+        return session
+
+    def _build_rate_limiter(self) -> TokenBucket:
+        """Crea el rate limiter global a partir de scraping.requests_per_second o scraping.delay"""
+        scraping = self.config.scraping_config
+        rate = scraping.get('requests_per_second')
+        if not rate:
+            # Sin delay configurado no se limita en la práctica
+            rate = 1.0 / scraping['delay'] if scraping['delay'] > 0 else 1000.0
+        return TokenBucket(rate=rate, capacity=scraping.get('max_workers', 1))
+
+    def _build_controller(self) -> Optional[AdaptiveController]:
+        """Crea el controlador AIMD si está habilitado"""
+        adaptive = self.config.adaptive
+        if not adaptive.get('enabled', False):
+            return None
+        max_workers = self.config.scraping_config.get('max_workers', 1)
+        # Sin techos explícitos el controlador no supera la concurrencia ni la tasa configuradas: solo reduce
+        max_concurrency = adaptive.get('max_concurrency') or max_workers
+        return AdaptiveController(
+            self.rate_limiter,
+            initial_concurrency=min(adaptive.get('initial_concurrency', max_workers), max_concurrency),
+            min_concurrency=adaptive.get('min_concurrency', 1),
+            max_concurrency=max_concurrency,
+            min_rps=adaptive.get('min_rps', 1.0),
+            max_rps=adaptive.get('max_rps') or self.rate_limiter.rate,
+            increase=adaptive.get('increase', 1.0),
+            decrease_factor=adaptive.get('decrease_factor', 0.5),
+            latency_tolerance=adaptive.get('latency_tolerance', 2.0),
+            window=adaptive.get('window', 50),
+            cooldown_seconds=adaptive.get('cooldown_seconds', 2.0),
+        )
+
+    @property
+    def max_in_flight(self) -> int:
+        """Máximo de requests simultáneas: el techo del controlador adaptativo o scraping.max_workers"""
+        if self.controller is not None:
+            return self.controller.max_concurrency
+        return self.config.scraping_config.get('max_workers', 1)
+
+    def _build_cache(self) -> Optional[ResponseCache]:
+        """Crea la caché de respuestas si está habilitada (siempre en modo replay)"""
+        cache_config = self.config.cache
+        if not (cache_config.get('enabled', False) or self.replay):
+            return None
+        return ResponseCache(
+            Path(cache_config.get('db_file', 'cache/responses.sqlite')),
+            max_size_mb=cache_config.get('max_size_mb', 2048),
+            ttl_hours=cache_config.get('ttl_hours', {})
+        )
+
+    def _count(self, requests: int = 0, n_bytes: int = 0, errors: int = 0, **others: int) -> None:
+        """Acumula los contadores de tráfico de forma segura entre hilos"""
+        with self._stats_lock:
+            self.stats['requests'] += requests
+            self.stats['bytes'] += n_bytes
+            self.stats['errors'] += errors
+            for name, value in others.items():
+                self.stats[name] += value
+
+    @contextmanager
+    def stage(self, name: str, seconds: Optional[float]) -> Iterator[None]:
+        """Aplica un plazo común a todas las requests de un estado; al vencer, las pendientes se omiten"""
+        self._stage_deadline = Deadline(seconds)
+        exceeded = self.stats['deadline_exceeded']
+        try:
+            yield
+        finally:
+            self._stage_deadline = None
+            skipped = self.stats['deadline_exceeded'] - exceeded
+            if skipped:
+                self.logger.warning(
+                    f"{name}: {skipped} consultas sin terminar por plazo agotado; "
+                    f"se descargarán en la próxima ejecución"
+                )
+
+    def task_deadline(self) -> Deadline:
+        """Plazo de una nueva tarea: deadlines.task_seconds, acotado por el plazo del estado en curso"""
+        return Deadline.earliest(Deadline(self.task_seconds), self._stage_deadline)
+
+    def fetch(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+              deadline: Optional[Deadline] = None) -> Optional[Any]:
+        """
+        Obtiene y decodifica la respuesta de un endpoint configurado
+
+        Args:
+            endpoint: Nombre del endpoint en config.yaml (ej: 'publicaciones')
+            params: Parámetros de la consulta
+            deadline: Plazo de la tarea; por defecto uno nuevo (ver task_deadline)
+
+        Returns:
+            Datos decodificados, diccionario vacío si el servidor responde 204
+            o None si se agotan los reintentos o el plazo (o si la consulta no está en caché en modo replay)
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params, ignore_ttl=self.replay)
+            metrics.CACHE_LOOKUPS.inc(endpoint=endpoint, result='hit' if cached is not None else 'miss')
+            if cached is not None:
+                status, body = cached
+                if status != 200:
+                    return {}
+                try:
+                    return self._decode(endpoint, body)
+                except DecodeError as e:
+                    # Entrada guardada antes de validar la decodificación: se descarta y se descarga de nuevo
+                    self.logger.warning(f"Respuesta en caché no decodificable para {endpoint} con {params}: {str(e)}")
+                    self.cache.delete(endpoint, params)
+                    cached = None
+            if cached is None and self.replay:
+                self.logger.warning(f"Sin respuesta en caché para {endpoint} con {params} (modo replay)")
+                return None
+
+        url = f"{self.base_url}{self.config.endpoints[endpoint]}"
+        max_retries = self.config.scraping_config['max_retries']
+        timeout = self.config.scraping_config['timeout']
+        deadline = deadline or self.task_deadline()
+
+        for retry in range(max_retries):
+            if deadline.expired():
+                self._count(deadline_exceeded=1)
+                self.logger.warning(f"Plazo agotado para {endpoint} con {params} tras {retry} intentos")
+                return None
+            if retry:
+                metrics.HTTP_RETRIES.inc(endpoint=endpoint)
+            response = None
+            try:
+                response = self._send(endpoint, url, params, max(0.01, deadline.cap(timeout)))
+
+                if response.status_code == 200:
+                    # Un cuerpo no decodificable (truncado o corrupto) lanza DecodeError: cuenta como
+                    # error, se reintenta y no llega a la caché
+                    data = self._decode(endpoint, response.text)
+                    if self.cache is not None:
+                        self.cache.put(endpoint, params, 200, response.text)
+                    return data
+                if response.status_code == 204:
+                    self.logger.info(f"No hay contenido (204) en {endpoint} para {params}")
+                    if self.cache is not None:
+                        self.cache.put(endpoint, params, 204, '')
+                    return {}
+
+                self._count(errors=1)
+                self.logger.warning(
+                    f"Intento {retry + 1}: Error {response.status_code} en {endpoint} para {params}"
+                )
+            except Exception as e:
+                self._count(errors=1)
+                self.logger.error(f"Error en intento {retry + 1} para {endpoint}: {str(e)}")
+
+            if retry < max_retries - 1:
+                time.sleep(deadline.cap(self._retry_delay(retry, response)))
+
+        return None
+
+    def _send(self, endpoint: str, url: str, params: Optional[Dict[str, Any]], timeout: float) -> requests.Response:
+        """
+        Envía una request; con hedging, si no hay respuesta tras el percentil de latencia observado
+        envía un duplicado (solo si el rate limiter tiene un token libre) y gana la primera respuesta
+        """
+        delay = self._hedge_delay if self._hedge_executor is not None else None
+        if delay is None or delay >= timeout:
+            return self._send_once(endpoint, url, params, timeout)
+
+        primary = self._hedge_executor.submit(self._send_once, endpoint, url, params, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._try_acquire():
+            return primary.result()
+
+        self._count(hedged=1)
+        hedge = self._hedge_executor.submit(self._send_once, endpoint, url, params, timeout - delay, True)
+        for future in as_completed([primary, hedge]):
+            if future.exception() is None:
+                if future is hedge:
+                    self._count(hedge_wins=1)
+                return future.result()
+        # Ambas fallaron: se propaga el error de la original
+        return primary.result()
+
+    def _try_acquire(self) -> bool:
+        """Reserva sin esperar un token (y un lugar adaptativo) para una request opcional"""
+        if self.controller is not None:
+            return self.controller.try_acquire()
+        return self.rate_limiter.try_acquire()
+
+    def _send_once(self, endpoint: str, url: str, params: Optional[Dict[str, Any]], timeout: float,
+                   acquired: bool = False) -> requests.Response:
+        """
+        Envía una request respetando el rate limiter (y el límite adaptativo de requests en vuelo)
+
+        Con el controlador adaptativo, informa la latencia de las respuestas exitosas y los 429,
+        5xx y errores de red para que ajuste la concurrencia y la tasa. Registra latencia, bytes
+        y código de estado por endpoint en las métricas.
+
+        Args:
+            acquired: El token (y el lugar adaptativo) ya fue reservado con _try_acquire
+        """
+        if self.controller is None and not acquired:
+            self.rate_limiter.acquire()
+        with self.controller.slot(acquired=acquired) if self.controller is not None else nullcontext():
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except requests.RequestException as e:
+                metrics.HTTP_RESPONSES.inc(endpoint=endpoint, status='error')
+                if self.controller is not None:
+                    self.controller.on_failure(type(e).__name__)
+                raise
+            latency = time.monotonic() - start
+        self._count(requests=1, n_bytes=len(response.content))
+        metrics.HTTP_REQUEST_SECONDS.observe(latency, endpoint=endpoint)
+        metrics.HTTP_RESPONSES.inc(endpoint=endpoint, status=response.status_code)
+        metrics.HTTP_RESPONSE_BYTES.inc(len(response.content), endpoint=endpoint)
+        if response.status_code in (200, 204):
+            self._record_latency(latency)
+            if self.controller is not None:
+                self.controller.on_success(latency)
+        elif self.controller is not None and (response.status_code == 429 or response.status_code >= 500):
+            self.controller.on_failure(f"HTTP {response.status_code}", self._retry_after(response))
+        return response
+
+    def _record_latency(self, latency: float) -> None:
+        """Actualiza cada 20 respuestas la espera antes de duplicar una request (percentil de hedging)"""
+        if self._hedge_executor is None:
+            return
+        with self._stats_lock:
+            self._latencies.append(latency)
+            self._latency_samples += 1
+            if self._latency_samples % 20 or len(self._latencies) < self.hedging.get('min_samples', 20):
+                return
+            ordered = sorted(self._latencies)
+            percentile = ordered[int(self.hedging.get('percentile', 0.95) * (len(ordered) - 1))]
+            self._hedge_delay = max(self.hedging.get('min_delay_ms', 50) / 1000, percentile)
+
+    @staticmethod
+    def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        """Segundos indicados por el header Retry-After (en segundos o como fecha HTTP)"""
+        if response is None:
+            return None
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
         try:
-            reversed_str = encoded_text[::-1]
-            decoded_bytes = base64.b64decode(reversed_str)
-            decoded_str = decoded_bytes.decode('utf-8')
-            result = json.loads(urllib.parse.unquote(decoded_str))
-            return result
-        except Exception as e:
-            print(f"Error decodificando respuesta: {e}")
-            return {}
-        
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _retry_delay(self, retry: int, response: Optional[requests.Response]) -> float:
+        """Espera antes del siguiente intento: backoff exponencial sobre scraping.delay, o Retry-After si es mayor"""
+        backoff = self.config.scraping_config['delay'] * (2 ** retry)
+        return max(backoff, self._retry_after(response) or 0.0)
+
+    def fetch_all(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        Obtiene todas las páginas de un endpoint y las fusiona en una sola respuesta
+
+        Lee total_resultado de la primera página, calcula las páginas restantes y las
+        descarga en paralelo (respetando el rate limiter). Las páginas se agregan a la
+        lista de registros de la primera, por lo que el formato del resultado es el mismo
+        que el de una respuesta de una sola página.
+
+        Args:
+            endpoint: Nombre del endpoint en config.yaml
+            params: Parámetros de la consulta; 'limite' define el tamaño de página
+
+        Returns:
+            Respuesta fusionada, o None si alguna página no se pudo obtener
+        """
+        limit = params.get('limite') or self.config.pagination['default_limit']
+        path = self.RECORDS_PATH[endpoint]
+        # Un solo plazo para todas las páginas: la tarea es la entidad completa
+        deadline = self.task_deadline()
+        first = self.fetch(endpoint, {**params, 'limite': limit, 'pagina': 1}, deadline)
+        if not first:
+            return first
+
+        records = self.get_records(first, path)
+        if records is None or len(records) < limit:
+            return first
+
+        total = first.get('total_resultado') if isinstance(first, dict) else None
+        if total is None:
+            return self._fetch_sequential_pages(endpoint, params, limit, first, records, deadline)
+
+        total_pages = math.ceil(int(total) / limit)
+        if total_pages <= 1:
+            return first
+
+        self.logger.info(f"Paginando {endpoint} para {params}: {total} registros en {total_pages} páginas")
+        futures = [
+            self._page_executor.submit(self.fetch, endpoint, {**params, 'limite': limit, 'pagina': page}, deadline)
+            for page in range(2, total_pages + 1)
+        ]
+        for page, future in enumerate(futures, 2):
+            result = future.result()
+            if result is None:
+                self.logger.error(f"No se pudo obtener la página {page}/{total_pages} de {endpoint} para {params}")
+                return None
+            page_records = self.get_records(result, path)
+            if page_records:
+                records.extend(page_records)
+        return first
+
+    def _fetch_sequential_pages(self, endpoint: str, params: Dict[str, Any], limit: int,
+                                first: Any, records: List[Any], deadline: Deadline) -> Optional[Any]:
+        """Pagina secuencialmente endpoints sin total_resultado hasta obtener una página incompleta"""
+        path = self.RECORDS_PATH[endpoint]
+        previous = records[:]
+        page = 2
+        while True:
+            result = self.fetch(endpoint, {**params, 'limite': limit, 'pagina': page}, deadline)
+            if result is None:
+                self.logger.error(f"No se pudo obtener la página {page} de {endpoint} para {params}")
+                return None
+            page_records = self.get_records(result, path) or []
+            # Un servidor que ignora 'pagina' devuelve siempre lo mismo: cortar para no duplicar
+            if not page_records or page_records == previous:
+                return first
+            records.extend(page_records)
+            if len(page_records) < limit:
+                return first
+            previous = page_records
+            page += 1
+
+    @staticmethod
+    def get_records(data: Any, path: Sequence[Union[str, int]]) -> Optional[List[Any]]:
+        """Navega la respuesta hasta la lista paginada; None si la estructura no coincide"""
+        node = data
+        for key in path:
+            try:
+                node = node[key]
+            except (KeyError, IndexError, TypeError):
+                return None
+        return node if isinstance(node, list) else None
+
+    def close(self) -> None:
+        """Cierra la sesión y libera las conexiones del pool"""
+        self._page_executor.shutdown(wait=False)
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self.logger.info(
+                f"Hedging: {self.stats['hedged']} requests duplicadas, {self.stats['hedge_wins']} ganadas por el duplicado"
+            )
+        self.decode_pool.close()
+        self.session.close()
+        if self.controller is not None:
+            self.logger.info(f"Controlador adaptativo: {self.controller.snapshot()}")
+        if self.cache is not None:
+            self.logger.info(f"Caché de respuestas: {self.cache.hits} aciertos, {self.cache.misses} fallos")
+            self.cache.close()
+
+    def _decode(self, endpoint: str, encoded_text: str) -> Dict[str, Any]:
+        """Decodifica una respuesta registrando el tiempo por endpoint"""
+        start = time.perf_counter()
+        data = self._decode_response(encoded_text)
+        metrics.DECODE_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+        return data
+
+    def _decode_response(self, encoded_text: str) -> Dict[str, Any]:
+        """Decodifica la respuesta de la API (ver decoder.decode_response)"""
+        return self.decode_pool.decode(encoded_text)
+
 if __name__ == "__main__":
     obj = APIClient()
     encoded_text = "==QX9JycvlmchRXauVXbvNEI5ByclxWa05WYpRWd0NXRgM3b05WdzFEIlRGIh16wy9GdjVmcyV2YpZlI6ISZyJWbv5mIscTOyojIklmI7xSfiM3byJXYCByZyVmYlt2YuZ7wNBybk5WYuJXZGBicvR3YvREIy92clZ2byBFIsM3b05WZtlGbBBycvxGIlRGIh16wn9Gbv52YlRFI5BibzOcajlmc0VnTgUGZg8Gd1RXa0NnbJJiOiUmci12buJCLzADOxojIklmI7xSfiMXZsFmbvl2Yh5mclRnbJBycvlGZ1R3cFBSZkByb0VHdpR3culkI6ISZyJWbv5mIskDN4EjOiQWaisHL9JibzOcajF2Y1RWRg4WZgM3bkFmeuFmdBBycvlGZ1R3cFBSZkByb0VHdpR3culkI6ISZyJWbv5mIsUzN5EjOiQWaisHL9JycvNWasJmuDDFIz9GduV3cBBSZkByb0VHdpR3culkI6ISZyJWbv5mIskjM5EjOiQWaisHL9JybjlmbtOMbDBCbhRXawN3bIJiOiUmci12buJCL4UDMyojIklmI7xSfiEWrDf2bs9Gdu9GZPBSZkBCZhRHb1NWYGJiOiUmci12buJCLwYTNxojIklmI7xSfiEmbpNWakVWTgUGZgQWY0xWdjFmRiojIlJnYt9mbiwSM2ITM6ICZpJyes0nIv5mcllmYvdEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsIDO2IjOiQWaisHL9JyclRWYklmbh1WdIBSegEWrDb2bz9GbpZEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsITMyEjOiQWaisHL9Jycvl2YvdWZOBSegEWrD32bu92YFBSZkBCZhRHb1NWYGJiOiUmci12buJCL5QjN6ICZpJyes0nIvh2YlJXZEBSZkBCZhRHb1NWYGJiOiUmci12buJCL4ATMxojIklmI7xSfi4WZnFWbJBSZg42sDn2YhNWauVXbvNEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsMDO2IjOiQWaisHL9JychlmchV3YlBFI5Bychlmch5WayVGdlZFIzFWaj5WZpNEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsMjMwEjOiQWaisHL9JyclxWYpN2bTBychl2YuVWaDBSZkBCZhRHb1NWYGJiOiUmci12buJCLzQTO6ICZpJyes0nIzF2YpRXdpO8Yh1mchZEI5BychNWat16w1FFIzFWaj5WZpNEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsUTM5ojIklmI7xSfiMXYjlGdhOcblRXYNBSegMXYjl2ctOsRgMXYpNmbll2QgUGZgQWY0xWdjFmRiojIlJnYt9mbiwCO4cjOiQWaisHL9JielxWYyVHdh5EIhxGIlRGIuN7wpNWY2JXZz52bDBSYsBSZkBSegMXZsFGdzVmcvZEIzFWaj5WZpNEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsIDO4ojIklmI7xSfiMXYjlWbzOsbvJ3ZBBychl2YuVWaDBSZkBCZhRHb1NWYGJiOiUmci12buJCLwYTN6ICZpJyes0nIzFWaj5WZpNEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsYjM1ojIklmI7xSfiMXZ0JXQgUGZgQWY0xWdjFmRiojIlJnYt9mbiwCMyQjOiQWaisHL9JybtNXauFmYyVFI5BSYyVHdjVGdpVXcyFEIlRGIkFGdsV3YhZkI6ISZyJWbv5mIsgjMzojIklmI7xSfiICXuMEIuMFIuQkIcBCbhJXd0xWdDBSegE2YpR3ctOMdyFEIuN7wpNnblRHeFBSZkBybyRnblNkI6ISZyJWbv5mIsQjNyIjOiQWais3W"
-    print(obj._decode_response(encoded_text=encoded_text))
+    print(obj._decode_response(encoded_text=encoded_text))
\ No newline at end of file
@@ -1,41 +1,260 @@
-import json
+import csv
 import hashlib
+import io
 import os
-import sys
 import logging
-import psycopg2
+import threading
+import zlib
 from psycopg2 import sql, Error  # Para manejo de errores
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from collections import deque
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from config import Config
+from api_client import APIClient
+from decoder import loads_bytes
+from raw_store import RawStore, canonical_from_compressed, read_canonical_file
+from run_journal import JournalScope
+import metrics
+
+SOURCE_SYSTEM = 'portafolio_academico'
+# Campo con el id natural de cada registro (columna record_id de las tablas por registro)
+RECORD_IDS = {'publicaciones': 'id_publicacion', 'proyectos': 'id_proyecto'}
+# Campo del manifiesto con el hash de las entidades cargadas por registro
+RECORDS_MARKER = 'loaded_records_hash'
+
+
+def explode_records(endpoint: str, entity_id: Any, raw: bytes) -> List[Tuple[Optional[str], str, str]]:
+    """
+    Separa los registros de una entidad (el arreglo de APIClient.RECORDS_PATH) para cargar uno por fila.
+    Es una función de módulo para poder ejecutarla en un pool de procesos.
+
+    El record_hash es el sha256 del id del académico y el JSON canónico del registro: se mantiene mientras
+    el registro no cambie, aunque cambien otros registros de la entidad, y la misma publicación de dos
+    coautores queda en dos filas.
+
+    Returns:
+        Tuplas (record_id, json canónico, record_hash)
+
+    Raises:
+        ValueError: si el contenido no es JSON válido
+    """
+    records = APIClient.get_records(loads_bytes(raw), APIClient.RECORDS_PATH[endpoint]) or []
+    id_field = RECORD_IDS.get(endpoint)
+    prefix = f"{entity_id}:".encode('utf-8')
+    exploded = []
+    for record in records:
+        canonical = RawStore.canonical_bytes(record)
+        record_id = record.get(id_field) if isinstance(record, dict) else None
+        exploded.append((
+            None if record_id is None else str(record_id),
+            canonical.decode('utf-8'),
+            hashlib.sha256(prefix + canonical).hexdigest(),
+        ))
+    return exploded
+
+
+def explode_compressed_records(endpoint: str, entity_id: Any, compressed: bytes) -> List[Tuple[Optional[str], str, str]]:
+    """explode_records sobre un registro de segmento comprimido, para descomprimir también en el pool"""
+    try:
+        raw = zlib.decompress(compressed)
+    except zlib.error as e:
+        raise ValueError(f"Registro comprimido inválido: {e}") from None
+    return explode_records(endpoint, entity_id, raw)
+
+
+class BulkWriter:
+    """
+    Escribe filas en una tabla bronze por lotes.
+    Con method='copy' cada lote se envía con COPY a una tabla staging temporal y se fusiona en
+    bronze.{table} con un único INSERT ... ON CONFLICT (record_hash) DO NOTHING; con method='values'
+    se envía como un INSERT multi-fila (execute_values). Se hace commit cada commit_interval lotes.
+    """
+    def __init__(self, conn, table: str, columns: Sequence[str], method: str = 'copy',
+                 batch_size: int = 500, commit_interval: int = 10,
+                 on_commit: Optional[Callable[[List[Any]], Any]] = None):
+        if method not in ('copy', 'values'):
+            raise ValueError(f"Método de carga desconocido: {method}")
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.method = method
+        self.batch_size = max(1, batch_size)
+        self.commit_interval = max(1, commit_interval)
+        self.on_commit = on_commit
+        self.rows = 0
+        self.inserted = 0
+        self.commits = 0
+        self._batch: List[tuple] = []
+        self._batch_keys: List[Any] = []
+        self._uncommitted_keys: List[Any] = []
+        self._batches_since_commit = 0
+        # Filas enviadas e insertadas desde el último commit (se publican en las métricas al confirmar)
+        self._uncommitted_rows = 0
+        self._uncommitted_inserted = 0
+
+        self._target = sql.SQL("bronze.{}").format(sql.Identifier(table))
+        self._stage = sql.Identifier(f"stage_{table}")
+        self._cols = sql.SQL(', ').join(map(sql.Identifier, self.columns))
+        if method == 'copy':
+            self._create_stage()
+
+    def _create_stage(self) -> None:
+        """Crea la tabla staging temporal con las columnas a cargar"""
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql.SQL(
+                "CREATE TEMP TABLE IF NOT EXISTS {stage} AS SELECT {cols} FROM {target} WITH NO DATA"
+            ).format(stage=self._stage, cols=self._cols, target=self._target))
+
+    def add(self, row: tuple, key: Any = None) -> None:
+        """Agrega una fila; key identifica la entidad para on_commit"""
+        self._batch.append(row)
+        if key is not None:
+            self._batch_keys.append(key)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Envía el lote actual a la base de datos"""
+        if not self._batch:
+            return
+        inserted = self.inserted
+        if self.method == 'copy':
+            self._flush_copy()
+        else:
+            self._flush_values()
+        self._uncommitted_inserted += self.inserted - inserted
+        self._uncommitted_rows += len(self._batch)
+        self.rows += len(self._batch)
+        self._uncommitted_keys.extend(self._batch_keys)
+        self._batch = []
+        self._batch_keys = []
+        self._batches_since_commit += 1
+        if self._batches_since_commit >= self.commit_interval:
+            self.commit()
+
+    def _flush_copy(self) -> None:
+        """COPY del lote a staging y merge a la tabla bronze"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(self._batch)
+        buffer.seek(0)
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql.SQL("TRUNCATE {stage}").format(stage=self._stage))
+            copy_query = sql.SQL("COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv)").format(
+                stage=self._stage, cols=self._cols
+            )
+            cursor.copy_expert(copy_query.as_string(self.conn), buffer)
+            cursor.execute(sql.SQL(
+                "INSERT INTO {target} ({cols}) SELECT {cols} FROM {stage} ON CONFLICT (record_hash) DO NOTHING"
+            ).format(target=self._target, cols=self._cols, stage=self._stage))
+            self.inserted += max(cursor.rowcount, 0)
+
+    def _flush_values(self) -> None:
+        """INSERT multi-fila del lote"""
+        query = sql.SQL("INSERT INTO {target} ({cols}) VALUES %s ON CONFLICT (record_hash) DO NOTHING").format(
+            target=self._target, cols=self._cols
+        )
+        with self.conn.cursor() as cursor:
+            execute_values(cursor, query.as_string(self.conn), self._batch, page_size=self.batch_size)
+            self.inserted += max(cursor.rowcount, 0)
+
+    def commit(self) -> None:
+        """Hace commit de los lotes pendientes y notifica sus claves"""
+        self.conn.commit()
+        self.commits += 1
+        metrics.BRONZE_ROWS_SENT.inc(self._uncommitted_rows, table=self.table)
+        metrics.BRONZE_ROWS_INSERTED.inc(self._uncommitted_inserted, table=self.table)
+        self._uncommitted_rows = 0
+        self._uncommitted_inserted = 0
+        if self.on_commit and self._uncommitted_keys:
+            self.on_commit(self._uncommitted_keys)
+        self._uncommitted_keys = []
+        self._batches_since_commit = 0
+
+    def close(self) -> None:
+        """Envía el último lote y hace el commit final"""
+        self.flush()
+        if self._batches_since_commit:
+            self.commit()
+
 
 class BronzeLoader:
-    def __init__(self):
+    """
+    Carga los archivos crudos en las tablas bronze.
+    Las tablas se cargan en paralelo (un hilo y una conexión del pool por tabla, cada una con su
+    propia transacción) y los archivos de publicaciones, proyectos y tesis se leen y verifican en un pool
+    de procesos.
+    """
+    # Tabla (clave del journal) -> endpoint del almacén crudo
+    ENDPOINTS = {
+        'unidades': 'unidades',
+        'academics': 'academicos',
+        'publications': 'publicaciones',
+        'projects': 'proyectos',
+        'theses': 'tesis',
+    }
+
+    def __init__(self, journal: Optional[JournalScope] = None):
         self.config = Config()
+        # Progreso por tabla para retomar con --resume (opcional)
+        self.journal = journal
         self.paths = self.config.paths
         self.logger = self._setup_logger()
         self.unidades_folder = Path(self.paths['unidades_raw_data'])
         self.profesores_folder = Path(self.paths['academics_raw_data'])
         self.publicaciones_folder = Path(self.paths['publications_raw_data'])
         self.proyectos_folder = Path(self.paths['projects_raw_data'])
+        self.tesis_folder = Path(self.paths['theses_raw_data'])
+        # Manifiesto del crawl: permite omitir archivos cuyo contenido ya se cargó
+        self.raw_store = RawStore()
         self.db_host = os.getenv('DB_HOST')
         self.db_name = os.getenv('DB_NAME')
         self.db_user = os.getenv('DB_USER')
         self.db_password = os.getenv('DB_PASSWORD')
+        loader_config = self.config.bronze_loader
+        self.max_workers = max(1, loader_config.get('max_workers', 1))
+        self.prepare_workers = loader_config.get('prepare_workers', 0)
+        # El proceso principal también trabaja (lee segmentos, arma lotes y los envía): el pool solo rinde con
+        # núcleos libres, y con uno solo el costo de pasar los datos entre procesos supera al del hash
+        available = max(0, (os.cpu_count() or 1) - 1)
+        if self.prepare_workers > available:
+            self.logger.info(f"prepare_workers reducido de {self.prepare_workers} a {available} ({os.cpu_count()} CPUs)")
+            self.prepare_workers = available
+        # file: un documento por académico y endpoint; record: una fila por publicación o proyecto
+        self.granularity = loader_config.get('granularity', 'file')
+        if self.granularity not in ('file', 'record'):
+            raise ValueError(f"Granularidad de carga desconocida: {self.granularity}")
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # Pool de procesos para preparar archivos; solo existe durante run_workflow
+        self._prepare_pool: Optional[Executor] = None
     
     def _setup_logger(self) -> logging.Logger:
         """Retorna el logger configurado"""
         return logging.getLogger('bronze_loader')
     
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Crea el pool de conexiones la primera vez que se necesita"""
+        with self._pool_lock:
+            if self._pool is None:
+                self.logger.info(f"Estableciendo pool de {self.max_workers} conexiones a la base de datos")
+                conn_string = f"host={self.db_host} dbname={self.db_name} user={self.db_user} password={self.db_password}"
+                self._pool = ThreadedConnectionPool(1, self.max_workers, conn_string)
+                self.logger.info("Conexión exitosa a la base de datos")
+            return self._pool
+
     @contextmanager
     def get_connection(self):
-        """Context manager para conexiones de base de datos"""
+        """Context manager que toma una conexión del pool y la devuelve al terminar"""
         conn = None
+        pool = None
         try:
-            self.logger.info("Estableciendo conexión a la base de datos")
-            conn_string = f"host={self.db_host} dbname={self.db_name} user={self.db_user} password={self.db_password}"
-            conn = psycopg2.connect(conn_string)
-            self.logger.info("Conexión exitosa a la base de datos")
+            pool = self._get_pool()
+            conn = pool.getconn()
             yield conn
         except Error as e:
             self.logger.error(f"Error al conectar a la base de datos: {e}")
@@ -44,8 +263,16 @@ class BronzeLoader:
             raise
         finally:
             if conn:
-                conn.close()
-                self.logger.info("Conexión cerrada")
+                # putconn hace rollback de cualquier transacción que haya quedado abierta
+                pool.putconn(conn)
+
+    def close(self) -> None:
+        """Cierra todas las conexiones del pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self.logger.info("Conexiones cerradas")
         
     def test_table_access(self, conn, table_name):
         """Testea que la tabla existe y tenemos permisos"""
@@ -60,200 +287,409 @@ class BronzeLoader:
         except Exception as e:
             self.logger.error(f"Error accediendo tabla bronze.{table_name}: {e}")
             return False    
+
+    @staticmethod
+    def table_exists(conn, table_name: str) -> bool:
+        """Indica si existe la tabla bronze.{table_name} (las agregadas después se crean con sql/bronze_tables.sql)"""
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", (f"bronze.{table_name}",))
+            return cursor.fetchone()[0] is not None
         
-    def load_unidades(self):
+    def _iter_file_rows(self, endpoint: str, build_row: Callable, pool: Optional[Executor] = None,
+                        ids: Optional[Iterable[Any]] = None) -> Iterator[Tuple[Any, tuple]]:
+        """
+        Recorre las entidades guardadas de un endpoint y prepara la fila de cada una
+
+        Args:
+            endpoint: Endpoint del almacén crudo (y del manifiesto, para omitir lo ya cargado)
+            build_row: Función (id, raw_json, total_resultado, archivo, record_hash) -> tupla de la fila
+            pool: Pool de procesos opcional donde leer (o descomprimir) y verificar los archivos
+            ids: Entidades a recorrer a medida que llegan (ver run_workflow); por defecto todas las guardadas
+
+        Yields:
+            Tuplas (id, fila)
+        """
+        for entity_id, raw_file, prepared in self._prepare_files(endpoint, self._pending_files(endpoint, ids=ids), pool):
+            if isinstance(prepared, Exception):
+                self.logger.error(f"Error leyendo {raw_file.name}: {prepared}")
+                continue
+            raw_json, record_hash, total = prepared
+            yield entity_id, build_row(entity_id, raw_json, total, raw_file, record_hash)
+
+    def _pending_files(self, endpoint: str, marker: str = 'loaded_hash',
+                       ids: Optional[Iterable[Any]] = None) -> Iterator[Tuple[int, Path]]:
+        """Entidades guardadas (o las de ids) cuyo contenido no se ha cargado, con su ruta en la estructura de archivos"""
+        for entity_id in self.raw_store.iter_ids(endpoint) if ids is None else ids:
+            raw_file = self.raw_store.path_for(endpoint, entity_id)
+            if not self.raw_store.needs_load(endpoint, entity_id, marker):
+                self.logger.info(f"Sin cambios desde la última carga, omitiendo {raw_file}")
+                continue
+            yield entity_id, raw_file
+
+    def _prepare_files(self, endpoint: str, files: Iterable[Tuple[int, Path]],
+                       pool: Optional[Executor]) -> Iterator[Tuple[int, Path, Any]]:
+        """
+        Lee y verifica los archivos (bytes canónicos y record_hash), en orden
+
+        Con pool se mantienen en vuelo a lo más 4 archivos por proceso para acotar la memoria. Con el
+        backend 'segments' el registro comprimido se lee por mmap en este proceso y la descompresión y
+        el hash se hacen en el pool; con 'files' el pool lee además el archivo.
+        Los errores de lectura se retornan como la excepción en lugar del resultado.
+        """
+        if pool is None:
+            for entity_id, raw_file in files:
+                try:
+                    yield entity_id, raw_file, self.raw_store.read_canonical(endpoint, entity_id)
+                except (OSError, ValueError) as e:
+                    yield entity_id, raw_file, e
+            return
+
+        window = deque()
+        max_in_flight = self.prepare_workers * 4
+        for entity_id, raw_file in files:
+            entry = self.raw_store.manifest.get(endpoint, entity_id) or {}
+            if self.raw_store.segments is None:
+                future = pool.submit(read_canonical_file, raw_file, entry.get('hash'), entry.get('total'))
+            else:
+                compressed = self.raw_store.read_compressed(endpoint, entity_id)
+                if compressed is None:
+                    yield entity_id, raw_file, FileNotFoundError(f"Sin registro para {endpoint} {entity_id}")
+                    continue
+                future = pool.submit(canonical_from_compressed, compressed, entry.get('hash'), entry.get('total'))
+            window.append((entity_id, raw_file, future))
+            if len(window) >= max_in_flight:
+                yield self._collect(*window.popleft())
+        while window:
+            yield self._collect(*window.popleft())
+
+    def _iter_record_rows(self, endpoint: str, pool: Optional[Executor] = None,
+                          ids: Optional[Iterable[Any]] = None) -> Iterator[Tuple[Any, tuple]]:
+        """
+        Recorre las entidades pendientes de un endpoint y produce una fila por registro (granularity: record)
+
+        Solo la última fila de cada entidad lleva su id, para que la entidad se marque como cargada
+        cuando el commit incluye todos sus registros.
+
+        Yields:
+            Tuplas (id o None, fila)
+        """
+        for entity_id, raw_file, records in self._prepare_records(endpoint, self._pending_files(endpoint, RECORDS_MARKER, ids), pool):
+            if isinstance(records, Exception):
+                self.logger.error(f"Error leyendo {raw_file.name}: {records}")
+                continue
+            if not records:
+                self.raw_store.mark_loaded(endpoint, entity_id, RECORDS_MARKER)
+                continue
+            last = len(records) - 1
+            for index, (record_id, raw_json, record_hash) in enumerate(records):
+                row = (entity_id, SOURCE_SYSTEM, record_id, raw_json, str(raw_file), record_hash)
+                yield (entity_id if index == last else None), row
+
+    def _prepare_records(self, endpoint: str, files: Iterable[Tuple[int, Path]],
+                         pool: Optional[Executor]) -> Iterator[Tuple[int, Path, Any]]:
+        """
+        Lee las entidades y separa sus registros (explode_records), en orden
+
+        El contenido se lee en este proceso con cualquier backend y, con pool, se parsea en el pool de
+        procesos con a lo más 4 entidades por proceso en vuelo; con el backend 'segments' se envía comprimido
+        y también se descomprime en el pool. Los errores se retornan como la excepción.
+        """
+        # Con pool y segmentos se envía el registro comprimido: menos bytes entre procesos y sin descomprimir aquí
+        compressed = pool is not None and self.raw_store.segments is not None
+        explode = explode_compressed_records if compressed else explode_records
+        window = deque()
+        for entity_id, raw_file in files:
+            if compressed:
+                raw = self.raw_store.read_compressed(endpoint, entity_id)
+            else:
+                raw = self.raw_store.read_bytes(endpoint, entity_id)
+            if raw is None:
+                yield entity_id, raw_file, FileNotFoundError(f"Sin registro para {endpoint} {entity_id}")
+                continue
+            if pool is None:
+                try:
+                    yield entity_id, raw_file, explode_records(endpoint, entity_id, raw)
+                except ValueError as e:
+                    yield entity_id, raw_file, e
+                continue
+            window.append((entity_id, raw_file, pool.submit(explode, endpoint, entity_id, raw)))
+            if len(window) >= self.prepare_workers * 4:
+                yield self._collect(*window.popleft())
+        while window:
+            yield self._collect(*window.popleft())
+
+    @staticmethod
+    def _collect(entity_id: int, raw_file: Path, future) -> Tuple[int, Path, Any]:
+        """Espera el resultado de un archivo preparado en el pool de procesos"""
+        try:
+            return entity_id, raw_file, future.result()
+        except (OSError, ValueError) as e:
+            return entity_id, raw_file, e
+
+    def _bulk_load(self, conn, table: str, columns: Sequence[str], endpoint: str,
+                   rows: Iterable[Tuple[Any, tuple]], marker: str = 'loaded_hash') -> bool:
+        """
+        Carga filas en bronze.{table} con el BulkWriter configurado
+
+        Los ids de cada lote se marcan como cargados en el manifiesto (campo marker) solo tras su commit.
+        Ante un error se hace rollback de los lotes pendientes de commit.
+        """
+        loader_config = self.config.bronze_loader
+        writer = BulkWriter(
+            conn,
+            table,
+            columns,
+            method=loader_config.get('method', 'copy'),
+            batch_size=loader_config.get('batch_size', 500),
+            commit_interval=loader_config.get('commit_interval', 10),
+            on_commit=lambda ids: [self.raw_store.mark_loaded(endpoint, entity_id, marker) for entity_id in ids],
+        )
+        try:
+            for entity_id, row in rows:
+                writer.add(row, key=entity_id)
+            writer.close()
+            self.logger.info(
+                f"Carga completada en bronze.{table}: {writer.rows} filas enviadas, {writer.inserted} nuevas, "
+                f"{writer.commits} commits"
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error al cargar datos en bronze.{table}: {str(e)}")
+            conn.rollback()
+            return False
+
+    def load_unidades(self, ids: Optional[Iterable[Any]] = None):
         """Carga unidades.json a bronze.unidades_raw"""
+        if ids is not None:
+            # Un único archivo: se carga cuando termina el flujo
+            for _ in ids:
+                pass
         self.logger.info("Cargando unidades desde JSON a la base de datos")
         
         with self.get_connection() as conn:
             if not self.test_table_access(conn, 'unidades_raw'):
                 return False
             
-            source_system = 'portafolio_academico'
-            file_name = os.path.join(self.unidades_folder, "unidades.json")
-            if not os.path.exists(file_name):
+            file_name = str(self.raw_store.path_for('unidades', RawStore.UNIDADES_ID))
+            if not self.raw_store.exists('unidades', RawStore.UNIDADES_ID):
                 self.logger.error(f"Archivo no encontrado: {file_name}")
                 return False
-            
-            raw_json = json.load(open(file_name, 'r', encoding='utf-8'))
-            # Calcular hash del JSON para detectar duplicados
-            record_hash = hashlib.sha256(json.dumps(raw_json, sort_keys=True).encode('utf-8')).hexdigest()
-            
-            try:
-                with conn.cursor() as cursor:
-                    # Insertar datos en la tabla bronze.unidades_raw
-                    insert_query = """
-                    INSERT INTO bronze.unidades_raw (source_system, raw_json, file_name, record_hash)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (record_hash) DO NOTHING;
-                    """
-                    cursor.execute(insert_query, (source_system, json.dumps(raw_json), file_name, record_hash))
-                conn.commit()
-                self.logger.info(f"Datos de unidades cargados exitosamente desde {file_name}")
+            if not self.raw_store.needs_load('unidades', RawStore.UNIDADES_ID):
+                self.logger.info(f"Unidades sin cambios desde la última carga, omitiendo {file_name}")
                 return True
-            except Exception as e:
-                self.logger.error(f"Error al cargar datos de unidades: {str(e)}")
-                conn.rollback()
-                return False
+            
+            raw_json, record_hash, _ = self.raw_store.read_canonical('unidades', RawStore.UNIDADES_ID)
+            rows = [(RawStore.UNIDADES_ID, (SOURCE_SYSTEM, raw_json, file_name, record_hash))]
+            return self._bulk_load(
+                conn, 'unidades_raw', ('source_system', 'raw_json', 'file_name', 'record_hash'), 'unidades', rows
+            )
     
-    def load_academics(self):
+    def load_academics(self, ids: Optional[Iterable[Any]] = None):
         """Carga académicos a bronze.academics_raw"""
         self.logger.info("Cargando académicos desde JSON a la base de datos")
         
         with self.get_connection() as conn:
             if not self.test_table_access(conn, 'academics_raw'):
                 return False
-            
-            for academic_file in self.profesores_folder.glob("*.json"):
-                if not academic_file.is_file():
-                    self.logger.error(f"Archivo no encontrado: {academic_file}")
-                    continue
-                unidad_id = academic_file.stem.split('_')[0]
-                if not unidad_id.isdigit():
-                    self.logger.error(f"ID de unidad inválido en el nombre del archivo: {academic_file}")
-                    continue
-                unidad_id = int(unidad_id)
-                with open(academic_file, 'r', encoding='utf-8') as f:
-                    raw_json = json.load(f)
-                # Calcular hash del JSON para detectar duplicados
-                record_hash = hashlib.sha256(json.dumps(raw_json, sort_keys=True).encode('utf-8')).hexdigest()
-                source_system = 'portafolio_academico'
-                file_name = str(academic_file)
 
-                try:
-                    with conn.cursor() as cursor:
-                        # Insertar datos en la tabla bronze.academics_raw
-                        insert_query = """
-                        INSERT INTO bronze.academics_raw (unidad_id, source_system, raw_json, file_name, record_hash)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (record_hash) DO NOTHING;
-                        """
-                        cursor.execute(insert_query, (unidad_id, source_system, json.dumps(raw_json), file_name, record_hash))
-                    conn.commit()
-                    self.logger.info(f"Datos de académicos cargados exitosamente desde {file_name}")
-                except Exception as e:
-                    self.logger.error(f"Error al cargar datos de académicos: {str(e)}")
-                    conn.rollback()
-                    return False
-            return True
+            rows = self._iter_file_rows(
+                'academicos',
+                lambda unidad_id, raw_json, total, raw_file, record_hash: (
+                    unidad_id, SOURCE_SYSTEM, raw_json, str(raw_file), record_hash
+                ),
+                ids=ids,
+            )
+            return self._bulk_load(
+                conn, 'academics_raw', ('unidad_id', 'source_system', 'raw_json', 'file_name', 'record_hash'),
+                'academicos', rows
+            )
     
-    def load_publications(self):
-        """Carga publicaciones a bronze.publications_raw"""
+    def _load_records(self, table: str, endpoint: str, ids: Optional[Iterable[Any]] = None) -> bool:
+        """Carga los registros de un endpoint en bronze.{table}, uno por fila (granularity: record)"""
+        self.logger.info(f"Cargando {endpoint} por registro a bronze.{table}")
+
+        with self.get_connection() as conn:
+            if not self.table_exists(conn, table):
+                # La granularidad por registro se elige explícitamente: sin su tabla es un error, no se omite
+                self.logger.error(f"La tabla bronze.{table} no existe: créela con sql/bronze_tables.sql "
+                                  f"o use bronze_loader.granularity: file")
+                return False
+            if not self.test_table_access(conn, table):
+                return False
+
+            return self._bulk_load(
+                conn, table,
+                ('academic_id', 'source_system', 'record_id', 'raw_json', 'file_name', 'record_hash'),
+                endpoint, self._iter_record_rows(endpoint, pool=self._prepare_pool, ids=ids), marker=RECORDS_MARKER
+            )
+
+    def load_publications(self, ids: Optional[Iterable[Any]] = None):
+        """Carga publicaciones a bronze.publications_raw (o bronze.publication_records_raw por registro)"""
+        if self.granularity == 'record':
+            return self._load_records('publication_records_raw', 'publicaciones', ids)
         self.logger.info("Cargando publicaciones desde JSON a la base de datos")
         
         with self.get_connection() as conn:
             if not self.test_table_access(conn, 'publications_raw'):
                 return False
-            
-            for publication_file in self.publicaciones_folder.glob("*.json"):
-                if not publication_file.is_file():
-                    self.logger.error(f"Archivo no encontrado: {publication_file}")
-                    continue
-                #obtener el ID de la unidad desde el nombre del archivo raw_data\academics\420_academicos_raw.json
-                academic_id = publication_file.stem.split('_')[0]
-                if not academic_id.isdigit():
-                    self.logger.error(f"ID de unidad inválido en el nombre del archivo: {publication_file}")
-                    continue
-                #transformar unidad_id a entero
-                academic_id = int(academic_id)
-                with open(publication_file, 'r', encoding='utf-8') as f:
-                    raw_json = json.load(f)
-                # Calcular hash del JSON para detectar duplicados
-                record_hash = hashlib.sha256(json.dumps(raw_json, sort_keys=True).encode('utf-8')).hexdigest()
-                source_system = 'portafolio_academico'
-                file_name = str(publication_file)
-                int_total_publications = raw_json.get('total_resultado', 0)
 
-                try:
-                    with conn.cursor() as cursor:
-                        # Insertar datos en la tabla bronze.publications_raw
-                        insert_query = """
-                        INSERT INTO bronze.publications_raw (academic_id, source_system, total_publications, raw_json, file_name, record_hash)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (record_hash) DO NOTHING;
-                        """
-                        cursor.execute(insert_query, (academic_id, source_system, int_total_publications, json.dumps(raw_json), file_name, record_hash))
-                    conn.commit()
-                    self.logger.info(f"Datos de publicaciones cargados exitosamente desde {file_name}")
-                except Exception as e:
-                    self.logger.error(f"Error al cargar datos de publicaciones: {str(e)}")
-                    conn.rollback()
-                    return False
-            return True
+            rows = self._iter_file_rows(
+                'publicaciones',
+                lambda academic_id, raw_json, total, raw_file, record_hash: (
+                    academic_id, SOURCE_SYSTEM, total or 0, raw_json, str(raw_file), record_hash
+                ),
+                pool=self._prepare_pool,
+                ids=ids,
+            )
+            return self._bulk_load(
+                conn, 'publications_raw',
+                ('academic_id', 'source_system', 'total_publications', 'raw_json', 'file_name', 'record_hash'),
+                'publicaciones', rows
+            )
     
-    def load_projects(self):
-        """Carga proyectos a bronze.projects_raw"""
+    def load_projects(self, ids: Optional[Iterable[Any]] = None):
+        """Carga proyectos a bronze.projects_raw (o bronze.project_records_raw por registro)"""
+        if self.granularity == 'record':
+            return self._load_records('project_records_raw', 'proyectos', ids)
         self.logger.info("Iniciando carga de proyectos")
         
         with self.get_connection() as conn:
             # Verificar archivos antes de procesar
-            files = list(self.proyectos_folder.glob("*.json"))
-            if not files:
+            if ids is None and not any(self.raw_store.iter_ids('proyectos')):
                 self.logger.warning(f"No se encontraron archivos JSON en: {self.proyectos_folder}")
                 return False
             
             if not self.test_table_access(conn, 'projects_raw'):
                 return False
-            
-            self.logger.info(f"Procesando {len(files)} archivos de proyectos")
-            processed_count = 0
-            
-            try:
-                for i, project_file in enumerate(files, 1):
-                    try:
-                        # Extraer academic_id
-                        academic_id = project_file.stem.split('_')[0]
-                        if not academic_id.isdigit():
-                            self.logger.error(f"ID inválido: {project_file.name}")
-                            continue
-                        
-                        academic_id = int(academic_id)
-                        
-                        with open(project_file, 'r', encoding='utf-8') as f:
-                            raw_json = json.load(f)
-                        
-                        # Preparar datos
-                        record_hash = hashlib.sha256(json.dumps(raw_json, sort_keys=True).encode('utf-8')).hexdigest()
-                        source_system = 'portafolio_academico'
-                        total_projects = raw_json.get('total_resultado', 0)
-                        
-                        # Insertar en BD
-                        with conn.cursor() as cursor:
-                            insert_query = """
-                            INSERT INTO bronze.projects_raw (academic_id, source_system, total_projects, raw_json, file_name, record_hash)
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (record_hash) DO NOTHING;
-                            """
-                            cursor.execute(insert_query, (academic_id, source_system, total_projects, json.dumps(raw_json), str(project_file), record_hash))
-                        
-                        processed_count += 1
-                        self.logger.info(f"Procesado [{i}/{len(files)}]: {project_file.name} - Académico {academic_id}")
-                        
-                    except Exception as e:
-                        self.logger.error(f"Error procesando {project_file.name}: {e}")
-                        # Continúa con el siguiente archivo sin romper todo
-                        continue
-                
-                # Commit final de todos los inserts
-                conn.commit()
-                self.logger.info(f"Carga completada: {processed_count} archivos procesados exitosamente")
-                return True
-            
-            except Exception as e:
-                self.logger.error(f"Error crítico en carga de proyectos: {e}")
-                conn.rollback()
+
+            rows = self._iter_file_rows(
+                'proyectos',
+                lambda academic_id, raw_json, total, raw_file, record_hash: (
+                    academic_id, SOURCE_SYSTEM, total or 0, raw_json, str(raw_file), record_hash
+                ),
+                pool=self._prepare_pool,
+                ids=ids,
+            )
+            return self._bulk_load(
+                conn, 'projects_raw',
+                ('academic_id', 'source_system', 'total_projects', 'raw_json', 'file_name', 'record_hash'),
+                'proyectos', rows
+            )
+
+    def load_theses(self, ids: Optional[Iterable[Any]] = None):
+        """
+        Carga tesis a bronze.theses_raw
+
+        Returns:
+            None si la tabla no existe (la carga se omite sin fallar el estado)
+        """
+        self.logger.info("Iniciando carga de tesis")
+
+        with self.get_connection() as conn:
+            if not self.table_exists(conn, 'theses_raw'):
+                self.logger.warning("La tabla bronze.theses_raw no existe: se omite la carga de tesis "
+                                    "(créela con sql/bronze_tables.sql)")
+                return None
+
+            if ids is None and not any(self.raw_store.iter_ids('tesis')):
+                self.logger.warning(f"No se encontraron archivos JSON en: {self.tesis_folder}")
                 return False
 
-    def run_workflow(self):
-        """Ejecuta el flujo de trabajo de carga de datos"""
+            if not self.test_table_access(conn, 'theses_raw'):
+                return False
+
+            rows = self._iter_file_rows(
+                'tesis',
+                lambda academic_id, raw_json, total, raw_file, record_hash: (
+                    academic_id, SOURCE_SYSTEM, total or 0, raw_json, str(raw_file), record_hash
+                ),
+                pool=self._prepare_pool,
+                ids=ids,
+            )
+            return self._bulk_load(
+                conn, 'theses_raw',
+                ('academic_id', 'source_system', 'total_theses', 'raw_json', 'file_name', 'record_hash'),
+                'tesis', rows
+            )
+
+    @staticmethod
+    def _drain(ids: Iterable[Any]) -> bool:
+        """Consume un flujo de ids sin cargarlos"""
+        for _ in ids:
+            pass
+        return True
+
+    def _load_stream(self, load: Callable[[Iterable[Any]], bool], ids: Iterable[Any]) -> bool:
+        """Carga una tabla desde un flujo de ids y consume lo que quede si la carga termina antes"""
+        ids = iter(ids)
+        try:
+            return load(ids)
+        finally:
+            self._drain(ids)
+
+    def run_workflow(self, streams: Optional[Dict[str, Iterable[Any]]] = None):
+        """
+        Ejecuta el flujo de trabajo de carga de datos
+
+        Las tablas son independientes: cada una se carga en su propio hilo con una conexión del pool
+        y conserva su transacción; los errores se reportan por tabla.
+
+        Args:
+            streams: Por endpoint, ids de las entidades a cargar a medida que se descargan (main.py
+                --pipelined). Cada flujo se consume hasta el final aunque su tabla se omita o falle,
+                para no detener al estado que lo produce.
+        """
         try:
             self.logger.info("Iniciando flujo de trabajo de carga de datos")
-            # Aquí puedes llamar a los métodos de carga con los archivos correspondientes
-            # Por ejemplo:
-            self.load_unidades()
-            self.load_academics()
-            self.load_publications()
-            self.load_projects()
+            streams = streams or {}
+            loaders = {
+                'unidades': self.load_unidades,
+                'academics': self.load_academics,
+                'publications': self.load_publications,
+                'projects': self.load_projects,
+                'theses': self.load_theses,
+            }
+            pendientes = {}
+            for table, load in loaders.items():
+                ids = streams.get(self.ENDPOINTS[table])
+                if self.journal and self.journal.is_done(table):
+                    self.logger.info(f"Tabla {table} cargada en la ejecución anterior, omitiendo...")
+                    if ids is not None:
+                        pendientes[table] = partial(self._drain, ids)
+                    continue
+                pendientes[table] = partial(self._load_stream, load, ids) if ids is not None else load
+            if streams:
+                # Cada tabla con flujo ocupa su hilo y su conexión hasta que el flujo termina
+                self.max_workers = max(self.max_workers, len(pendientes))
+
+            if self.prepare_workers > 0:
+                self._prepare_pool = ProcessPoolExecutor(max_workers=self.prepare_workers)
+            resultados: Dict[str, bool] = {}
+            try:
+                with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bronze') as executor:
+                    futures = {table: executor.submit(load) for table, load in pendientes.items()}
+                    for table, future in futures.items():
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Error cargando la tabla {table}: {str(e)}")
+                            result = False
+                        # None: tabla opcional omitida; no falla el estado ni queda como cargada en el journal
+                        resultados[table] = result is None or bool(result)
+                        if result and self.journal:
+                            self.journal.mark_done(table)
+            finally:
+                if self._prepare_pool is not None:
+                    self._prepare_pool.shutdown()
+                    self._prepare_pool = None
+                self.raw_store.save()
+                self.close()
+
+            fallidas = [table for table, ok in resultados.items() if not ok]
+            if fallidas:
+                # El estado queda pendiente: con --resume solo se reintentan estas tablas
+                self.logger.error(f"Tablas con errores: {', '.join(fallidas)}")
+                return False
             self.logger.info("Flujo de trabajo completado exitosamente")
             return True
         except Exception as e:
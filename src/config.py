@@ -1,4 +1,5 @@
 from pathlib import Path
+import os
 import yaml
 from typing import Any, Dict
 
@@ -13,8 +14,8 @@ class Config:
         return cls._instance
     
     def _load_config(self) -> None:
-        """Carga la configuración desde YAML"""
-        config_path = Path(__file__).parent / "config.yaml"
+        """Carga la configuración desde YAML (PORTAFOLIO_CONFIG permite usar otro archivo)"""
+        config_path = Path(os.getenv('PORTAFOLIO_CONFIG') or Path(__file__).parent / "config.yaml")
         with open(config_path, 'r', encoding='utf-8') as f:
             self._config = yaml.safe_load(f)
             
@@ -48,6 +49,62 @@ class Config:
     def pagination(self) -> Dict[str, int]:
         return self._config['pagination']
 
+    @property
+    def incremental(self) -> Dict[str, Any]:
+        return self._config.get('incremental', {})
+
+    @property
+    def journal(self) -> Dict[str, Any]:
+        return self._config.get('journal', {})
+
+    @property
+    def bronze_loader(self) -> Dict[str, Any]:
+        return self._config.get('bronze_loader', {})
+
+    @property
+    def storage(self) -> Dict[str, Any]:
+        return self._config.get('storage', {})
+
+    @property
+    def cache(self) -> Dict[str, Any]:
+        return self._config.get('cache', {})
+
+    @property
+    def adaptive(self) -> Dict[str, Any]:
+        return self._config.get('adaptive', {})
+
+    @property
+    def deadlines(self) -> Dict[str, Any]:
+        return self._config.get('deadlines', {})
+
+    @property
+    def hedging(self) -> Dict[str, Any]:
+        return self._config.get('hedging', {})
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return self._config.get('metrics', {})
+
+    @property
+    def profiling(self) -> Dict[str, Any]:
+        return self._config.get('profiling', {})
+
+    @property
+    def roster_index(self) -> Dict[str, Any]:
+        return self._config.get('roster_index', {})
+
+    @property
+    def work_queue(self) -> Dict[str, Any]:
+        return self._config.get('work_queue', {})
+
+    @property
+    def processed(self) -> Dict[str, Any]:
+        return self._config.get('processed', {})
+
+    @property
+    def pipeline(self) -> Dict[str, Any]:
+        return self._config.get('pipeline', {})
+
 # Ejemplo de uso:
 if __name__ == "__main__":
     config = Config()
@@ -0,0 +1,77 @@
+import csv
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+
+class QueuedCsvWriter:
+    """
+    Escribe un CSV desde un hilo propio alimentado por una cola acotada de lotes de filas.
+    Quien produce las filas (el hilo que despacha las requests) solo encola: la escritura en disco
+    no lo detiene salvo que la cola se llene, lo que acota la memoria si el disco es más lento que la red.
+    El archivo se escribe como <archivo>.tmp y reemplaza al anterior solo al cerrar sin errores.
+    Se usa como context manager.
+    """
+    _STOP = object()
+
+    def __init__(self, path: Path, header: Sequence[str], max_pending: int = 1000):
+        self.path = Path(path)
+        self.header = list(header)
+        self.rows = 0
+        self.logger = logging.getLogger('csv_writer')
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'QueuedCsvWriter':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"csv-{self.path.stem}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop()
+        if exc_type is not None or self._error is not None:
+            # El CSV anterior, si existe, se conserva
+            self._tmp_path.unlink(missing_ok=True)
+            if exc_type is None:
+                raise OSError(f"Error escribiendo {self.path}: {self._error}") from self._error
+            return
+        os.replace(self._tmp_path, self.path)
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Encola un lote de filas; solo espera si la cola está llena"""
+        if self._error is not None:
+            raise OSError(f"Error escribiendo {self.path}: {self._error}") from self._error
+        if rows:
+            self._queue.put(rows)
+
+    def _stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Hilo escritor: vacía la cola hasta recibir _STOP"""
+        try:
+            with open(self._tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.header)
+                while True:
+                    rows = self._queue.get()
+                    if rows is self._STOP:
+                        return
+                    writer.writerows(rows)
+                    self.rows += len(rows)
+        except Exception as e:
+            # OSError del disco, csv.Error o TypeError de una fila inválida: se informa al cerrar o al encolar
+            self.logger.error(f"Error escribiendo {self._tmp_path}: {str(e)}")
+            self._error = e
+            # Se sigue vaciando la cola para no bloquear a quien produce las filas
+            while self._queue.get() is not self._STOP:
+                pass
@@ -0,0 +1,36 @@
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    Instante límite para terminar un trabajo (una tarea o un estado completo).
+    Sin plazo (seconds None o 0) nunca vence. Se usa para acotar el timeout de cada
+    request y las esperas entre reintentos al tiempo que queda.
+    """
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    @classmethod
+    def earliest(cls, *deadlines: Optional['Deadline']) -> 'Deadline':
+        """El plazo que vence primero entre los dados (los None se ignoran)"""
+        result = cls()
+        for deadline in deadlines:
+            if deadline is not None and deadline.expires_at is not None:
+                if result.expires_at is None or deadline.expires_at < result.expires_at:
+                    result.expires_at = deadline.expires_at
+        return result
+
+    def remaining(self) -> Optional[float]:
+        """Segundos restantes (0 si ya venció); None si no hay plazo"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, seconds: float) -> float:
+        """Acota una espera o un timeout al tiempo restante"""
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
@@ -0,0 +1,119 @@
+import base64
+import binascii
+import json
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # Backend JSON opcional: si no está instalado se usa json de la librería estándar
+    orjson = None
+
+# orjson convierte a float los enteros de más de 64 bits. Para detectarlos sin un regex se
+# mapea cada dígito a '0' y el resto a ' ' (translate es C puro) y se busca una tira de 19 ceros;
+# los falsos positivos (decimales largos, dígitos dentro de strings) solo caen al backend json.
+_DIGIT_MASK = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+_LONG_DIGIT_RUN = b'0' * 19
+
+
+class DecodeError(ValueError):
+    """La respuesta no se pudo decodificar (base64, UTF-8 o JSON inválido)"""
+
+
+def _decode_reference_strict(encoded_text: str) -> Any:
+    """Pasos de decode_response_reference, propagando el error en lugar de retornar {}"""
+    reversed_str = encoded_text[::-1]
+    decoded_bytes = base64.b64decode(reversed_str)
+    decoded_str = decoded_bytes.decode('utf-8')
+    return json.loads(urllib.parse.unquote(decoded_str))
+
+
+def decode_response_reference(encoded_text: str) -> Any:
+    """
+    Decodificación original de la API: invertir, base64, UTF-8, unquote y json.loads.
+    Se conserva como referencia de comportamiento y para los benchmarks.
+    """
+    try:
+        return _decode_reference_strict(encoded_text)
+    except Exception as e:
+        print(f"Error decodificando respuesta: {e}")
+        return {}
+
+
+def loads_bytes(data: bytes) -> Any:
+    """json.loads sobre bytes UTF-8 estrictos, con orjson si está disponible"""
+    if orjson is not None and _LONG_DIGIT_RUN not in data.translate(_DIGIT_MASK):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN, 1e400, surrogates sueltos: json los acepta, orjson no
+            pass
+    return json.loads(data.decode('utf-8'))
+
+
+def decode_response(encoded_text: str) -> Any:
+    """
+    Decodificación optimizada de la API, con el mismo resultado que decode_response_reference
+
+    - a2b_base64 acepta el str ASCII directamente (sin la copia de encode('ascii'))
+    - el unquote se hace sobre bytes y solo si hay algún '%'
+    - el JSON se parsea directo desde bytes, sin materializar el str intermedio
+
+    Si los bytes no son UTF-8 válido o el JSON no se puede parsear se recurre a los pasos de la
+    implementación de referencia (que reemplaza las secuencias % inválidas). A diferencia de esta,
+    un cuerpo que no se puede decodificar no se convierte en {}: se lanza DecodeError, para que
+    APIClient lo reintente y no lo guarde en la caché.
+
+    Raises:
+        DecodeError: si la respuesta no se puede decodificar
+    """
+    try:
+        decoded_bytes = binascii.a2b_base64(encoded_text[::-1])
+        if b'%' in decoded_bytes:
+            decoded_bytes = urllib.parse.unquote_to_bytes(decoded_bytes)
+        return loads_bytes(decoded_bytes)
+    except ValueError:
+        pass
+    try:
+        return _decode_reference_strict(encoded_text)
+    except Exception as e:
+        raise DecodeError(f"Respuesta no decodificable ({len(encoded_text)} caracteres): {e}") from None
+
+
+def encode_response(data: Any) -> str:
+    """
+    Codifica datos en el formato de la API (inverso de decode_response).
+    Usado por los benchmarks y el servidor de pruebas.
+    """
+    text = json.dumps(data, ensure_ascii=False).replace('%', '%25')
+    return base64.b64encode(text.encode('utf-8')).decode('ascii')[::-1]
+
+
+class DecodePool:
+    """
+    Pool de procesos para decodificar respuestas fuera de los hilos de red.
+    Con workers <= 0 decodifica en el mismo hilo.
+    """
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        )
+
+    def decode(self, encoded_text: str) -> Any:
+        """
+        Decodifica una respuesta, en el pool de procesos si está habilitado
+
+        Raises:
+            DecodeError: si la respuesta no se puede decodificar
+        """
+        if self._executor is None:
+            return decode_response(encoded_text)
+        return self._executor.submit(decode_response, encoded_text).result()
+
+    def close(self) -> None:
+        """Libera los procesos del pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,92 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class ConcurrentFetcher:
+    """
+    Ejecuta una lista de tareas por académico con concurrencia acotada.
+    El ritmo de requests lo controla el rate limiter del APIClient; este motor solo
+    limita cuántas tareas están en vuelo a la vez.
+    """
+    # Una fuente de tareas que espera datos (por ejemplo un flujo entre estados) produce IDLE cuando
+    # aún no tiene la siguiente tarea: run() entrega los resultados ya terminados y vuelve a pedir
+    IDLE = object()
+
+    def __init__(self, max_workers: int, progress_every: int = 10, name: str = 'fetch_engine'):
+        self.max_workers = max(1, max_workers)
+        self.progress_every = max(1, progress_every)
+        self.logger = logging.getLogger(name)
+
+    def run(
+        self,
+        tasks: Iterable[T],
+        worker: Callable[[T], R],
+        on_result: Optional[Callable[[T, R], None]] = None,
+        total: Optional[int] = None,
+        keep_results: bool = True,
+    ) -> List[Tuple[T, Optional[R]]]:
+        """
+        Ejecuta worker(tarea) para cada tarea
+
+        Args:
+            tasks: Tareas a ejecutar (se consumen de forma perezosa; pueden incluir IDLE)
+            worker: Función que procesa una tarea
+            on_result: Callback invocado en el hilo principal al terminar cada tarea
+            total: Total de tareas, solo para el log de progreso
+            keep_results: Con False los resultados solo se entregan a on_result y no se acumulan
+                (memoria constante con muchas tareas)
+
+        Returns:
+            Lista de (tarea, resultado); el resultado es None si la tarea lanzó excepción
+        """
+        results: List[Tuple[T, Optional[R]]] = []
+        completed = 0
+        # Ventana de envío acotada para no materializar todas las tareas en el executor
+        window = self.max_workers * 2
+        total_str = f"/{total}" if total is not None else ""
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fetch') as executor:
+            pending = {}
+            task_iter = iter(tasks)
+            exhausted = False
+
+            while pending or not exhausted:
+                idle = False
+                while not exhausted and len(pending) < window:
+                    try:
+                        task = next(task_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if task is self.IDLE:
+                        idle = True
+                        break
+                    pending[executor.submit(worker, task)] = task
+
+                if not pending:
+                    if idle:
+                        continue
+                    break
+
+                done, _ = wait(pending, timeout=0 if idle else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error ejecutando tarea {task}: {str(e)}")
+                        result = None
+                    completed += 1
+                    if keep_results:
+                        results.append((task, result))
+                    if on_result is not None:
+                        on_result(task, result)
+                    if completed % self.progress_every == 0:
+                        self.logger.info(f"Progreso: {completed}{total_str} tareas completadas")
+
+        return results
+
@@ -0,0 +1,227 @@
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from pathlib import Path
+import logging
+import sys
+import time
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+from api_client import APIClient
+from config import Config
+from raw_store import RawStore
+from fetch_engine import ConcurrentFetcher
+from get_publicaciones import PublicacionesScraper
+from get_projects import ProyectosScraper
+from get_tesis import TesisScraper
+from roster import RosterIndex
+from run_journal import JournalScope
+from work_queue import WorkQueue, default_worker_id, shard_of
+
+
+class PorAcademicoScraper:
+    """
+    Etapa fusionada por académico: recorre el roster una sola vez y, para cada id_persona,
+    lanza juntas las requests de publicaciones, proyectos y tesis, escribiendo los tres archivos crudos.
+
+    Para repartir el trabajo entre procesos, con shard=(i, n) solo se recorren los académicos del
+    shard i de n, y con queue se toman por lotes de la cola compartida (ver work_queue).
+    """
+    ENDPOINTS = ('publicaciones', 'proyectos', 'tesis')
+
+    def __init__(self, api_client: Optional[APIClient] = None, journal: Optional[JournalScope] = None,
+                 shard: Optional[Tuple[int, int]] = None, queue: Optional[WorkQueue] = None,
+                 worker_id: Optional[str] = None):
+        self.config = Config()
+        # Progreso por académico y endpoint para retomar con --resume (opcional)
+        self.journal = journal
+        self.shard = shard
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        # Con cola: requests pendientes por académico tomado y académicos terminados aún no informados
+        self._remaining: Dict[int, int] = {}
+        self._finished: List[int] = []
+        self.api_client = api_client or APIClient()
+        self.raw_store = RawStore()
+        self.logger = self._setup_logger()
+        self.publicaciones_scraper = PublicacionesScraper(api_client=self.api_client)
+        self.proyectos_scraper = ProyectosScraper(api_client=self.api_client)
+        self.tesis_scraper = TesisScraper(api_client=self.api_client)
+        self.fetchers = {
+            'publicaciones': self.publicaciones_scraper.get_publicaciones,
+            'proyectos': self.proyectos_scraper.get_proyectos,
+            'tesis': self.tesis_scraper.get_tesis,
+        }
+        # Tareas terminadas en la última ejecución de run_workflow
+        self.completed = 0
+        # on_entity(endpoint, id_persona) por cada respuesta disponible en raw_data (ver run_workflow)
+        self._on_entity: Optional[Callable[[str, int], None]] = None
+        self.fetcher = ConcurrentFetcher(
+            max_workers=self.api_client.max_in_flight,
+            progress_every=self.config.scraping_config['batch_size'],
+            name='por_academico_scraper'
+        )
+
+    def _setup_logger(self) -> logging.Logger:
+        """Retorna el logger configurado"""
+        return logging.getLogger('por_academico_scraper')
+
+    def _iter_roster(self) -> Iterator[Tuple[int, str]]:
+        """Académicos del índice del roster, solo los del shard propio si hay shard"""
+        roster = RosterIndex.default()
+        if self.raw_store.worker is None:
+            roster.ensure(self.raw_store, self.logger)
+        elif roster.generation() is None:
+            # Un worker no construye el índice: lo publica el coordinador al terminar PROFESORES
+            raise RuntimeError("El índice del roster no está publicado: ejecute antes el coordinador hasta PROFESORES")
+        for id_persona, nombre_completo in roster.iter_academicos():
+            if self.shard is None or shard_of(id_persona, self.shard[1]) == self.shard[0]:
+                yield id_persona, nombre_completo
+
+    def _iter_queue(self) -> Iterator[Tuple[int, str]]:
+        """Académicos tomados de la cola compartida, por lotes, hasta que no quedan pendientes"""
+        claim_batch = self.config.work_queue.get('claim_batch', 5)
+        while True:
+            self._report_finished()
+            batch = self.queue.claim(self.worker_id, claim_batch)
+            if not batch:
+                return
+            yield from batch
+
+    def _report_finished(self) -> None:
+        """Informa a la cola los académicos cuyas tres requests terminaron"""
+        if self.queue is not None and self._finished:
+            self.queue.complete(self.worker_id, self._finished)
+            self._finished = []
+
+    def iter_tasks(self, academicos: Optional[Iterable[Tuple[int, str]]] = None) -> Iterator[Tuple[int, str, str]]:
+        """
+        Produce las tareas (id_persona, nombre, endpoint) a partir del índice del roster, donde cada
+        académico aparece una sola vez aunque pertenezca a varias unidades. Las tres requests de un
+        académico quedan contiguas para que se ejecuten juntas, y las primeras se despachan apenas
+        se leen del índice.
+
+        Args:
+            academicos: Pares (id_persona, nombre) sin repetir que reemplazan al índice (main.py --pipelined);
+                los ConcurrentFetcher.IDLE se entregan tal cual al motor
+        """
+        if academicos is None:
+            academicos = self._iter_queue() if self.queue is not None else self._iter_roster()
+        for academico in academicos:
+            if academico is ConcurrentFetcher.IDLE:
+                yield academico
+                continue
+            id_persona, nombre_completo = academico
+            endpoints = []
+            for endpoint in self.ENDPOINTS:
+                if self.journal and self.journal.is_done(f"{endpoint}:{id_persona}"):
+                    self._notify(endpoint, id_persona)
+                    continue
+                if self.raw_store.is_fresh(endpoint, id_persona):
+                    self.logger.info(f"Archivo de {endpoint} ya existe para {nombre_completo}, omitiendo...")
+                    self._notify(endpoint, id_persona)
+                    continue
+                endpoints.append(endpoint)
+            if self.queue is not None:
+                if endpoints:
+                    self._remaining[id_persona] = len(endpoints)
+                else:
+                    self._finished.append(id_persona)
+            for endpoint in endpoints:
+                yield id_persona, nombre_completo, endpoint
+
+    def _fetch_task(self, tarea: Tuple[int, str, str]) -> List[Dict[str, Any]]:
+        """Tarea ejecutada por el motor concurrente para un académico y endpoint"""
+        id_persona, nombre_completo, endpoint = tarea
+        self.logger.info(f"Obteniendo {endpoint} para {nombre_completo} (ID: {id_persona})")
+        registros = self.fetchers[endpoint](id_persona)
+        # Solo cuenta como terminada si la respuesta quedó guardada
+        if self.journal and self.raw_store.is_fresh(endpoint, id_persona):
+            self.journal.mark_done(f"{endpoint}:{id_persona}")
+        return registros
+
+    def _notify(self, endpoint: str, id_persona: int) -> None:
+        """Avisa a on_entity que la respuesta de un académico y endpoint está en raw_data"""
+        if self._on_entity is not None and self.raw_store.exists(endpoint, id_persona):
+            self._on_entity(endpoint, id_persona)
+
+    def _log_result(self, tarea: Tuple[int, str, str], registros: List[Dict[str, Any]]) -> None:
+        """Registra el resultado de una tarea terminada"""
+        id_persona, nombre_completo, endpoint = tarea
+        self.completed += 1
+        self._notify(endpoint, id_persona)
+        if id_persona in self._remaining:
+            self._remaining[id_persona] -= 1
+            if not self._remaining[id_persona]:
+                # Las requests fallidas no se reintentan en la cola: quedan para la ejecución del coordinador
+                del self._remaining[id_persona]
+                self._finished.append(id_persona)
+        if registros:
+            self.logger.info(f"Se encontraron {len(registros)} {endpoint} para {nombre_completo}")
+        else:
+            self.logger.info(f"No se encontraron {endpoint} para {nombre_completo}")
+
+    def _run_queue(self) -> None:
+        """
+        Ejecuta rondas sobre la cola compartida hasta vaciarla. Si al terminar una ronda otros workers
+        aún tienen académicos tomados, espera por si su lease vence (worker muerto) para retomarlos.
+        """
+        roster = RosterIndex.default()
+        generation = roster.generation()
+        if generation is None:
+            raise RuntimeError("El índice del roster no está publicado: ejecute antes el coordinador hasta PROFESORES")
+        self.queue.fill(roster.iter_academicos(), generation)
+        settings = self.config.work_queue
+        with self.queue.heartbeat(self.worker_id, settings.get('heartbeat_seconds', 60)):
+            try:
+                while True:
+                    self.fetcher.run(self.iter_tasks(), self._fetch_task, on_result=self._log_result, keep_results=False)
+                    self._report_finished()
+                    wait = self.queue.next_expiry(self.worker_id)
+                    if wait is None:
+                        break
+                    time.sleep(min(max(wait, 0.1), settings.get('poll_seconds', 1)))
+            finally:
+                self._report_finished()
+                # Lo tomado y no terminado (error o plazo vencido) vuelve a la cola para otro worker
+                self.queue.release(self.worker_id)
+                self._remaining = {}
+        self.logger.info(f"Cola de trabajo: {self.queue.counts()}")
+
+    def run_workflow(self, academicos: Optional[Iterable[Tuple[int, str]]] = None,
+                     on_entity: Optional[Callable[[str, int], None]] = None) -> bool:
+        """
+        Ejecuta la etapa por académico para publicaciones, proyectos y tesis
+
+        Args:
+            academicos: Académicos a medida que llegan, en lugar del índice del roster (ver iter_tasks)
+            on_entity: Se llama con (endpoint, id_persona) por cada respuesta descargada o ya vigente en
+                raw_data, desde el hilo que despacha las requests
+        """
+        try:
+            self.logger.info(f"Ejecutando requests por académico ({', '.join(self.ENDPOINTS)}) mientras se lee el roster")
+            self.completed = 0
+            self._on_entity = on_entity
+            if self.queue is None:
+                self.fetcher.run(self.iter_tasks(academicos), self._fetch_task, on_result=self._log_result,
+                                 keep_results=False)
+            else:
+                self._run_queue()
+            self.logger.info(f"{self.completed} requests por académico ejecutadas")
+            self.raw_store.save()
+            self.logger.info("Flujo de trabajo completado exitosamente")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error en el flujo de trabajo: {str(e)}")
+            return False
+        finally:
+            self._on_entity = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
+    scraper = PorAcademicoScraper()
+    scraper.run_workflow()
@@ -1,23 +1,27 @@
-import requests
 import json
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Optional
 from pathlib import Path
 import logging
-import time
 # Agregar el directorio raíz del proyecto al path de Python
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 from api_client import APIClient
 from config import Config
+from raw_store import RawStore
+from run_journal import JournalScope
+from roster import RosterIndex
 
 
 class ScraperAcademicos:
-    def __init__(self):
+    def __init__(self, api_client: Optional[APIClient] = None, journal: Optional[JournalScope] = None):
         self.config = Config()
+        # Progreso por unidad para retomar con --resume (opcional)
+        self.journal = journal
         self.logger = self._setup_logger()
-        self.api_client = APIClient()
-        self.unidades_file = Path(self.config.paths['unidades_raw_data']) / "unidades.json"
+        self.api_client = api_client or APIClient()
+        self.raw_store = RawStore()
+        self.unidades_file = self.raw_store.path_for('unidades', RawStore.UNIDADES_ID)
 
     def _setup_logger(self) -> logging.Logger:
         """Retorna el logger configurado"""
@@ -34,41 +38,20 @@ class ScraperAcademicos:
             Dict con los datos de los académicos o diccionario vacío si hay error
         """
         self.logger.info(f"Buscando académicos para repartición: {reparticion}")
-        url = f"{self.config.api_base_url}{self.config.endpoints['academicos']}"
-        self.logger.info(f"URL de la API: {url}")
         params = {
             'reparticion': reparticion,
-            'limite': self.config.pagination['max_limit'],
-            'pagina': 1
+            'limite': self.config.pagination['max_limit']
         }
 
-        for retry in range(self.config.scraping_config['max_retries']):
-            try:
-                response = requests.get(
-                    url,
-                    headers=self.config.api_headers,
-                    params=params,
-                    timeout=self.config.scraping_config['timeout']
-                )
+        data = self.api_client.fetch_all('academicos', params)
+        if data is None:
+            self.logger.error(f"No se pudieron obtener académicos para repartición {reparticion}")
+            return {}
 
-                if response.status_code == 200:
-                    self.logger.info(f"Datos obtenidos exitosamente para repartición {reparticion}")
-                    return self.api_client._decode_response(response.text)
-                
-                self.logger.warning(
-                    f"Intento {retry + 1}: Error {response.status_code} al obtener académicos"
-                )
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])
-                    
-            except Exception as e:
-                self.logger.error(f"Error en intento {retry + 1}: {str(e)}")
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])
-                    
-        return {}
+        self.logger.info(f"Datos obtenidos exitosamente para repartición {reparticion}")
+        return data
 
-    def save_academicos(self, reparticion: int, out_path:str) -> bool:
+    def save_academicos(self, reparticion: int) -> bool:
         """
         Obtiene y guarda la lista de académicos en un archivo JSON
         
@@ -90,11 +73,14 @@ class ScraperAcademicos:
             
             total_academicos = data.get('total_resultado', 0)
             
-            with open(out_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            written = self.raw_store.write('academicos', reparticion, data)
+            out_path = self.raw_store.path_for('academicos', reparticion)
                 
             self.logger.info(f"Total de académicos encontrados: {total_academicos}")
-            self.logger.info(f"Datos guardados en: {out_path}")
+            if written:
+                self.logger.info(f"Datos guardados en: {out_path}")
+            else:
+                self.logger.info(f"Sin cambios respecto a la descarga anterior: {out_path}")
             
             return True
             
@@ -102,17 +88,25 @@ class ScraperAcademicos:
             self.logger.error(f"Error guardando datos: {str(e)}")
             return False
 
-    def run_workflow(self):
+    def run_workflow(self, unidades: Optional[Iterable[Dict[str, Any]]] = None,
+                     on_unidad: Optional[Callable[[int], None]] = None):
         """
         Ejecuta el flujo de trabajo para obtener y guardar académicos
+
+        Args:
+            unidades: Unidades a procesar a medida que llegan (main.py --pipelined); por defecto las de raw_data
+            on_unidad: Se llama con el id de cada unidad cuyos académicos quedaron en raw_data
         """
-        self.logger.info(f"Leyendo unidades desde: {self.unidades_file}")
-        with open(self.unidades_file, 'r', encoding='utf-8') as file:
+        if unidades is None:
+            self.logger.info(f"Leyendo unidades desde: {self.unidades_file}")
             try:
-                unidades = json.load(file)
+                unidades = self.raw_store.read('unidades', RawStore.UNIDADES_ID)
             except json.JSONDecodeError as e:
                 self.logger.error(f"Error decodificando JSON: {str(e)}")
                 return False
+            if unidades is None:
+                self.logger.error(f"No se encontraron unidades descargadas: {self.unidades_file}")
+                return False
 
         for unidad in unidades:
             unidad_id = unidad.get('id')
@@ -121,23 +115,32 @@ class ScraperAcademicos:
                 continue
             try:            
                     # Crear archivo de salida
-                    department_academics_file = Path(self.config.paths['academics_raw_data']) / f"{unidad_id}_academicos_raw.json"
-                    if Path.exists(department_academics_file):
+                    department_academics_file = self.raw_store.path_for('academicos', unidad_id)
+                    if self.journal and self.journal.is_done(str(unidad_id)):
+                        self.logger.info(f"Unidad {unidad_id} completada en la ejecución anterior, omitiendo...")
+                    elif self.raw_store.is_fresh('academicos', unidad_id):
                         self.logger.info(f"Archivo ya existe: {department_academics_file}, omitiendo...")
-                        continue
-                    
-                    # Obtener y guardar académicos
-                    success = self.save_academicos(reparticion=unidad_id, out_path=department_academics_file)
-                    
-                    if success:
-                        self.logger.info(f"✅ Académicos guardados para {unidad_id}")
                     else:
-                        self.logger.error(f"❌ Error obteniendo académicos para {unidad_id}")
+                        # Obtener y guardar académicos
+                        success = self.save_academicos(reparticion=unidad_id)
+
+                        if success:
+                            if self.journal:
+                                self.journal.mark_done(str(unidad_id))
+                            self.logger.info(f"✅ Académicos guardados para {unidad_id}")
+                        else:
+                            self.logger.error(f"❌ Error obteniendo académicos para {unidad_id}")
+
+                    if on_unidad is not None and self.raw_store.exists('academicos', unidad_id):
+                        on_unidad(unidad_id)
 
             except Exception as e:
                 self.logger.error(f"Error leyendo archivo {self.unidades_file}: {str(e)}")
                 continue
         
+        self.raw_store.save()
+        # Índice deduplicado del roster para los estados siguientes (solo se reconstruye si cambió)
+        RosterIndex.default().ensure(self.raw_store, self.logger).publish()
         self.logger.info("Flujo de trabajo completado exitosamente")
         return True
 
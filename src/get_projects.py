@@ -1,15 +1,14 @@
-import requests
-import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import logging
-import time
 import sys
-from urllib.parse import urlencode
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 from api_client import APIClient
 from config import Config
+from raw_store import RawStore
+from fetch_engine import ConcurrentFetcher
+from roster import RosterIndex
 
 
 
@@ -17,12 +16,17 @@ class ProyectosScraper:
     """
     Obtiene los proyectos de los académicos de la lista de académicos descargadas desde get_professors.py para una unidad definida.
     """
-    def __init__(self):
+    def __init__(self, api_client: Optional[APIClient] = None):
         self.config = Config()
-        self.api_client = APIClient()
-        self.unidades_file = Path(self.config.paths['unidades_raw_data']) / "unidades.json"
+        self.api_client = api_client or APIClient()
+        self.raw_store = RawStore()
         # Inicializar el logger
         self.logger = self._setup_logger()
+        self.fetcher = ConcurrentFetcher(
+            max_workers=self.api_client.max_in_flight,
+            progress_every=self.config.scraping_config['batch_size'],
+            name='proyectos_scraper'
+        )
     
     def _setup_logger(self) -> logging.Logger:
         """Retorna el logger configurado"""
@@ -31,92 +35,70 @@ class ProyectosScraper:
 
     def get_proyectos(self, id_persona: int) -> List[Dict[str, Any]]:
         """Obtiene los proyectos de un académico"""
-        url = f"{self.config.api_base_url}{self.config.endpoints['proyectos']}"
         params = {
             'id_persona': id_persona,
-            'limite': 30,
-            'pagina': 1,
+            'limite': self.config.pagination['default_limit'],
             'ano_desde': 2015,
             'id_resolucion': 2
         }
 
-        for retry in range(self.config.scraping_config['max_retries']):
-            try:
-                response = requests.get(
-                    url,
-                    headers=self.config.api_headers,
-                    params=params,
-                    timeout=self.config.scraping_config['timeout']
-                )
-                if response.status_code == 200:
-                    result = self.api_client._decode_response(response.text)
-                    # Verificar cada nivel de la estructura
-                    if not result:
-                        self.logger.info(f"Resultado vacío para académico {id_persona}")
-                        return []
-                    if 'academicos' not in result:
-                        self.logger.info(f"No hay clave 'academicos' para académico {id_persona}")
-                        return []
-                    academicos = result['academicos']
-                    projects_file = Path(self.config.paths['projects_raw_data']) / f"{id_persona}_projects.json"
-                    projects_file.parent.mkdir(parents=True, exist_ok=True)
-                    with open(projects_file, 'w', encoding = 'utf-8') as file:
-                        json.dump(result, file, ensure_ascii=False, indent=4)
-                    
-                    if not isinstance(academicos, dict) or not academicos:
-                        self.logger.info(f"'academicos' no es lista o está vacía para académico {id_persona}")
-                        return []
-                    # Obtener proyectos con get() para evitar KeyError
-                    proyectos = academicos.get('proyectos', [])
-                    if not proyectos:
-                        self.logger.info(f"No hay proyectos para académico {id_persona}")
-                        return []
-                    return proyectos
-                elif response.status_code == 204:
-                    self.logger.info(f"No hay contenido (204) para académico {id_persona}")
-                    return []
-                self.logger.warning(
-                    f"Intento {retry + 1}: Error {response.status_code} para académico {id_persona}"
-                )
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])     
-            except Exception as e:
-                self.logger.error(f"Error en solicitud para académico {id_persona}: {str(e)}")
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])
-        return []
+        result = self.api_client.fetch_all('proyectos', params)
+        if result is None:
+            self.logger.error(f"No se pudieron obtener proyectos para académico {id_persona}")
+            return []
+        # Verificar cada nivel de la estructura
+        if not result:
+            self.logger.info(f"Resultado vacío para académico {id_persona}")
+            return []
+        if 'academicos' not in result:
+            self.logger.info(f"No hay clave 'academicos' para académico {id_persona}")
+            return []
+        academicos = result['academicos']
+        self.raw_store.write('proyectos', id_persona, result)
+        
+        if not isinstance(academicos, dict) or not academicos:
+            self.logger.info(f"'academicos' no es lista o está vacía para académico {id_persona}")
+            return []
+        # Obtener proyectos con get() para evitar KeyError
+        proyectos = academicos.get('proyectos', [])
+        if not proyectos:
+            self.logger.info(f"No hay proyectos para académico {id_persona}")
+            return []
+        return proyectos
 
     def run_workflow(self):
         """Ejecuta el flujo de trabajo para obtener publicaciones de todos los académicos"""
         try:
-            unidades = json.load(open(self.unidades_file, 'r', encoding='utf-8'))
-            for unidad in unidades:
-                unidad_id = unidad.get('id')
-                unidad_nombre = unidad.get('nombre')
-                self.logger.info(f"** Procesando unidad: {unidad_nombre} **")
-                profesores_file = Path(self.config.paths['academics_raw_data']) / f"{unidad_id}_academicos_raw.json"
-                if not Path.exists(profesores_file):
-                    self.logger.error(f"Archivo de académicos no encontrado para unidad {unidad_nombre} (ID: {unidad_id})")
+            tareas = []
+            roster = RosterIndex.default().ensure(self.raw_store, self.logger)
+            for id_persona, nombre_completo in roster.iter_academicos():
+                if self.raw_store.is_fresh('proyectos', id_persona):
+                    self.logger.info(f"Archivo de proyectos ya existe para {nombre_completo}, omitiendo...")
                     continue
-                profesores = json.load(open(profesores_file, 'r', encoding='utf-8')).get('academicos')
-                for profesor in profesores:
-                    id_persona = profesor.get('id_persona')
-                    nombre_completo = profesor.get('nombre_completo')
-                    proyectos_file = Path(self.config.paths['projects_raw_data']) / f"{id_persona}_projects.json"
-                    self.logger.info(f"Obteniendo proyectos para {nombre_completo} (ID: {id_persona})")
-                    if not Path.exists(proyectos_file):
-                        proyectos = self.get_proyectos(id_persona)
-                        if proyectos:
-                            self.logger.info(f"Se encontraron {len(proyectos)} publicaciones para {nombre_completo}")
-                        else:
-                            self.logger.info(f"No se encontraron publicaciones para {nombre_completo}")
-                    else:
-                        self.logger.info(f"Archivo de publicaciones ya existe para {nombre_completo}, omitiendo...")
+                tareas.append((id_persona, nombre_completo))
+
+            self.logger.info(f"Obteniendo proyectos para {len(tareas)} académicos")
+            self.fetcher.run(tareas, self._fetch_task, on_result=self._log_result, total=len(tareas))
+            self.raw_store.save()
             self.logger.info("Flujo de trabajo completado exitosamente")
             return True
         except Exception as e:
             self.logger.error(f"Error en el flujo de trabajo: {str(e)}")
             return False        
+
+    def _fetch_task(self, tarea: Tuple[int, str]) -> List[Dict[str, Any]]:
+        """Tarea ejecutada por el motor concurrente para un académico"""
+        id_persona, nombre_completo = tarea
+        self.logger.info(f"Obteniendo proyectos para {nombre_completo} (ID: {id_persona})")
+        return self.get_proyectos(id_persona)
+
+    def _log_result(self, tarea: Tuple[int, str], proyectos: List[Dict[str, Any]]) -> None:
+        """Registra el resultado de una tarea terminada"""
+        _, nombre_completo = tarea
+        if proyectos:
+            self.logger.info(f"Se encontraron {len(proyectos)} publicaciones para {nombre_completo}")
+        else:
+            self.logger.info(f"No se encontraron publicaciones para {nombre_completo}")
     
 
 if __name__ == "__main__":
@@ -1,140 +1,164 @@
-import requests
-import json
-import csv
-from typing import Dict, Any, List
+import sys
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
-import time
-from config import Config
 import logging
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+from config import Config
 from api_client import APIClient
+from raw_store import RawStore
+from fetch_engine import ConcurrentFetcher
+from csv_writer import QueuedCsvWriter
+from roster import RosterIndex
 
-# Configurar el logging al inicio del archivo
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
 
 class TesisScraper:
-    def __init__(self):
+    """
+    Tesis dirigidas por los académicos del roster. Descarga las que no están frescas en raw_data
+    (en el pipeline completo ya las trajo POR_ACADEMICO) y consolida todas en todas_las_tesis.csv.
+    Las descargas y lecturas son concurrentes y las filas llegan al CSV por una cola acotada que
+    escribe un hilo propio (QueuedCsvWriter), de modo que el disco no frena las requests.
+    """
+    CSV_FILE = 'todas_las_tesis.csv'
+    CSV_HEADER = [
+        'ID Académico',
+        'Nombre Académico',
+        'Autores',
+        'Título',
+        'Año',
+        'Facultad',
+        'Profesor Guía',
+        'Comisión',
+        'URL',
+        'Fuente'
+    ]
+    RECORDS_PATH = ('academicos', 0, 'tesis')
+
+    def __init__(self, api_client: Optional[APIClient] = None):
         self.config = Config()
-        self.api_client = APIClient()
+        self.api_client = api_client or APIClient()
+        self.raw_store = RawStore()
+        self.logger = self._setup_logger()
+        self.fetcher = ConcurrentFetcher(
+            max_workers=self.api_client.max_in_flight,
+            progress_every=self.config.scraping_config['batch_size'],
+            name='tesis_scraper'
+        )
+        self.output_file = Path(self.config.paths['processed_data']) / self.CSV_FILE
+        self.max_failed_fraction = self.config.scraping_config.get('max_failed_fraction', 0.2)
+        # Académicos, tesis y académicos sin respuesta de la última ejecución de run_workflow
+        self.academicos = 0
+        self.total_tesis = 0
+        self.fallidos = 0
+        self._writer: Optional[QueuedCsvWriter] = None
+
+    def _setup_logger(self) -> logging.Logger:
+        """Retorna el logger configurado"""
+        return logging.getLogger('tesis_scraper')
 
     def get_tesis(self, id_persona: int) -> List[Dict[str, Any]]:
         """Obtiene las tesis de un académico"""
-        url = f"{self.config.api_base_url}{self.config.endpoints['tesis']}"
-        
         params = {
             'id_persona': id_persona,
             'id_estado_verif': 3,
-            'limite': self.config.pagination['default_limit'],
-            'pagina': 1
+            'limite': self.config.pagination['default_limit']
         }
-        
-        for retry in range(self.config.scraping_config['max_retries']):
-            try:
-                response = requests.get(
-                    url,
-                    headers=self.config.api_headers,
-                    params=params,
-                    timeout=self.config.scraping_config['timeout']
-                )
-                
-                if response.status_code == 200:
-                    result = self.api_client._decode_response(response.text)
-                    if 'academicos' in result and len(result['academicos']) > 0:
-                        return result['academicos'][0].get('tesis', [])
-                    return []
-                
-                logging.warning(
-                    f"Intento {retry + 1}: Error {response.status_code} para académico {id_persona}"
-                )
-                time.sleep(self.config.scraping_config['delay'])
-                
-            except Exception as e:
-                logging.error(f"Error obteniendo tesis para {id_persona}: {str(e)}")
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])
-                continue
-                
+
+        result = self.api_client.fetch_all('tesis', params)
+        if result is None:
+            self.logger.error(f"No se pudieron obtener tesis para {id_persona}")
+            return []
+
+        # Guardar la respuesta cruda en un archivo JSON
+        self.raw_store.write('tesis', id_persona, result)
+        if 'academicos' in result and len(result['academicos']) > 0:
+            return result['academicos'][0].get('tesis', [])
         return []
 
-    def build_tesis_file(self) -> bool:
-        """Construye un archivo CSV con todas las tesis"""
-        try:
-            # Crear directorios necesarios
-            Path(self.config.paths['raw_data']).mkdir(exist_ok=True)
-            Path(self.config.paths['data_dir']).mkdir(exist_ok=True)
-            json_path = Path(self.config.paths['data_dir']) / "academicos_raw.json"
-            
-            # Abrir el archivo JSON de académicos
-            with open(json_path, 'r', encoding='utf-8') as file:
-                academicos_list = json.load(file).get("academicos")
+    def _fetch_task(self, tarea: Tuple[int, str]) -> Optional[List[Dict[str, Any]]]:
+        """Tesis de un académico: desde raw_data si están frescas, si no desde la API; None si la request falló"""
+        id_persona, nombre_completo = tarea
+        if self.raw_store.is_fresh('tesis', id_persona):
+            return list(self.raw_store.iter_records('tesis', id_persona, self.RECORDS_PATH))
+        self.logger.info(f"Obteniendo tesis para {nombre_completo} (ID: {id_persona})")
+        tesis_list = self.get_tesis(id_persona)
+        # get_tesis retorna [] tanto sin tesis como ante un error: solo cuenta si la respuesta quedó guardada
+        if not self.raw_store.is_fresh('tesis', id_persona):
+            return None
+        return tesis_list
 
-            total_ids = len(academicos_list)
-            logging.info(f"Procesando tesis para {total_ids} académicos...")
-            
-            output_file = Path(self.config.paths['data_dir']) / 'todas_las_tesis.csv'
-            
-            # Crear/abrir archivo CSV principal
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'ID Académico',
-                    'Nombre Académico',
-                    'Autores',
-                    'Título',
-                    'Año',
-                    'Facultad',
-                    'Profesor Guía',
-                    'Comisión',
-                    'URL',
-                    'Fuente'
-                ])
-                
-                # Procesar cada académico
-                total_tesis = 0
-                academicos_procesados = 0
-                
-                for i, json_academico in enumerate(academicos_list[0:10], 1):
-                    id_academico = json_academico.get("id_persona")
-                    nombre_academico = json_academico.get("nombre_completo")
-                    logging.info(f"Procesando académico {i}/{total_ids} (Nombre: {nombre_academico})")
-                    
-                    tesis_list = self.get_tesis(id_academico)
-                    academicos_procesados += 1
-                    
-                    # Escribir tesis en el CSV si existen
-                    for tesis in tesis_list:
-                        writer.writerow([
-                            id_academico,
-                            nombre_academico,
-                            tesis.get('autores', ''),
-                            tesis.get('titulo', ''),
-                            tesis.get('anio', ''),
-                            tesis.get('facultad', ''),
-                            tesis.get('profesor_guia', ''),
-                            tesis.get('comision', ''),
-                            tesis.get('url', ''),
-                            tesis.get('fuente', '')
-                        ])
-                        total_tesis += 1
-                    
-                    if i % self.config.scraping_config['batch_size'] == 0:
-                        logging.info(f"Progreso: {i}/{total_ids} académicos procesados")
-                        logging.info(f"Total de tesis hasta ahora: {total_tesis}")
-            
-            logging.info("\nProceso completado!")
-            logging.info(f"Total de académicos procesados: {academicos_procesados}/{total_ids}")
-            logging.info(f"Total de tesis recopiladas: {total_tesis}")
-            logging.info(f"Archivo guardado como: {output_file}")
-            
-            return academicos_procesados == total_ids
-            
+    def _write_result(self, tarea: Tuple[int, str], tesis_list: Optional[List[Dict[str, Any]]]) -> None:
+        """Encola las filas CSV de un académico (hilo principal)"""
+        id_persona, nombre_completo = tarea
+        self.academicos += 1
+        if tesis_list is None:
+            # Request fallida, plazo agotado o excepción en el motor
+            self.fallidos += 1
+            return
+        if not tesis_list:
+            return
+        self._writer.write_rows([
+            [
+                id_persona,
+                nombre_completo,
+                tesis.get('autores', ''),
+                tesis.get('titulo', ''),
+                tesis.get('anio', ''),
+                tesis.get('facultad', ''),
+                tesis.get('profesor_guia', ''),
+                tesis.get('comision', ''),
+                tesis.get('url', ''),
+                tesis.get('fuente', '')
+            ]
+            for tesis in tesis_list
+        ])
+        self.total_tesis += len(tesis_list)
+
+    def _iter_tasks(self) -> Iterator[Tuple[int, str]]:
+        """Académicos sin repetir del índice del roster"""
+        roster = RosterIndex.default().ensure(self.raw_store, self.logger)
+        yield from roster.iter_academicos()
+
+    def run_workflow(self) -> bool:
+        """
+        Descarga las tesis pendientes y construye el CSV con las tesis de todos los académicos
+
+        Returns:
+            False si no se obtuvo ningún académico o si las descargas fallidas superan
+            scraping.max_failed_fraction (el CSV se escribe igual, sin esos académicos)
+        """
+        try:
+            self.academicos = 0
+            self.total_tesis = 0
+            self.fallidos = 0
+            max_pending = self.config.processed.get('queue_size', 1000)
+            with QueuedCsvWriter(self.output_file, self.CSV_HEADER, max_pending) as writer:
+                self._writer = writer
+                self.fetcher.run(self._iter_tasks(), self._fetch_task, on_result=self._write_result,
+                                 keep_results=False)
+            self.raw_store.save()
+            self.logger.info(f"{self.total_tesis} tesis de {self.academicos} académicos en {self.output_file}")
+            if self.fallidos:
+                message = f"No se obtuvieron las tesis de {self.fallidos} de {self.academicos} académicos"
+                if self.fallidos == self.academicos or self.fallidos > self.max_failed_fraction * self.academicos:
+                    self.logger.error(f"{message} (máximo {self.max_failed_fraction:.0%})")
+                    return False
+                self.logger.warning(f"{message}; --resume las vuelve a pedir")
+            self.logger.info("Flujo de trabajo completado exitosamente")
+            return True
         except Exception as e:
-            logging.error(f"Error crítico en el proceso de tesis: {str(e)}")
+            self.logger.error(f"Error en el flujo de trabajo: {str(e)}")
             return False
+        finally:
+            self._writer = None
+
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
     scraper = TesisScraper()
-    scraper.build_tesis_file()
\ No newline at end of file
+    scraper.run_workflow()
@@ -1,15 +1,13 @@
-import requests
-import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 import logging
 import sys
-import time
 # Agregar el directorio raíz del proyecto al path de Python
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 from api_client import APIClient
 from config import Config
+from raw_store import RawStore
 
 # Configurar el logging al inicio del archivo
 logging.basicConfig(
@@ -46,58 +44,32 @@ class UnidadesScraper:
     1803   Instituto de Nutrición y Tecnología de los Alimentos, Profesor Doctor Fernando Mönckeberg Barros
     297   Vicerrectoría de Asuntos Estudiantiles y Comunitarios
     """
-    def __init__(self):
+    def __init__(self, api_client: Optional[APIClient] = None):
         self.config = Config()
-        self.api_client = APIClient()
+        self.api_client = api_client or APIClient()
+        self.raw_store = RawStore()
 
     def get_unidades(self) -> Dict[str, Any]:
         """
-        Obtiene la lista completa de académicos para una repartición
-        
-        Args:
-            reparticion: ID de la repartición académica
+        Obtiene la lista completa de unidades académicas y la guarda en unidades.json
             
         Returns:
-            Dict con los datos de los académicos o diccionario vacío si hay error
+            Lista de unidades o diccionario vacío si hay error
         """
-        url = f"{self.config.api_base_url}{self.config.endpoints['unidades']}"
-        logging.info(f"Buscando url: {url}")
+        logging.info(f"Buscando unidades en endpoint: {self.config.endpoints['unidades']}")
         params = {
-            'limite': self.config.pagination['max_limit'],
-            'pagina': 1
+            'limite': self.config.pagination['max_limit']
         }
 
-        for retry in range(self.config.scraping_config['max_retries']):
-            try:
-                response = requests.get(
-                    url,
-                    headers=self.config.api_headers,
-                    params=params,
-                    timeout=self.config.scraping_config['timeout']
-                )
+        dic_unidades = self.api_client.fetch_all('unidades', params)
+        if dic_unidades is None:
+            logging.error("No se pudieron obtener las unidades")
+            return {}
 
-                if response.status_code == 200:
-                    dic_unidades = self.api_client._decode_response(response.text)
-                    #for elemento in dic_unidades:
-                        #print(elemento['id']," ", elemento["nombre"])
-                    # Guardar la respuesta cruda en un archivo JSON
-                    raw_unidades_path = Path(self.config.paths['unidades_raw_data'])
-                    raw_unidades_path.mkdir(parents=True, exist_ok=True)
-                    with open(raw_unidades_path / 'unidades.json', 'w', encoding='utf-8') as file:
-                        json.dump(dic_unidades, file, ensure_ascii=False, indent=4)
-                    return self.api_client._decode_response(response.text)
-                
-                logging.warning(
-                    f"Intento {retry + 1}: Error {response.status_code} al obtener académicos"
-                )
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])
-                    
-            except Exception as e:
-                logging.error(f"Error en intento {retry + 1}: {str(e)}")
-                if retry < self.config.scraping_config['max_retries'] - 1:
-                    time.sleep(self.config.scraping_config['delay'])  
-        return {}
+        # Guardar la respuesta cruda en un archivo JSON
+        self.raw_store.write('unidades', RawStore.UNIDADES_ID, dic_unidades)
+        self.raw_store.save()
+        return dic_unidades
 
 
 if __name__ == "__main__":
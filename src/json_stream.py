@@ -0,0 +1,140 @@
+"""
+Lectura incremental de arreglos JSON grandes (roster de académicos, registros de una respuesta).
+
+iter_items(stream, path) recorre uno a uno los elementos del arreglo ubicado en path, leyendo el
+stream por bloques: la memoria usada depende del elemento más grande y no del archivo completo, y el
+primer elemento está disponible apenas se lee. Si ijson está instalado y la ruta no tiene índices,
+se usa su parser en C; si no, un parser en Python basado en json.JSONDecoder.raw_decode.
+"""
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, Sequence, Union
+
+try:
+    import ijson
+except ImportError:  # opcional
+    ijson = None
+
+PathKey = Union[str, int]
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+DELIMITERS = WHITESPACE + ',:]}'
+
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    """Buffer de texto sobre un stream binario UTF-8, que se rellena a medida que se consume"""
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    def _fill(self) -> bool:
+        """Descarta lo ya consumido y lee otro bloque (al menos del tamaño pendiente, para crecer geométricamente)"""
+        if self.eof:
+            return False
+        data = self.stream.read(max(self.chunk_size, len(self.buf) - self.pos))
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        if not data:
+            self.eof = True
+            self.buf += self._utf8.decode(b'', final=True)
+            return False
+        self.buf += self._utf8.decode(data)
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter no blanco sin consumirlo ('' al final del stream)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Se esperaba '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decodifica el siguiente valor completo, leyendo más bloques mientras esté incompleto"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Un número cortado por el bloque ('2.' de '2.5') se decodifica como prefijo válido:
+                # solo se acepta si le sigue un delimitador o si no queda más contenido
+                if self.eof or (end < len(self.buf) and self.buf[end] in DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def descend(self, key: PathKey) -> bool:
+        """Avanza hasta el valor de key (clave de objeto o índice de arreglo); False si no existe"""
+        opening, closing = ('[', ']') if isinstance(key, int) else ('{', '}')
+        if self.peek() != opening:
+            return False
+        self.pos += 1
+        index = 0
+        while True:
+            if self.peek() == closing:
+                return False
+            if isinstance(key, int):
+                if index == key:
+                    return True
+            else:
+                name = self.value()
+                self.expect(':')
+                if name == key:
+                    return True
+            # Los hermanos anteriores (total_resultado, id_persona, ...) son pequeños: se decodifican y descartan
+            self.value()
+            index += 1
+            if self.peek() == ',':
+                self.pos += 1
+
+
+def iter_items(stream: BinaryIO, path: Sequence[PathKey] = (), chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Recorre los elementos del arreglo en path (ej: ('academicos',) o ('academicos', 0, 'publicaciones'))
+
+    Si la ruta no existe o no apunta a un arreglo no produce elementos.
+
+    Raises:
+        ValueError: si el contenido no es JSON válido
+    """
+    if ijson is not None and not any(isinstance(key, int) for key in path):
+        prefix = '.'.join([*path, 'item'])
+        yield from ijson.items(stream, prefix, use_float=True)
+        return
+
+    scanner = _Scanner(stream, chunk_size)
+    for key in path:
+        if not scanner.descend(key):
+            return
+    if scanner.peek() != '[':
+        return
+    scanner.pos += 1
+    if scanner.peek() == ']':
+        return
+    while True:
+        yield scanner.value()
+        separator = scanner.peek()
+        if separator == ',':
+            scanner.pos += 1
+        elif separator == ']':
+            return
+        else:
+            raise json.JSONDecodeError("Se esperaba ',' o ']'", scanner.buf, scanner.pos)
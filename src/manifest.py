@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class CrawlManifest:
+    """
+    Manifiesto persistente del crawl incremental.
+    Registra por entidad (endpoint:id) la hora de la última descarga y el hash del contenido,
+    y el hash que se cargó por última vez en bronze.
+    Hay una instancia por archivo, compartida entre todos los scrapers del proceso.
+
+    Con base (modo worker, ver RawStore.use_worker) las entidades que no están en este manifiesto
+    se leen del manifiesto base, y las actualizaciones se escriben solo en este.
+    """
+    _instances: Dict[str, 'CrawlManifest'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, manifest_file: Path, save_every: int = 500, base: Optional['CrawlManifest'] = None):
+        self.manifest_file = Path(manifest_file)
+        self.save_every = save_every
+        self.base = base
+        self.logger = logging.getLogger('crawl_manifest')
+        self._lock = threading.Lock()
+        # Serializa las escrituras del archivo: save() se llama desde cualquier hilo que alcance save_every
+        self._save_lock = threading.Lock()
+        self._pending = 0
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    @classmethod
+    def for_path(cls, manifest_file: Path, save_every: int = 500,
+                 base: Optional['CrawlManifest'] = None) -> 'CrawlManifest':
+        """Retorna la instancia compartida para un archivo de manifiesto"""
+        key = str(Path(manifest_file).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(manifest_file, save_every, base)
+            return cls._instances[key]
+
+    @staticmethod
+    def key(endpoint: str, entity_id: Any) -> str:
+        """Clave de una entidad en el manifiesto"""
+        return f"{endpoint}:{entity_id}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Carga el manifiesto desde disco; vacío si no existe o está corrupto"""
+        if not self.manifest_file.exists():
+            return {}
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', {})
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Manifiesto ilegible en {self.manifest_file}, se reconstruirá: {str(e)}")
+            return {}
+
+    def get(self, endpoint: str, entity_id: Any) -> Optional[Dict[str, Any]]:
+        """Retorna la entrada de una entidad o None"""
+        with self._lock:
+            entry = self._entries.get(self.key(endpoint, entity_id))
+            if entry:
+                return dict(entry)
+        return self.base.get(endpoint, entity_id) if self.base is not None else None
+
+    def age(self, endpoint: str, entity_id: Any) -> Optional[float]:
+        """Segundos desde la última descarga de la entidad, None si nunca se descargó"""
+        entry = self.get(endpoint, entity_id)
+        if not entry or 'fetched_at' not in entry:
+            return None
+        return time.time() - entry['fetched_at']
+
+    def update(self, endpoint: str, entity_id: Any, **fields: Any) -> None:
+        """Actualiza campos de una entidad y persiste cada save_every cambios"""
+        key = self.key(endpoint, entity_id)
+        seed = self.base.get(endpoint, entity_id) if self.base is not None else None
+        with self._lock:
+            if key not in self._entries:
+                # Con base, la entrada parte de la del manifiesto base (hash cargado en bronze, etc.)
+                self._entries[key] = seed or {}
+            self._entries[key].update(fields)
+            self._pending += 1
+            should_save = self._pending >= self.save_every
+        if should_save:
+            self.save()
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Copia de todas las entradas propias (sin las del manifiesto base)"""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._entries.items()}
+
+    def merge(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Integra las entradas de otro manifiesto (el de un worker); por entidad gana la descarga más reciente
+
+        Returns:
+            Número de entradas actualizadas
+        """
+        merged = 0
+        with self._lock:
+            for key, entry in entries.items():
+                current = self._entries.get(key)
+                if current is None or entry.get('fetched_at', 0) >= current.get('fetched_at', 0):
+                    self._entries[key] = dict(entry)
+                    merged += 1
+            self._pending += merged
+        return merged
+
+    def save(self) -> None:
+        """Escribe el manifiesto de forma atómica (archivo temporal + replace)"""
+        with self._save_lock:
+            # Se serializa con el lock tomado: otros hilos modifican las entradas mientras se escribe
+            with self._lock:
+                content = json.dumps({'entries': self._entries}, ensure_ascii=False).encode('utf-8')
+                self._pending = 0
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.manifest_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_file, self.manifest_file)
+
+    def clear(self) -> None:
+        """Olvida todas las entidades y elimina el archivo"""
+        with self._lock:
+            self._entries = {}
+            self._pending = 0
+        if self.manifest_file.exists():
+            self.manifest_file.unlink()
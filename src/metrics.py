@@ -0,0 +1,256 @@
+"""
+Métricas de rendimiento del pipeline (latencia por endpoint, bytes, decodificación, errores,
+archivos escritos y filas cargadas), sin dependencias externas.
+
+Los módulos registran en el registro global REGISTRY; al final de la ejecución main.py lo escribe
+en formato de texto de Prometheus (para el textfile collector de node_exporter) y como resumen JSON.
+Con metrics.port > 0 además se sirve en http://127.0.0.1:<port>/metrics mientras corre el proceso.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DECODE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base de las métricas: nombre, ayuda, etiquetas y un lock propio"""
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labels}, recibió {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _label_str(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+        if extra is not None:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Contador monótono por combinación de etiquetas"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._label_str(key)} {_format_value(value)}")
+        return lines
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {','.join(key) or 'total': value for key, value in sorted(self._values.items())}
+
+
+class Gauge(Counter):
+    """Valor que se fija (por ejemplo, la duración de un estado)"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Histograma acumulado por buckets, con suma y cantidad de observaciones"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteo por bucket (el último es +Inf), suma, cantidad]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (math.inf,), counts):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{self._label_str(key, ('le', _format_value(bound)))} {cumulative}")
+                lines.append(f"{self.name}_sum{self._label_str(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{self._label_str(key)} {count}")
+        return lines
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        """Cota superior del bucket que contiene el cuantil q (aproximación de Prometheus sin interpolar)"""
+        target = q * count
+        cumulative = 0
+        for bound, n in zip(self.buckets + (math.inf,), counts):
+            cumulative += n
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                ','.join(key) or 'total': {
+                    'count': count,
+                    'sum': round(total, 6),
+                    'mean': round(total / count, 6) if count else 0.0,
+                    'p50_le': self._quantile(counts, count, 0.5),
+                    'p95_le': self._quantile(counts, count, 0.95),
+                    'p99_le': self._quantile(counts, count, 0.99),
+                }
+                for key, (counts, total, count) in sorted(self._values.items())
+            }
+
+
+class MetricsRegistry:
+    """Conjunto de métricas del proceso, exportable como texto de Prometheus o resumen JSON"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de exposición de Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumen por métrica y etiquetas, apto para JSON"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.summary() for metric in metrics}
+
+    def write_textfile(self, path: Path) -> None:
+        """Escribe las métricas en formato Prometheus de forma atómica (archivo temporal + rename)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def write_summary(self, path: Path, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Escribe el resumen JSON de la ejecución"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**(extra or {}), 'metrics': self.summary()}, f, ensure_ascii=False, indent=2,
+                      default=lambda value: None if value == math.inf else value)
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Sirve /metrics en un hilo de fondo; se detiene con shutdown() del servidor retornado"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'portafolio_http_request_duration_seconds', "Latencia de las requests a la API", ('endpoint',))
+HTTP_RESPONSES = REGISTRY.counter(
+    'portafolio_http_responses_total', "Respuestas de la API por código de estado ('error': sin respuesta)",
+    ('endpoint', 'status'))
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    'portafolio_http_response_bytes_total', "Bytes descargados de la API", ('endpoint',))
+HTTP_RETRIES = REGISTRY.counter(
+    'portafolio_http_retries_total', "Reintentos de requests a la API", ('endpoint',))
+CACHE_LOOKUPS = REGISTRY.counter(
+    'portafolio_cache_lookups_total', "Consultas a la caché de respuestas ('hit' o 'miss')", ('endpoint', 'result'))
+DECODE_SECONDS = REGISTRY.histogram(
+    'portafolio_decode_duration_seconds', "Tiempo de decodificación de respuestas", ('endpoint',), DECODE_BUCKETS)
+RAW_FILES_WRITTEN = REGISTRY.counter(
+    'portafolio_raw_files_written_total', "Respuestas crudas escritas (sin contar las que no cambiaron)", ('endpoint',))
+RAW_BYTES_WRITTEN = REGISTRY.counter(
+    'portafolio_raw_bytes_written_total', "Bytes canónicos escritos en raw_data", ('endpoint',))
+BRONZE_ROWS_SENT = REGISTRY.counter(
+    'portafolio_bronze_rows_sent_total', "Filas enviadas a cada tabla bronze", ('table',))
+BRONZE_ROWS_INSERTED = REGISTRY.counter(
+    'portafolio_bronze_rows_inserted_total', "Filas nuevas insertadas en cada tabla bronze", ('table',))
+STAGE_SECONDS = REGISTRY.gauge(
+    'portafolio_stage_duration_seconds', "Duración de cada estado del pipeline", ('stage',))
@@ -0,0 +1,159 @@
+"""
+Ejecución encadenada de los estados (main.py --pipelined).
+
+En lugar de ejecutar cada estado recién cuando termina el anterior, los estados forman un grafo:
+las aristas de flujo (Stream) son colas acotadas por las que un estado entrega sus resultados a medida
+que los produce, y las aristas de dependencia (after) esperan a que el estado anterior termine por
+completo. Cada estado corre en su propio hilo; los que solo consumen flujos arrancan de inmediato y
+avanzan a medida que llegan los datos, así el tiempo total se acerca al del estado más lento.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+from fetch_engine import ConcurrentFetcher
+
+
+class Stream:
+    """
+    Flujo entre dos estados: cola acotada que el productor cierra al terminar (aunque falle).
+    Si la cola está llena el productor espera, lo que acota la memoria cuando el consumidor es más lento.
+    """
+    _END = object()
+    # Cada cuánto revisa un productor que espera con la cola llena si el consumidor abandonó el flujo
+    _PUT_POLL_SECONDS = 0.1
+
+    def __init__(self, name: str, maxsize: int = 1000):
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._abandoned = False
+        self.items = 0
+
+    def _put(self, item: Any) -> bool:
+        """Encola esperando mientras la cola esté llena; False si el consumidor abandona el flujo"""
+        while not self._abandoned:
+            try:
+                self._queue.put(item, timeout=self._PUT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def put(self, item: Any) -> None:
+        """Entrega un elemento al consumidor; se descarta si el consumidor ya terminó"""
+        if self._put(item):
+            self.items += 1
+
+    def close(self) -> None:
+        """Marca el fin del flujo (sin esperar si el consumidor ya terminó)"""
+        self._put(self._END)
+
+    def abandon(self) -> None:
+        """El consumidor terminó: descarta lo pendiente y lo que llegue, para no detener al productor"""
+        self._abandoned = True
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _get(self, timeout: Optional[float] = None) -> Any:
+        item = self._queue.get(timeout=timeout)
+        if item is self._END:
+            # Se devuelve para que otra lectura del flujo también termine
+            self._queue.put(self._END)
+        return item
+
+    def __iter__(self) -> Iterator[Any]:
+        """Elementos hasta el cierre del flujo, esperando cada uno"""
+        while True:
+            item = self._get()
+            if item is self._END:
+                return
+            yield item
+
+    def iter_idle(self, poll_seconds: float) -> Iterator[Any]:
+        """Como __iter__, pero produce ConcurrentFetcher.IDLE cada poll_seconds sin datos"""
+        while True:
+            try:
+                item = self._get(poll_seconds)
+            except queue.Empty:
+                yield ConcurrentFetcher.IDLE
+                continue
+            if item is self._END:
+                return
+            yield item
+
+
+class StageGraph:
+    """
+    Grafo de estados ejecutado con un hilo por estado
+
+    Cada estado es una función sin argumentos que retorna True si tuvo éxito. Un estado espera a los de
+    after; si alguno falló no se ejecuta (cuenta como fallido). Al terminar se cierran sus flujos de
+    salida (outputs) y se abandonan los de entrada (inputs), para que ningún productor quede esperando.
+    """
+    def __init__(self, on_finish: Optional[Callable[[str, bool, float], None]] = None):
+        self.logger = logging.getLogger('pipeline')
+        # on_finish(nombre, éxito, segundos) se llama desde el hilo de cada estado al terminar
+        self.on_finish = on_finish
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        # Duración y resultado de cada estado de la última ejecución de run
+        self.timings: Dict[str, float] = {}
+        self.results: Dict[str, bool] = {}
+
+    def add(self, name: str, run: Callable[[], bool], after: Sequence[str] = (),
+            inputs: Sequence[Stream] = (), outputs: Sequence[Stream] = ()) -> None:
+        """Agrega un estado; los de after deben agregarse antes"""
+        missing = [dependency for dependency in after if dependency not in self._stages]
+        if missing:
+            raise ValueError(f"{name} depende de estados no definidos: {missing}")
+        self._stages[name] = {
+            'run': run, 'after': tuple(after), 'inputs': tuple(inputs), 'outputs': tuple(outputs),
+            'done': threading.Event(),
+        }
+
+    def _run_stage(self, name: str) -> None:
+        stage = self._stages[name]
+        success = False
+        start = time.perf_counter()
+        try:
+            for dependency in stage['after']:
+                self._stages[dependency]['done'].wait()
+            failed = [dependency for dependency in stage['after'] if not self.results.get(dependency)]
+            if failed:
+                self.logger.error(f"{name} no se ejecuta: fallaron {', '.join(failed)}")
+                return
+            start = time.perf_counter()
+            self.logger.info(f"▶️  {name} iniciado")
+            success = bool(stage['run']())
+        except Exception as e:
+            self.logger.error(f"💥 EXCEPCIÓN en {name}: {str(e)}", exc_info=True)
+        finally:
+            for stream in stage['outputs']:
+                stream.close()
+            for stream in stage['inputs']:
+                stream.abandon()
+            seconds = time.perf_counter() - start
+            self.timings[name] = seconds
+            self.results[name] = success
+            stage['done'].set()
+            if self.on_finish is not None:
+                self.on_finish(name, success, seconds)
+
+    def run(self) -> bool:
+        """Ejecuta todos los estados y espera a que terminen; True si todos tuvieron éxito"""
+        self.timings = {}
+        self.results = {}
+        for stage in self._stages.values():
+            stage['done'].clear()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(name,), name=f"stage-{name}", daemon=True)
+            for name in self._stages
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return all(self.results.get(name) for name in self._stages)
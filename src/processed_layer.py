@@ -0,0 +1,277 @@
+"""
+Capa procesada: publicaciones y proyectos de raw_data aplanados a tablas columnares (Parquet).
+
+Cada fila es un registro de academicos[].publicaciones o academicos.proyectos, con el id_persona del
+académico como primera columna. Las columnas se arman por lotes de entidades en un pool de procesos:
+cada lote se decodifica y pyarrow infiere el tipo de cada columna. El proceso principal guarda cada lote
+en un archivo Arrow temporal, unifica los tipos entre lotes y escribe el Parquet lote a lote.
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # sin pyarrow la etapa falla con un error claro (ver requirements.txt)
+    pa = None
+from config import Config
+from api_client import APIClient
+from decoder import loads_bytes
+from raw_store import RawStore
+
+KEY_COLUMN = 'id_persona'
+
+
+def _as_strings(values: List[Any]) -> List[Optional[str]]:
+    """Valores de una columna mixta como texto; listas y objetos como JSON"""
+    return [
+        value if value is None or isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True)
+        for value in values
+    ]
+
+
+def _column(values: List[Any]) -> 'pa.Array':
+    """Arreglo Arrow de una columna con el tipo que infiere pyarrow; texto si mezcla tipos o anida valores"""
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # Tipos mezclados o enteros fuera de int64
+        return pa.array(_as_strings(values), type=pa.string())
+    if pa.types.is_nested(array.type):
+        return pa.array(_as_strings(values), type=pa.string())
+    return array
+
+
+def flatten_batch(endpoint: str, entities: Sequence[Tuple[int, bytes]]) -> 'pa.Table':
+    """
+    Aplana los registros de un lote de entidades de un endpoint en una tabla Arrow.
+    Es una función de módulo para poder ejecutarla en un pool de procesos.
+
+    Args:
+        endpoint: 'publicaciones' o 'proyectos'
+        entities: Pares (id_persona, bytes crudos guardados)
+
+    Returns:
+        Tabla con la columna id_persona y una columna por clave de los registros, en orden de aparición
+
+    Raises:
+        ValueError: si el contenido de alguna entidad no es JSON válido
+    """
+    path = APIClient.RECORDS_PATH[endpoint]
+    ids: List[int] = []
+    records: List[Dict[str, Any]] = []
+    for entity_id, raw in entities:
+        batch = [record for record in APIClient.get_records(loads_bytes(raw), path) or [] if isinstance(record, dict)]
+        ids.extend([entity_id] * len(batch))
+        records.extend(batch)
+
+    keys = list(dict.fromkeys(key for record in records for key in record if key != KEY_COLUMN))
+    columns = {KEY_COLUMN: pa.array(ids, type=pa.int64())}
+    for key in keys:
+        columns[key] = _column([record.get(key) for record in records])
+    return pa.table(columns)
+
+
+def _unified_type(types: Sequence['pa.DataType']) -> 'pa.DataType':
+    """Tipo común de una columna entre lotes: el único tipo, float64 si mezcla enteros y decimales, o texto"""
+    distinct = set(data_type for data_type in types if data_type != pa.null())
+    if not distinct:
+        return pa.null()
+    if len(distinct) == 1:
+        return distinct.pop()
+    if distinct <= {pa.int64(), pa.float64()}:
+        return pa.float64()
+    return pa.string()
+
+
+def unified_schema(schemas: Sequence['pa.Schema']) -> 'pa.Schema':
+    """Esquema común de varios lotes: todas sus columnas, en orden de aparición, con el tipo unificado"""
+    types: Dict[str, List['pa.DataType']] = {}
+    for schema in schemas:
+        for field in schema:
+            types.setdefault(field.name, []).append(field.type)
+    return pa.schema([(name, _unified_type(column_types)) for name, column_types in types.items()])
+
+
+def align_table(table: 'pa.Table', schema: 'pa.Schema') -> 'pa.Table':
+    """Lleva una tabla de un lote al esquema común: convierte tipos y completa con nulos las columnas faltantes"""
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(table.column(field.name).cast(field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def unify_tables(tables: Sequence['pa.Table']) -> 'pa.Table':
+    """Concatena tablas de lotes con columnas o tipos distintos en una sola tabla con esquema común"""
+    schema = unified_schema([table.schema for table in tables])
+    aligned = [align_table(table, schema) for table in tables]
+    return pa.concat_tables(aligned) if aligned else schema.empty_table()
+
+
+class ProcessedLayerBuilder:
+    """
+    Construye process_data/<endpoint>.parquet desde raw_data y, opcionalmente, los CSV consolidados.
+    Los archivos se escriben como .tmp y reemplazan a los anteriores solo si se escribieron completos.
+    En memoria hay a lo más un lote por proceso: los lotes se guardan en archivos Arrow temporales junto a
+    la salida y, una vez conocido el esquema común, se escriben uno a uno en el Parquet (y el CSV).
+    """
+    ENDPOINTS = ('publicaciones', 'proyectos')
+    CSV_FILES = {
+        'publicaciones': 'todas_las_publicaciones.csv',
+        'proyectos': 'todos_los_proyectos.csv',
+    }
+
+    def __init__(self):
+        self.config = Config()
+        self.logger = logging.getLogger('processed_layer')
+        self.raw_store = RawStore()
+        settings = self.config.processed
+        self.output_dir = Path(self.config.paths['processed_data'])
+        self.workers = settings.get('workers', 0)
+        self.batch_entities = max(1, settings.get('batch_entities', 200))
+        self.row_group_size = settings.get('row_group_size', 100000)
+        self.compression = settings.get('compression', 'zstd')
+        self.csv_export = settings.get('csv_export', False)
+        # Filas escritas por endpoint en la última ejecución de run_workflow
+        self.rows: Dict[str, int] = {}
+
+    def _iter_batches(self, endpoint: str) -> Iterator[List[Tuple[int, bytes]]]:
+        """Lotes de (id_persona, bytes crudos), en el orden físico del almacén"""
+        batch: List[Tuple[int, bytes]] = []
+        for entity_id in self.raw_store.iter_ids(endpoint):
+            raw = self.raw_store.read_bytes(endpoint, entity_id)
+            if raw is None:
+                continue
+            batch.append((entity_id, raw))
+            if len(batch) >= self.batch_entities:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _flatten(self, endpoint: str, pool: Optional[Executor]) -> Iterator['pa.Table']:
+        """Tablas de cada lote, en orden; con pool a lo más 2 lotes por proceso en vuelo"""
+        if pool is None:
+            for batch in self._iter_batches(endpoint):
+                yield flatten_batch(endpoint, batch)
+            return
+
+        window = deque()
+        for batch in self._iter_batches(endpoint):
+            window.append(pool.submit(flatten_batch, endpoint, batch))
+            if len(window) >= self.workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+    def _spill(self, endpoint: str, pool: Optional[Executor], spill_dir: Path) -> List[Tuple[Path, 'pa.Schema']]:
+        """Guarda la tabla de cada lote en un archivo Arrow temporal; devuelve (archivo, esquema) en orden"""
+        spilled = []
+        for table in self._flatten(endpoint, pool):
+            if table.num_rows == 0:
+                continue
+            path = spill_dir / f"{len(spilled):06d}.arrow"
+            with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            spilled.append((path, table.schema))
+        return spilled
+
+    @staticmethod
+    def _read_spilled(path: Path) -> 'pa.Table':
+        """Tabla de un lote guardado por _spill"""
+        with pa.OSFile(str(path), 'rb') as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def build(self, endpoint: str, pool: Optional[Executor] = None) -> int:
+        """
+        Construye la tabla procesada de un endpoint
+
+        Returns:
+            Filas escritas
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        parquet_path = self.output_dir / f"{endpoint}.parquet"
+        csv_path = self.output_dir / self.CSV_FILES[endpoint]
+        parquet_tmp = parquet_path.with_suffix(parquet_path.suffix + '.tmp')
+        csv_tmp = csv_path.with_suffix(csv_path.suffix + '.tmp')
+        rows = 0
+        try:
+            with tempfile.TemporaryDirectory(prefix=f".{endpoint}-", dir=self.output_dir) as spill_dir:
+                spilled = self._spill(endpoint, pool, Path(spill_dir))
+                # Sin registros se escribe la tabla vacía, solo con id_persona
+                schema = unified_schema([schema for _, schema in spilled] or [flatten_batch(endpoint, []).schema])
+                csv_writer = pa_csv.CSVWriter(str(csv_tmp), schema) if self.csv_export else None
+                try:
+                    with pq.ParquetWriter(str(parquet_tmp), schema, compression=self.compression) as writer:
+                        # Los lotes se acumulan hasta completar un row group para no escribir row groups chicos
+                        pending: List['pa.Table'] = []
+                        pending_rows = 0
+                        for path, _ in spilled:
+                            table = align_table(self._read_spilled(path), schema)
+                            if csv_writer is not None:
+                                csv_writer.write_table(table)
+                            pending.append(table)
+                            pending_rows += table.num_rows
+                            rows += table.num_rows
+                            while pending_rows >= self.row_group_size:
+                                full = pa.concat_tables(pending)
+                                writer.write_table(full.slice(0, self.row_group_size))
+                                rest = full.slice(self.row_group_size)
+                                pending, pending_rows = [rest], rest.num_rows
+                        if pending_rows or rows == 0:
+                            writer.write_table(pa.concat_tables(pending) if pending else schema.empty_table())
+                finally:
+                    if csv_writer is not None:
+                        csv_writer.close()
+            os.replace(parquet_tmp, parquet_path)
+            self.logger.info(f"{rows} filas y {len(schema)} columnas en {parquet_path}")
+            if self.csv_export:
+                os.replace(csv_tmp, csv_path)
+                self.logger.info(f"Exportado {csv_path}")
+        finally:
+            parquet_tmp.unlink(missing_ok=True)
+            csv_tmp.unlink(missing_ok=True)
+        return rows
+
+    def run_workflow(self) -> bool:
+        """Construye la capa procesada de publicaciones y proyectos"""
+        if pa is None:
+            self.logger.error("pyarrow no está instalado: no se puede construir la capa procesada "
+                              "(pip install -r requirements.txt)")
+            return False
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        try:
+            self.rows = {}
+            for endpoint in self.ENDPOINTS:
+                self.rows[endpoint] = self.build(endpoint, pool)
+            self.logger.info("Flujo de trabajo completado exitosamente")
+            return True
+        except (OSError, ValueError, pa.ArrowException) as e:
+            self.logger.error(f"Error construyendo la capa procesada: {str(e)}")
+            return False
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+
+    builder = ProcessedLayerBuilder()
+    builder.run_workflow()
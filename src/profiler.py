@@ -0,0 +1,219 @@
+"""
+Perfilado por estado del pipeline (main.py --profile).
+
+CPU y espera: un profiler de muestreo que, en un hilo propio, toma cada interval segundos la pila de
+todos los hilos del proceso (sys._current_frames). A diferencia de cProfile, que solo mide el hilo que
+lo activa, así quedan incluidos los workers de ConcurrentFetcher, del executor de páginas y de la carga
+bronze. Las muestras son de reloj: las de hilos bloqueados en la red, en locks o en colas (hoja de la
+pila en socket, ssl, selectors, threading o queue, en el poll de urllib3 o en el rate limiter) se reportan aparte
+como espera y el resto como CPU. Los workers ociosos esperando tareas no se cuentan.
+
+Memoria: tracemalloc durante el estado; se reportan el pico y las líneas con más memoria retenida al final.
+
+Por cada estado se escribe <estado>.folded (pilas colapsadas, para flamegraph.pl o speedscope) y
+<estado>.txt con el top de funciones y sitios de asignación, que además se resume en el log.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+CodeKey = Tuple[str, int, str]  # (archivo, primera línea, función)
+
+# Módulos de la biblioteca estándar cuya función hoja está bloqueada (red, locks, colas), no en CPU
+WAIT_MODULES = ('socket.py', 'ssl.py', 'selectors.py', 'threading.py', 'queue.py')
+# Funciones de la biblioteca estándar que esperan un lock en cualquier módulo (por ejemplo, los handlers de logging)
+WAIT_STDLIB_FUNCTIONS = ('acquire', 'wait')
+STDLIB_DIR = os.path.dirname(threading.__file__)
+# Funciones cuya hoja Python espera en código C: sleep del rate limiter y poll/select de urllib3
+WAIT_FUNCTIONS = (('rate_limiter.py', 'acquire'), ('wait.py', 'do_poll'), ('wait.py', 'select_wait_for_socket'))
+
+
+def _label(code: CodeKey) -> str:
+    filename, line, name = code
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class SamplingProfiler:
+    """Muestrea periódicamente las pilas de todos los hilos y las acumula"""
+
+    # Hilos de servicio que no forman parte del trabajo del estado
+    IGNORED_THREADS = ('metrics', 'mock-api', 'work-queue')
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or names.get(ident, '').startswith(self.IGNORED_THREADS):
+                continue
+            stack: List[CodeKey] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if self._is_idle(stack):
+                self.idle_samples += 1
+                continue
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _is_idle(stack: List[CodeKey]) -> bool:
+        """Worker de un pool de hilos esperando una tarea (pila desde la hoja hacia la raíz)"""
+        # ThreadPoolExecutor espera en SimpleQueue.get (código C): la hoja Python es el propio _worker
+        filename, _, name = stack[0]
+        return name == '_worker' and 'concurrent' in filename
+
+    @staticmethod
+    def is_wait(code: CodeKey) -> bool:
+        """Indica si una función hoja está esperando (red, lock, cola o sleep) en lugar de usar CPU"""
+        filename, _, name = code
+        basename = os.path.basename(filename)
+        directory = os.path.dirname(filename)
+        if directory == STDLIB_DIR and basename in WAIT_MODULES:
+            return True
+        if name in WAIT_STDLIB_FUNCTIONS and directory.startswith(STDLIB_DIR) and 'site-packages' not in directory:
+            return True
+        return (basename, name) in WAIT_FUNCTIONS
+
+    def split(self) -> Tuple[int, int]:
+        """Muestras en CPU y en espera"""
+        wait = sum(count for stack, count in self.stacks.items() if self.is_wait(stack[-1]))
+        return self.samples - wait, wait
+
+    def top(self, n: int) -> Tuple[List[Tuple[CodeKey, int]], List[Tuple[CodeKey, int]], List[Tuple[CodeKey, int]]]:
+        """
+        Funciones con más muestras propias (hoja de la pila) en CPU y en espera, y acumuladas
+        (en cualquier nivel, CPU y espera juntas)
+        """
+        cpu: Counter = Counter()
+        wait: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack[-1]
+            (wait if self.is_wait(leaf) else cpu)[leaf] += count
+            for code in set(stack):
+                cumulative[code] += count
+        return cpu.most_common(n), wait.most_common(n), cumulative.most_common(n)
+
+    def write_folded(self, path: Path) -> None:
+        """Pilas colapsadas: 'raíz;...;hoja cantidad' por línea"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(';'.join(_label(code) for code in stack) + f" {count}\n")
+
+
+class StageProfiler:
+    """Perfila CPU (muestreo) y memoria (tracemalloc) de cada estado y escribe un reporte por estado"""
+
+    def __init__(self, output_dir: Path, top_n: int = 15, interval: float = 0.01,
+                 trace_memory: bool = True, memory_frames: int = 1):
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.memory_frames = memory_frames
+        self.logger = logging.getLogger('profiler')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[None]:
+        """Perfila el bloque como el estado indicado"""
+        sampler = SamplingProfiler(self.interval)
+        if self.trace_memory:
+            tracemalloc.start(self.memory_frames)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            snapshot = None
+            peak = 0
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot().filter_traces((
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                ))
+                tracemalloc.stop()
+            self._report(stage, sampler, snapshot, peak)
+
+    def _report(self, stage: str, sampler: SamplingProfiler,
+                snapshot: Optional[tracemalloc.Snapshot], peak: int) -> None:
+        """Escribe <estado>.folded y <estado>.txt y resume el top en el log"""
+        folded_path = self.output_dir / f"{stage}.folded"
+        sampler.write_folded(folded_path)
+        cpu, wait, cumulative = sampler.top(self.top_n)
+        cpu_samples, wait_samples = sampler.split()
+        total = max(sampler.samples, 1)
+
+        lines = [
+            f"Estado {stage}: {sampler.duration:.2f}s, {sampler.samples} muestras de reloj "
+            f"({sampler.idle_samples} de workers ociosos descartadas), intervalo {self.interval * 1000:.0f} ms",
+            f"CPU {cpu_samples / total:.1%} de las muestras, espera (red, locks, colas) {wait_samples / total:.1%}",
+            "",
+            "CPU, tiempo propio (hoja de la pila, % de todas las muestras):",
+        ]
+        lines += [f"  {count / total:6.1%}  {_label(code)}" for code, count in cpu]
+        lines += ["", "Espera, por función bloqueada (% de todas las muestras):"]
+        lines += [f"  {count / total:6.1%}  {_label(code)}" for code, count in wait]
+        lines += ["", "Tiempo acumulado de reloj, CPU y espera (la función o lo que llama):"]
+        lines += [f"  {count / total:6.1%}  {_label(code)}" for code, count in cumulative]
+        allocations: List[str] = []
+        if snapshot is not None:
+            lines += ["", f"Memoria: pico {peak / 1e6:.1f} MB; retenida al final por línea:"]
+            for stat in snapshot.statistics('lineno')[:self.top_n]:
+                frame = stat.traceback[0]
+                allocations.append(
+                    f"{stat.size / 1e6:8.2f} MB  {stat.count:8d} bloques  {os.path.basename(frame.filename)}:{frame.lineno}"
+                )
+            lines += [f"  {line}" for line in allocations]
+
+        report_path = self.output_dir / f"{stage}.txt"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        summary_n = min(5, self.top_n)
+        self.logger.info(f"Perfil de {stage} en {report_path} y {folded_path}")
+        self.logger.info(f"  Muestras de reloj: CPU {cpu_samples / total:.1%}, espera {wait_samples / total:.1%}")
+        for code, count in cpu[:summary_n]:
+            self.logger.info(f"  CPU    {count / total:6.1%}  {_label(code)}")
+        for code, count in wait[:summary_n]:
+            self.logger.info(f"  Espera {count / total:6.1%}  {_label(code)}")
+        if snapshot is not None:
+            self.logger.info(f"  Memoria: pico {peak / 1e6:.1f} MB")
+            for line in allocations[:summary_n]:
+                self.logger.info(f"  {line}")
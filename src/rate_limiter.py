@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Rate limiter de tipo token bucket, thread-safe.
+    Una única instancia se comparte entre todos los workers, de modo que el ritmo
+    global de requests hacia el servidor se mantiene sin importar la concurrencia.
+    """
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens repuestos por segundo (requests por segundo permitidos)
+            capacity: Máximo de tokens acumulables (tamaño de ráfaga)
+        """
+        if rate <= 0:
+            raise ValueError("rate debe ser mayor que 0")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Reserva tokens y bloquea hasta que estén disponibles
+
+        Returns:
+            Segundos esperados antes de obtener los tokens
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reservar por adelantado: el saldo negativo ordena a los que esperan
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Toma tokens solo si están disponibles ahora, sin bloquear
+
+        Returns:
+            True si se obtuvieron los tokens
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def set_rate(self, rate: float) -> None:
+        """Cambia la tasa de reposición, conservando los tokens acumulados hasta ahora"""
+        if rate <= 0:
+            raise ValueError("rate debe ser mayor que 0")
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self.rate = rate
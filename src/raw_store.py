@@ -0,0 +1,492 @@
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Sequence, Tuple, Union
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock de workers, merge_workers integra todos los directorios
+    fcntl = None
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+from config import Config
+from manifest import CrawlManifest
+from segment_store import SegmentStore
+from json_stream import iter_items
+import metrics
+
+
+def canonical_from_bytes(raw: bytes, expected_hash: Optional[str] = None, total: Any = None) -> Tuple[str, str, Any]:
+    """
+    Prepara el contenido crudo de una entidad para cargarlo en bronze
+
+    Si los bytes coinciden con expected_hash (el hash del manifiesto) se retornan tal cual, sin parsear.
+    Los archivos antiguos o editados a mano se parsean y se canonicalizan (camino lento).
+
+    Returns:
+        Tupla (json canónico, record_hash, total_resultado)
+
+    Raises:
+        ValueError: si el contenido no es JSON válido
+    """
+    if expected_hash and hashlib.sha256(raw).hexdigest() == expected_hash:
+        return raw.decode('utf-8'), expected_hash, total
+
+    data = json.loads(raw)
+    canonical = RawStore.canonical_bytes(data)
+    total = data.get('total_resultado') if isinstance(data, dict) else None
+    return canonical.decode('utf-8'), hashlib.sha256(canonical).hexdigest(), total
+
+
+def canonical_from_compressed(compressed: bytes, expected_hash: Optional[str] = None,
+                              total: Any = None) -> Tuple[str, str, Any]:
+    """
+    Como canonical_from_bytes, sobre un registro de segmento comprimido (ver RawStore.read_compressed).
+    Es una función de módulo para poder descomprimir y verificar en un pool de procesos.
+
+    Raises:
+        ValueError: si el contenido no se puede descomprimir o no es JSON válido
+    """
+    try:
+        raw = zlib.decompress(compressed)
+    except zlib.error as e:
+        raise ValueError(f"Registro comprimido inválido: {e}") from None
+    return canonical_from_bytes(raw, expected_hash, total)
+
+
+def read_canonical_file(path: Path, expected_hash: Optional[str] = None, total: Any = None) -> Tuple[str, str, Any]:
+    """
+    Lee un archivo crudo listo para cargar en bronze (ver canonical_from_bytes)
+    Es una función de módulo para poder ejecutarla en un pool de procesos.
+
+    Raises:
+        OSError, ValueError: si el archivo no se puede leer o no es JSON válido
+    """
+    with open(path, 'rb') as file:
+        raw = file.read()
+    return canonical_from_bytes(raw, expected_hash, total)
+
+
+class RawStore:
+    """
+    Ruta única de lectura y escritura de las respuestas crudas de raw_data.
+    Registra cada entidad en el manifiesto del crawl para que las ejecuciones siguientes
+    solo vuelvan a descargar las entidades vencidas y no reescriban ni recarguen las que no cambiaron.
+
+    El contenido se guarda en forma canónica (json.dumps con sort_keys): sus bytes son exactamente
+    los que se hashean como record_hash, así BronzeLoader verifica el hash del manifiesto y envía
+    el contenido tal cual, sin parsear ni volver a serializar el JSON.
+
+    Con storage.backend = 'files' cada entidad es un archivo en la estructura de LAYOUT;
+    con 'segments' las entidades se agregan comprimidas a los segmentos de un SegmentStore.
+
+    En un proceso worker (ver use_worker) el manifiesto y los segmentos escritos son propios del
+    worker y las lecturas recurren además a los principales; el coordinador los integra con merge_workers().
+    """
+    # endpoint -> (clave en paths de config.yaml, nombre del archivo)
+    LAYOUT: Dict[str, Tuple[str, str]] = {
+        'unidades': ('unidades_raw_data', 'unidades.json'),
+        'academicos': ('academics_raw_data', '{id}_academicos_raw.json'),
+        'publicaciones': ('publications_raw_data', '{id}_publications.json'),
+        'proyectos': ('projects_raw_data', '{id}_projects.json'),
+        'tesis': ('theses_raw_data', '{id}_theses.json'),
+    }
+    UNIDADES_ID = 'all'
+    WORKER_LOCK = 'worker.lock'
+
+    # Worker del proceso (main.py --shard o --queue); None en el proceso coordinador
+    _worker: Optional[str] = None
+    _worker_lock = None
+
+    def __init__(self):
+        self.config = Config()
+        self.logger = logging.getLogger('raw_store')
+        incremental = self.config.incremental
+        self.incremental = incremental.get('enabled', False)
+        self.max_age_hours = incremental.get('max_age_hours', {})
+        save_every = incremental.get('save_every', 500)
+        self.worker = self._worker
+        self.manifest = CrawlManifest.for_path(
+            Path(incremental.get('manifest_file', 'raw_data/manifest.json')), save_every
+        )
+        if self.worker is not None:
+            self.manifest = CrawlManifest.for_path(
+                self.worker_dir(self.worker) / 'manifest.json', save_every, base=self.manifest
+            )
+        storage = self.config.storage
+        self.backend = storage.get('backend', 'files')
+        if self.backend not in ('files', 'segments'):
+            raise ValueError(f"Backend de almacenamiento desconocido: {self.backend}")
+        self.segments: Optional[SegmentStore] = None
+        # Segmentos principales, solo para lectura, en un proceso worker
+        self.base_segments: Optional[SegmentStore] = None
+        if self.backend == 'segments':
+            self.segments = SegmentStore.for_path(
+                Path(self.config.paths.get('segments_raw_data', 'raw_data/segments')),
+                storage.get('segment_size_mb', 256),
+                storage.get('compression_level', 6)
+            )
+            if self.worker is not None:
+                self.base_segments = self.segments
+                self.segments = SegmentStore.for_path(
+                    self.worker_dir(self.worker) / 'segments',
+                    storage.get('segment_size_mb', 256),
+                    storage.get('compression_level', 6)
+                )
+
+    @staticmethod
+    def shards_dir() -> Path:
+        """Directorio con los datos de cada worker pendientes de integrar"""
+        return Path(Config().paths.get('shards_raw_data', 'raw_data/shards'))
+
+    @classmethod
+    def worker_dir(cls, worker_id: str) -> Path:
+        return cls.shards_dir() / worker_id
+
+    @classmethod
+    def use_worker(cls, worker_id: str) -> Path:
+        """
+        Pasa el proceso a modo worker: lo que escriban los RawStore creados después (manifiesto y
+        segmentos) queda en shards_raw_data/<worker_id>, sin competir con otros procesos. Con el backend
+        'files' cada entidad ya es un archivo propio y se escribe en su ruta de siempre.
+        El directorio queda bloqueado mientras vive el proceso.
+
+        Returns:
+            Directorio del worker
+
+        Raises:
+            RuntimeError: si otro proceso vivo usa el mismo worker_id
+        """
+        worker_dir = cls.worker_dir(worker_id)
+        worker_dir.mkdir(parents=True, exist_ok=True)
+        lock = cls._lock_worker(worker_dir)
+        if lock is None:
+            raise RuntimeError(f"Ya hay un worker activo con el nombre {worker_id}")
+        cls._worker = worker_id
+        cls._worker_lock = lock
+        return worker_dir
+
+    @classmethod
+    def _lock_worker(cls, worker_dir: Path):
+        """Toma el lock exclusivo del directorio de un worker sin esperar; None si otro proceso lo tiene"""
+        lock = open(worker_dir / cls.WORKER_LOCK, 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                return None
+        return lock
+
+    def path_for(self, endpoint: str, entity_id: Any) -> Path:
+        """Ruta del archivo crudo de una entidad en la estructura de archivos"""
+        path_key, file_pattern = self.LAYOUT[endpoint]
+        return Path(self.config.paths[path_key]) / file_pattern.format(id=entity_id)
+
+    @staticmethod
+    def canonical_bytes(data: Any) -> bytes:
+        """Serialización canónica del contenido: la que se guarda en disco y se carga en bronze"""
+        return json.dumps(data, sort_keys=True).encode('utf-8')
+
+    @staticmethod
+    def content_hash(data: Any) -> str:
+        """Hash del contenido, idéntico al record_hash que calcula BronzeLoader"""
+        return hashlib.sha256(RawStore.canonical_bytes(data)).hexdigest()
+
+    def exists(self, endpoint: str, entity_id: Any) -> bool:
+        """Indica si hay contenido guardado para la entidad"""
+        if self.segments is not None:
+            return self._segments_for(CrawlManifest.key(endpoint, entity_id)) is not None
+        return self.path_for(endpoint, entity_id).exists()
+
+    def _segments_for(self, key: str) -> Optional[SegmentStore]:
+        """Almacén de segmentos que tiene la clave: el propio y, en un worker, luego el principal"""
+        for store in (self.segments, self.base_segments):
+            if store is not None and store.contains(key):
+                return store
+        return None
+
+    def is_fresh(self, endpoint: str, entity_id: Any) -> bool:
+        """
+        Indica si la entidad puede omitirse en esta ejecución
+
+        Sin modo incremental basta con que exista el contenido (comportamiento histórico).
+        En modo incremental además debe estar en el manifiesto y no superar max_age_hours
+        de su endpoint (sin max_age_hours definido nunca vence).
+        """
+        if not self.exists(endpoint, entity_id):
+            return False
+        if not self.incremental:
+            return True
+        age = self.manifest.age(endpoint, entity_id)
+        if age is None:
+            return False
+        max_age_hours = self.max_age_hours.get(endpoint)
+        return max_age_hours is None or age < max_age_hours * 3600
+
+    def write(self, endpoint: str, entity_id: Any, data: Any) -> bool:
+        """
+        Guarda la respuesta cruda de una entidad
+
+        Returns:
+            True si se escribió el contenido, False si no cambió y se omitió la escritura
+        """
+        canonical = self.canonical_bytes(data)
+        record_hash = hashlib.sha256(canonical).hexdigest()
+        entry = self.manifest.get(endpoint, entity_id)
+        now = time.time()
+
+        if self.incremental and entry and entry.get('hash') == record_hash and self.exists(endpoint, entity_id):
+            self.manifest.update(endpoint, entity_id, fetched_at=now)
+            return False
+
+        self._write_bytes(endpoint, entity_id, canonical)
+        metrics.RAW_FILES_WRITTEN.inc(endpoint=endpoint)
+        metrics.RAW_BYTES_WRITTEN.inc(len(canonical), endpoint=endpoint)
+        total = data.get('total_resultado') if isinstance(data, dict) else None
+        self.manifest.update(endpoint, entity_id, fetched_at=now, hash=record_hash, total=total)
+        return True
+
+    def _write_bytes(self, endpoint: str, entity_id: Any, canonical: bytes) -> None:
+        """Escribe los bytes canónicos de una entidad en el backend configurado"""
+        if self.segments is not None:
+            self.segments.put(CrawlManifest.key(endpoint, entity_id), canonical)
+            return
+        path = self.path_for(endpoint, entity_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(canonical)
+
+    def open(self, endpoint: str, entity_id: Any) -> Optional[BinaryIO]:
+        """Stream binario del contenido guardado de una entidad (para leerlo por partes), None si no existe"""
+        if self.segments is not None:
+            key = CrawlManifest.key(endpoint, entity_id)
+            store = self._segments_for(key)
+            return store.open(key) if store is not None else None
+        path = self.path_for(endpoint, entity_id)
+        if not path.exists():
+            return None
+        return open(path, 'rb')
+
+    def iter_records(self, endpoint: str, entity_id: Any, path: Sequence[Union[str, int]]) -> Iterator[Any]:
+        """
+        Recorre uno a uno los elementos del arreglo en path de una entidad, sin cargarla completa
+
+        Raises:
+            ValueError: si el contenido no es JSON válido
+        """
+        stream = self.open(endpoint, entity_id)
+        if stream is None:
+            return
+        with stream:
+            yield from iter_items(stream, path)
+
+    def read_bytes(self, endpoint: str, entity_id: Any) -> Optional[bytes]:
+        """Bytes guardados de una entidad, None si no existe"""
+        if self.segments is not None:
+            key = CrawlManifest.key(endpoint, entity_id)
+            store = self._segments_for(key)
+            return store.get(key) if store is not None else None
+        path = self.path_for(endpoint, entity_id)
+        if not path.exists():
+            return None
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def read_compressed(self, endpoint: str, entity_id: Any) -> Optional[bytes]:
+        """
+        Bytes de una entidad tal como están guardados en los segmentos (zlib), sin descomprimir.
+        Permite enviar la descompresión y el hash a otro proceso (ver canonical_from_compressed).
+        None si no existe o si el backend no es 'segments'.
+        """
+        if self.segments is None:
+            return None
+        key = CrawlManifest.key(endpoint, entity_id)
+        store = self._segments_for(key)
+        return store.get_compressed(key) if store is not None else None
+
+    def read(self, endpoint: str, entity_id: Any) -> Any:
+        """
+        Contenido JSON guardado de una entidad, None si no existe
+
+        Raises:
+            ValueError: si el contenido no es JSON válido
+        """
+        raw = self.read_bytes(endpoint, entity_id)
+        return json.loads(raw) if raw is not None else None
+
+    def iter_ids(self, endpoint: str) -> Iterator[int]:
+        """
+        Ids de las entidades guardadas de un endpoint
+
+        En segmentos se recorren en el orden físico de los registros, para que las lecturas sean secuenciales.
+        """
+        if self.segments is not None:
+            prefix = CrawlManifest.key(endpoint, '')
+            for key in self.segments.keys(prefix):
+                entity_id = key[len(prefix):]
+                if entity_id.isdigit():
+                    yield int(entity_id)
+            return
+
+        path_key, file_pattern = self.LAYOUT[endpoint]
+        for raw_file in Path(self.config.paths[path_key]).glob(file_pattern.format(id='*')):
+            entity_id = raw_file.stem.split('_')[0]
+            if not raw_file.is_file() or not entity_id.isdigit():
+                self.logger.error(f"ID inválido en el nombre del archivo: {raw_file}")
+                continue
+            yield int(entity_id)
+
+    def read_canonical(self, endpoint: str, entity_id: Any) -> Tuple[str, str, Any]:
+        """
+        Lee el contenido de una entidad listo para cargar en bronze (ver canonical_from_bytes)
+
+        Raises:
+            OSError, ValueError: si el contenido no se puede leer o no es JSON válido
+        """
+        entry = self.manifest.get(endpoint, entity_id) or {}
+        if self.segments is None:
+            return read_canonical_file(self.path_for(endpoint, entity_id), entry.get('hash'), entry.get('total'))
+        raw = self.read_bytes(endpoint, entity_id)
+        if raw is None:
+            raise FileNotFoundError(f"Sin registro para {CrawlManifest.key(endpoint, entity_id)}")
+        return canonical_from_bytes(raw, entry.get('hash'), entry.get('total'))
+
+    def needs_load(self, endpoint: str, entity_id: Any, marker: str = 'loaded_hash') -> bool:
+        """
+        Indica si la entidad cambió desde su última carga en bronze
+
+        Args:
+            marker: Campo del manifiesto con el hash cargado; cada forma de carga (archivo completo o
+                por registro) lleva el suyo, así cambiar de forma vuelve a cargar todo
+        """
+        if not self.incremental:
+            return True
+        entry = self.manifest.get(endpoint, entity_id)
+        return not entry or 'hash' not in entry or entry.get(marker) != entry['hash']
+
+    def mark_loaded(self, endpoint: str, entity_id: Any, marker: str = 'loaded_hash') -> None:
+        """Registra que el contenido actual de la entidad ya está en bronze (ver needs_load)"""
+        entry = self.manifest.get(endpoint, entity_id)
+        if entry and 'hash' in entry:
+            self.manifest.update(endpoint, entity_id, **{marker: entry['hash']})
+
+    def export_files(self) -> int:
+        """
+        Escribe el contenido de los segmentos en la estructura de archivos (un archivo por entidad)
+
+        Returns:
+            Número de archivos escritos
+        """
+        if self.segments is None:
+            raise ValueError("La exportación requiere storage.backend = 'segments'")
+        total = 0
+        for key, data in self.segments.scan():
+            endpoint, entity_id = key.split(':', 1)
+            path = self.path_for(endpoint, entity_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(data)
+            total += 1
+        self.logger.info(f"Exportados {total} archivos desde los segmentos")
+        return total
+
+    def import_files(self) -> int:
+        """
+        Agrega a los segmentos los archivos existentes en la estructura de archivos
+
+        Returns:
+            Número de entidades importadas
+        """
+        if self.segments is None:
+            raise ValueError("La importación requiere storage.backend = 'segments'")
+        total = 0
+        for endpoint, (path_key, file_pattern) in self.LAYOUT.items():
+            for raw_file in Path(self.config.paths[path_key]).glob(file_pattern.format(id='*')):
+                entity_id = raw_file.stem.split('_')[0] if endpoint != 'unidades' else self.UNIDADES_ID
+                with open(raw_file, 'rb') as file:
+                    self.segments.put(CrawlManifest.key(endpoint, entity_id), file.read())
+                total += 1
+        self.save()
+        self.logger.info(f"Importados {total} archivos a los segmentos")
+        return total
+
+    def merge_workers(self) -> int:
+        """
+        Integra en el manifiesto y los segmentos principales lo descargado por los workers, y elimina
+        sus directorios. Los workers que siguen vivos (lock tomado) se omiten hasta la próxima vez.
+
+        Returns:
+            Número de entidades integradas
+        """
+        if self.worker is not None:
+            raise ValueError("merge_workers solo se ejecuta en el proceso coordinador")
+        shards_dir = self.shards_dir()
+        if not shards_dir.exists():
+            return 0
+        total = 0
+        for worker_dir in sorted(path for path in shards_dir.iterdir() if path.is_dir()):
+            lock = self._lock_worker(worker_dir)
+            if lock is None:
+                self.logger.info(f"Worker {worker_dir.name} sigue activo, se integrará más adelante")
+                continue
+            try:
+                merged = self._merge_worker(worker_dir)
+                self.save()
+                shutil.rmtree(worker_dir)
+            finally:
+                lock.close()
+            self.logger.info(f"Integradas {merged} entidades del worker {worker_dir.name}")
+            total += merged
+        return total
+
+    def _merge_worker(self, worker_dir: Path) -> int:
+        """Copia los segmentos de un worker (backend 'segments') y fusiona su manifiesto con el principal"""
+        segments_dir = worker_dir / 'segments'
+        if self.segments is not None and segments_dir.exists():
+            # Primero los datos: una entrada del manifiesto sin su registro haría creer fresca a la entidad
+            worker_segments = SegmentStore(segments_dir)
+            try:
+                self.segments.merge(worker_segments)
+            finally:
+                worker_segments.close()
+        return self.manifest.merge(CrawlManifest(worker_dir / 'manifest.json').entries())
+
+    def clear(self) -> None:
+        """Olvida el manifiesto y elimina los segmentos"""
+        self.manifest.clear()
+        if self.segments is not None:
+            self.segments.clear()
+
+    def save(self) -> None:
+        """Persiste el manifiesto y el índice de los segmentos"""
+        self.manifest.save()
+        if self.segments is not None:
+            self.segments.save()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+    parser = argparse.ArgumentParser(description="Mantenimiento del almacén de datos crudos")
+    parser.add_argument('command', choices=['export', 'import', 'compact'],
+                        help="export: segmentos -> archivos; import: archivos -> segmentos; compact: elimina registros reemplazados")
+    args = parser.parse_args()
+
+    store = RawStore()
+    if args.command == 'export':
+        store.export_files()
+    elif args.command == 'import':
+        store.import_files()
+    else:
+        if store.segments is None:
+            parser.error("compact requiere storage.backend = 'segments'")
+        store.segments.compact()
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Caché persistente de respuestas HTTP de la API, en SQLite.
+    La clave es el endpoint más los parámetros canonicalizados; se guarda el cuerpo codificado
+    tal como lo entrega el servidor, direccionado por su sha256 (cuerpos idénticos se guardan una vez).
+    Cada endpoint tiene su TTL y el tamaño total de los cuerpos se acota expulsando las entradas
+    usadas hace más tiempo (LRU).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            body_hash TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+        CREATE INDEX IF NOT EXISTS entries_body_hash ON entries (body_hash);
+        CREATE TABLE IF NOT EXISTS bodies (
+            hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        );
+    """
+
+    def __init__(self, db_file: Path, max_size_mb: int = 2048, ttl_hours: Optional[Dict[str, float]] = None):
+        self.db_file = Path(db_file)
+        self.max_size = max_size_mb * 1024 * 1024
+        self.ttl_hours = ttl_hours or {}
+        self.logger = logging.getLogger('response_cache')
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Con varios workers (--shard/--queue) la caché es compartida: se espera el lock en vez de fallar
+        self._conn = sqlite3.connect(str(self.db_file), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    @staticmethod
+    def canonical_params(params: Optional[Dict[str, Any]]) -> str:
+        """Parámetros en forma canónica: claves ordenadas y valores como texto, igual que en la URL"""
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+        return json.dumps(items, separators=(',', ':'))
+
+    @classmethod
+    def key(cls, endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        """Clave de caché de una consulta"""
+        return hashlib.sha256(f"{endpoint}?{cls.canonical_params(params)}".encode('utf-8')).hexdigest()
+
+    def _ttl_seconds(self, endpoint: str) -> Optional[float]:
+        """TTL del endpoint en segundos; None si no vence"""
+        ttl = self.ttl_hours.get(endpoint, self.ttl_hours.get('default'))
+        return ttl * 3600 if ttl is not None else None
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]], ignore_ttl: bool = False) -> Optional[Tuple[int, str]]:
+        """
+        Busca la respuesta de una consulta
+
+        Args:
+            endpoint: Nombre del endpoint
+            params: Parámetros de la consulta
+            ignore_ttl: Si es True se sirven también las entradas vencidas (modo replay)
+
+        Returns:
+            Tupla (status, cuerpo codificado) o None si no hay entrada vigente
+        """
+        key = self.key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.status, e.stored_at, b.data FROM entries e JOIN bodies b ON b.hash = e.body_hash "
+                "WHERE e.key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            status, stored_at, data = row
+            ttl = self._ttl_seconds(endpoint)
+            if not ignore_ttl and ttl is not None and now - stored_at > ttl:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return status, zlib.decompress(data).decode('utf-8')
+
+    def put(self, endpoint: str, params: Optional[Dict[str, Any]], status: int, body: str) -> None:
+        """Guarda la respuesta de una consulta y aplica el límite de tamaño"""
+        key = self.key(endpoint, params)
+        raw = body.encode('utf-8')
+        body_hash = hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT body_hash FROM entries WHERE key = ?", (key,)).fetchone()
+            exists = self._conn.execute("SELECT 1 FROM bodies WHERE hash = ?", (body_hash,)).fetchone()
+            if not exists:
+                data = zlib.compress(raw)
+                self._conn.execute("INSERT INTO bodies (hash, size, data) VALUES (?, ?, ?)",
+                                   (body_hash, len(data), data))
+                self._size += len(data)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, endpoint, params, status, body_hash, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, self.canonical_params(params), status, body_hash, now, now)
+            )
+            if previous and previous[0] != body_hash:
+                self._delete_orphan_bodies([previous[0]])
+            if self._size > self.max_size:
+                self._evict()
+            self._conn.commit()
+
+    def delete(self, endpoint: str, params: Optional[Dict[str, Any]]) -> None:
+        """Elimina la respuesta de una consulta (por ejemplo, un cuerpo que no se pudo decodificar)"""
+        key = self.key(endpoint, params)
+        with self._lock:
+            row = self._conn.execute("SELECT body_hash FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._delete_orphan_bodies([row[0]])
+            self._conn.commit()
+
+    def _delete_orphan_bodies(self, body_hashes) -> None:
+        """Elimina los cuerpos dados que ya no referencia ninguna entrada"""
+        for body_hash in set(body_hashes):
+            if self._conn.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone():
+                continue
+            row = self._conn.execute("SELECT size FROM bodies WHERE hash = ?", (body_hash,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM bodies WHERE hash = ?", (body_hash,))
+                self._size -= row[0]
+
+    def _evict(self) -> None:
+        """Expulsa las entradas menos usadas hasta quedar bajo el 90% del tamaño máximo"""
+        target = self.max_size * 0.9
+        evicted = 0
+        oldest = self._conn.execute("SELECT key, body_hash FROM entries ORDER BY last_access").fetchall()
+        for key, body_hash in oldest:
+            if self._size <= target:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._delete_orphan_bodies([body_hash])
+            evicted += 1
+        self.logger.info(f"Caché sobre el límite: {evicted} entradas expulsadas ({self._size / 1e6:.1f} MB)")
+
+    def clear(self) -> None:
+        """Elimina todas las entradas"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM bodies")
+            self._conn.commit()
+            self._size = 0
+
+    def close(self) -> None:
+        """Cierra la base de datos de la caché"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from config import Config
+from raw_store import RawStore
+
+
+def iter_academicos(raw_store: RawStore, logger: logging.Logger) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Recorre el roster de académicos de todas las unidades descargadas
+
+    Lee las unidades y los académicos de cada unidad una sola vez. Los académicos se leen de forma
+    incremental (ver json_stream): el primero está disponible sin parsear el roster completo.
+
+    Yields:
+        Tuplas (unidad_id, profesor) en el orden de las unidades
+    """
+    unidades = raw_store.read('unidades', RawStore.UNIDADES_ID)
+    if unidades is None:
+        raise FileNotFoundError(f"No hay unidades descargadas: {raw_store.path_for('unidades', RawStore.UNIDADES_ID)}")
+
+    for unidad in unidades:
+        unidad_id = unidad.get('id')
+        unidad_nombre = unidad.get('nombre')
+        logger.info(f"** Procesando unidad: {unidad_nombre} **")
+        if not raw_store.exists('academicos', unidad_id):
+            logger.error(f"Archivo de académicos no encontrado para unidad {unidad_nombre} (ID: {unidad_id})")
+            continue
+        for profesor in raw_store.iter_records('academicos', unidad_id, ('academicos',)):
+            yield unidad_id, profesor
+
+
+class RosterIndex:
+    """
+    Índice global del roster en SQLite, construido una vez tras el estado PROFESORES.
+    Mapea id_persona al nombre, las unidades donde aparece y el último registro visto, de modo que
+    los estados siguientes recorren una lista ya deduplicada en lugar de volver a leer los archivos
+    de académicos de todas las unidades. Los académicos que dejan de aparecer se conservan inactivos.
+    El índice guarda una huella de los archivos de académicos (sus hashes en el manifiesto) y se
+    reconstruye solo cuando cambian.
+    Hay una instancia por archivo, compartida entre todos los scrapers del proceso.
+    """
+    _instances: Dict[str, 'RosterIndex'] = {}
+    _instances_lock = threading.Lock()
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS academicos (
+            id_persona INTEGER PRIMARY KEY,
+            nombre_completo TEXT,
+            data TEXT NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS academico_unidades (
+            id_persona INTEGER NOT NULL,
+            unidad_id INTEGER NOT NULL,
+            PRIMARY KEY (id_persona, unidad_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_file: Path, batch_size: int = 1000):
+        self.db_file = Path(db_file)
+        self.batch_size = batch_size
+        self.logger = logging.getLogger('roster_index')
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Journal por defecto (no WAL): los workers de otras máquinas lo leen desde un sistema de archivos compartido
+        self._conn = sqlite3.connect(str(self.db_file), timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def for_path(cls, db_file: Path) -> 'RosterIndex':
+        """Retorna la instancia compartida para un archivo de índice"""
+        key = str(Path(db_file).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(db_file)
+            return cls._instances[key]
+
+    @classmethod
+    def default(cls) -> 'RosterIndex':
+        """Índice configurado en roster_index.db_file"""
+        return cls.for_path(Path(Config().roster_index.get('db_file', 'raw_data/roster_index.sqlite')))
+
+    @staticmethod
+    def fingerprint(raw_store: RawStore) -> Optional[str]:
+        """Huella del roster descargado (unidades y hash de cada archivo de académicos); None si no hay unidades"""
+        unidades = raw_store.read('unidades', RawStore.UNIDADES_ID)
+        if unidades is None:
+            return None
+        digest = hashlib.sha256()
+        for unidad in unidades:
+            unidad_id = unidad.get('id')
+            entry = raw_store.manifest.get('academicos', unidad_id) or {}
+            present = raw_store.exists('academicos', unidad_id)
+            digest.update(f"{unidad_id}:{entry.get('hash') if present else '-'}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_current(self, raw_store: RawStore) -> bool:
+        """Indica si el índice corresponde a los archivos de académicos descargados"""
+        fingerprint = self.fingerprint(raw_store)
+        with self._lock:
+            return fingerprint is not None and self._meta('fingerprint') == fingerprint
+
+    def ensure(self, raw_store: RawStore, logger: Optional[logging.Logger] = None) -> 'RosterIndex':
+        """Reconstruye el índice si el roster cambió desde la última construcción"""
+        if not self.is_current(raw_store):
+            self.rebuild(raw_store, logger or self.logger)
+        return self
+
+    def rebuild(self, raw_store: RawStore, logger: logging.Logger) -> int:
+        """
+        Construye el índice leyendo el roster de todas las unidades una sola vez
+
+        Returns:
+            Cantidad de académicos distintos
+        """
+        start = time.time()
+        fingerprint = self.fingerprint(raw_store)
+        rows = 0
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE academicos SET active = 0")
+            self._conn.execute("DELETE FROM academico_unidades")
+            batch = []
+            for unidad_id, profesor in iter_academicos(raw_store, logger):
+                id_persona = profesor.get('id_persona')
+                if id_persona is None:
+                    continue
+                batch.append((id_persona, profesor.get('nombre_completo'), json.dumps(profesor, sort_keys=True),
+                              start, start, unidad_id))
+                rows += 1
+                if len(batch) >= self.batch_size:
+                    self._insert(batch)
+                    batch = []
+            self._insert(batch)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint or '',))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)", (str(start),))
+            total = self._conn.execute("SELECT COUNT(*) FROM academicos WHERE active = 1").fetchone()[0]
+        self.logger.info(
+            f"Índice del roster construido en {time.time() - start:.2f}s: {total} académicos distintos "
+            f"({rows - total} apariciones repetidas entre unidades)"
+        )
+        return total
+
+    def _insert(self, batch) -> None:
+        """Inserta o actualiza un lote de (id_persona, nombre, data, first_seen, last_seen, unidad_id)"""
+        if not batch:
+            return
+        self._conn.executemany(
+            """
+            INSERT INTO academicos (id_persona, nombre_completo, data, first_seen, last_seen, active)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (id_persona) DO UPDATE SET
+                nombre_completo = excluded.nombre_completo,
+                data = excluded.data,
+                last_seen = excluded.last_seen,
+                active = 1
+            """,
+            [row[:5] for row in batch]
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO academico_unidades (id_persona, unidad_id) VALUES (?, ?)",
+            [(row[0], row[5]) for row in batch]
+        )
+
+    def publish(self) -> None:
+        """Registra una nueva publicación del roster (fin de PROFESORES); la cola de trabajo se rellena con cada una"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('published_at', ?)", (str(time.time()),))
+
+    def generation(self) -> Optional[str]:
+        """Identificador de la última publicación del roster; None si nunca se publicó"""
+        with self._lock:
+            return self._meta('published_at')
+
+    def iter_academicos(self) -> Iterator[Tuple[int, str]]:
+        """Académicos activos sin repetir, como (id_persona, nombre_completo), leídos por lotes"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id_persona, nombre_completo FROM academicos WHERE active = 1 ORDER BY id_persona"
+            )
+            rows = cursor.fetchmany(self.batch_size)
+        while rows:
+            yield from rows
+            with self._lock:
+                rows = cursor.fetchmany(self.batch_size)
+
+    def get(self, id_persona: int) -> Optional[Dict[str, Any]]:
+        """Datos de un académico: nombre, unidades, último registro visto y fechas; None si no está"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT nombre_completo, data, first_seen, last_seen, active FROM academicos WHERE id_persona = ?",
+                (id_persona,)
+            ).fetchone()
+            if row is None:
+                return None
+            unidades = [unidad for (unidad,) in self._conn.execute(
+                "SELECT unidad_id FROM academico_unidades WHERE id_persona = ? ORDER BY unidad_id", (id_persona,)
+            )]
+        nombre_completo, data, first_seen, last_seen, active = row
+        return {
+            'id_persona': id_persona,
+            'nombre_completo': nombre_completo,
+            'unidades': unidades,
+            'data': json.loads(data),
+            'first_seen': first_seen,
+            'last_seen': last_seen,
+            'active': bool(active),
+        }
+
+    def count(self) -> int:
+        """Cantidad de académicos activos"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM academicos WHERE active = 1").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Set
+
+
+class JournalScope:
+    """Vista del journal restringida a un estado, para marcar el progreso por entidad"""
+    def __init__(self, journal: 'RunJournal', state: str):
+        self.journal = journal
+        self.state = state
+
+    def is_done(self, key: str) -> bool:
+        """Indica si la entidad ya se completó en este estado"""
+        return self.journal.is_task_done(self.state, key)
+
+    def mark_done(self, key: str) -> None:
+        """Registra la entidad como completada en este estado"""
+        self.journal.mark_task_done(self.state, key)
+
+
+class RunJournal:
+    """
+    Journal durable de la ejecución, en formato JSON Lines y solo con appends pequeños.
+    Registra los estados completados y las entidades terminadas dentro de cada estado,
+    para que --resume retome desde la primera tarea pendiente tras una caída.
+    """
+    def __init__(self, journal_file: Path, resume: bool = False, fsync: bool = False):
+        self.journal_file = Path(journal_file)
+        self.fsync = fsync
+        self.logger = logging.getLogger('run_journal')
+        self._lock = threading.Lock()
+        self._completed_states: Set[str] = set()
+        self._done_tasks: Dict[str, Set[str]] = {}
+
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            self._replay()
+        elif self.journal_file.exists():
+            self.journal_file.unlink()
+        self._file = open(self.journal_file, 'a', encoding='utf-8')
+        self._append({'event': 'run_start', 'resume': resume})
+
+    def _replay(self) -> None:
+        """Reconstruye el progreso desde el journal de la ejecución anterior"""
+        if not self.journal_file.exists():
+            self.logger.warning(f"No hay journal previo en {self.journal_file}, se inicia desde cero")
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última línea truncada por la caída: se ignora
+                    continue
+                if record.get('event') == 'state_done':
+                    self._completed_states.add(record['state'])
+                elif record.get('event') == 'task_done':
+                    self._done_tasks.setdefault(record['state'], set()).add(record['key'])
+        total_tasks = sum(len(keys) for keys in self._done_tasks.values())
+        self.logger.info(
+            f"Journal recuperado: {len(self._completed_states)} estados y {total_tasks} tareas completadas"
+        )
+
+    def _append(self, record: Dict) -> None:
+        """Agrega una línea al journal y la lleva a disco"""
+        record['ts'] = time.time()
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def is_state_done(self, state: str) -> bool:
+        """Indica si el estado se completó en la ejecución anterior"""
+        return state in self._completed_states
+
+    def mark_state_done(self, state: str) -> None:
+        """Registra un estado completado"""
+        self._completed_states.add(state)
+        self._append({'event': 'state_done', 'state': state})
+
+    def is_task_done(self, state: str, key: str) -> bool:
+        """Indica si una entidad de un estado ya se completó"""
+        with self._lock:
+            return key in self._done_tasks.get(state, ())
+
+    def mark_task_done(self, state: str, key: str) -> None:
+        """Registra una entidad completada dentro de un estado"""
+        with self._lock:
+            self._done_tasks.setdefault(state, set()).add(key)
+        self._append({'event': 'task_done', 'state': state, 'key': key})
+
+    def scope(self, state: str) -> JournalScope:
+        """Retorna la vista del journal para un estado"""
+        return JournalScope(self, state)
+
+    def close(self) -> None:
+        """Cierra el archivo del journal"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
@@ -0,0 +1,346 @@
+import io
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Cabecera de cada registro: magic, largo de la clave, largo de los datos comprimidos, crc32 de los datos
+MAGIC = b'RSG1'
+HEADER = struct.Struct('<4sHII')
+# Bytes comprimidos leídos del mapa por vez en la lectura incremental (open)
+STREAM_CHUNK = 64 * 1024
+
+
+class SegmentStore:
+    """
+    Almacén de respuestas crudas en pocos archivos de segmento, en lugar de un archivo por entidad.
+    Cada registro (clave endpoint:id + bytes comprimidos con zlib) se agrega al segmento activo;
+    un índice en memoria clave -> (segmento, offset, largo) permite saber en O(1) si una entidad existe
+    y leerla con acceso aleatorio sobre el archivo mapeado en memoria.
+    Reescribir una clave agrega un registro nuevo y el anterior queda como basura hasta compact().
+    Hay una instancia por directorio, compartida entre todos los scrapers del proceso.
+    """
+    _instances: Dict[str, 'SegmentStore'] = {}
+    _instances_lock = threading.Lock()
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory: Path, segment_size_mb: int = 256, compression_level: int = 6):
+        self.directory = Path(directory)
+        self.segment_size = segment_size_mb * 1024 * 1024
+        self.compression_level = compression_level
+        self.logger = logging.getLogger('segment_store')
+        self._lock = threading.RLock()
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._readers: Dict[int, object] = {}
+        self._active: Optional[int] = None
+        self._writer = None
+        self._open()
+
+    @classmethod
+    def for_path(cls, directory: Path, segment_size_mb: int = 256, compression_level: int = 6) -> 'SegmentStore':
+        """Retorna la instancia compartida para un directorio de segmentos"""
+        key = str(Path(directory).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(directory, segment_size_mb, compression_level)
+            return cls._instances[key]
+
+    def _segment_path(self, segment: int) -> Path:
+        """Ruta del archivo de un segmento"""
+        return self.directory / f"segment-{segment:05d}.seg"
+
+    def _segments(self) -> List[int]:
+        """Números de los segmentos existentes, en orden"""
+        return sorted(int(p.stem.split('-')[1]) for p in self.directory.glob("segment-*.seg"))
+
+    def _open(self) -> None:
+        """Carga el índice persistido o lo reconstruye recorriendo los segmentos"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        sizes = {str(s): self._segment_path(s).stat().st_size for s in segments}
+        if not self._load_index(sizes):
+            self._index = {}
+            for segment in segments:
+                self._scan_segment(segment)
+            self.logger.info(f"Índice reconstruido: {len(self._index)} registros en {len(segments)} segmentos")
+        self._active = segments[-1] if segments else 0
+
+    def _load_index(self, sizes: Dict[str, int]) -> bool:
+        """Carga index.json si corresponde exactamente a los segmentos en disco"""
+        index_file = self.directory / self.INDEX_FILE
+        if not index_file.exists():
+            return False
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if snapshot.get('sizes') != sizes:
+            return False
+        self._index = {key: tuple(location) for key, location in snapshot.get('entries', {}).items()}
+        return True
+
+    def _scan_segment(self, segment: int) -> None:
+        """
+        Agrega al índice los registros de un segmento
+
+        Un registro final incompleto o corrupto (escritura interrumpida) se descarta truncando el segmento.
+        """
+        path = self._segment_path(segment)
+        valid_size = 0
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                magic, key_len, data_len, crc = HEADER.unpack(header)
+                key = f.read(key_len)
+                data = f.read(data_len)
+                if magic != MAGIC or len(key) < key_len or len(data) < data_len or zlib.crc32(data) != crc:
+                    break
+                self._index[key.decode('utf-8')] = (segment, valid_size, HEADER.size + key_len + data_len)
+                valid_size += HEADER.size + key_len + data_len
+        if valid_size < path.stat().st_size:
+            self.logger.warning(f"Registro incompleto al final de {path.name}, se trunca en {valid_size} bytes")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def contains(self, key: str) -> bool:
+        """Indica si la clave tiene un registro (O(1), sin acceso a disco)"""
+        return key in self
+
+    def put(self, key: str, data: bytes) -> None:
+        """Agrega el registro de una clave al segmento activo"""
+        compressed = zlib.compress(data, self.compression_level)
+        with self._lock:
+            self._put_compressed(key, compressed)
+            # Los lectores usan mmap sobre el mismo archivo: el registro debe quedar en el archivo
+            self._writer.flush()
+
+    def _get_writer(self):
+        """Archivo del segmento activo abierto para agregar"""
+        if self._writer is None:
+            self._writer = open(self._segment_path(self._active), 'ab')
+        return self._writer
+
+    def _roll(self) -> None:
+        """Cierra el segmento activo y empieza uno nuevo"""
+        self._writer.close()
+        self._writer = None
+        self._active += 1
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        """Mapa en memoria del segmento que cubre al menos hasta el byte end"""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            reader = self._readers.get(segment)
+            if reader is None:
+                reader = self._readers[segment] = open(self._segment_path(segment), 'rb')
+            mapped = self._maps[segment] = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+
+    def _read_record(self, location: Tuple[int, int, int]) -> bytes:
+        """Bytes comprimidos del registro en una ubicación del índice"""
+        segment, offset, length = location
+        with self._lock:
+            record = self._map(segment, offset + length)[offset:offset + length]
+        _, key_len, _, _ = HEADER.unpack_from(record)
+        return record[HEADER.size + key_len:]
+
+    def _read_range(self, segment: int, start: int, end: int) -> bytes:
+        """Copia un rango de bytes de un segmento"""
+        with self._lock:
+            return self._map(segment, end)[start:end]
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        Stream de lectura de los datos de una clave, None si no existe
+
+        Descomprime por bloques a medida que se lee, sin materializar el registro completo.
+        """
+        with self._lock:
+            location = self._index.get(key)
+        if location is None:
+            return None
+        segment, offset, length = location
+        _, key_len, _, _ = HEADER.unpack(self._read_range(segment, offset, offset + HEADER.size))
+        start = offset + HEADER.size + key_len
+        return io.BufferedReader(_RecordStream(self, segment, start, offset + length), STREAM_CHUNK)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Retorna los datos de una clave o None si no existe"""
+        with self._lock:
+            location = self._index.get(key)
+        if location is None:
+            return None
+        return zlib.decompress(self._read_record(location))
+
+    def get_compressed(self, key: str) -> Optional[bytes]:
+        """Datos de una clave tal como están en el segmento (comprimidos con zlib), o None si no existe"""
+        with self._lock:
+            location = self._index.get(key)
+        if location is None:
+            return None
+        return self._read_record(location)
+
+    def keys(self, prefix: str = '') -> List[str]:
+        """Claves vigentes con el prefijo dado, en el orden físico de los segmentos"""
+        with self._lock:
+            items = [(location, key) for key, location in self._index.items() if key.startswith(prefix)]
+        return [key for _, key in sorted(items)]
+
+    def scan(self, prefix: str = '') -> Iterator[Tuple[str, bytes]]:
+        """Recorre secuencialmente los registros vigentes con el prefijo dado"""
+        for key in self.keys(prefix):
+            data = self.get(key)
+            if data is not None:
+                yield key, data
+
+    def save(self) -> None:
+        """Persiste el índice de forma atómica (archivo temporal + replace)"""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+            sizes = {str(s): self._segment_path(s).stat().st_size for s in self._segments()}
+            snapshot = {'sizes': sizes, 'entries': dict(self._index)}
+        index_file = self.directory / self.INDEX_FILE
+        tmp_file = index_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_file, index_file)
+
+    def compact(self) -> Tuple[int, int]:
+        """
+        Reescribe solo los registros vigentes en segmentos nuevos y elimina los antiguos
+
+        Returns:
+            Tupla (bytes antes, bytes después)
+        """
+        with self._lock:
+            before = sum(self._segment_path(s).stat().st_size for s in self._segments())
+            live = [(key, self._read_record(self._index[key])) for key in self.keys()]
+            self._close_files()
+            compact_dir = self.directory.with_name(self.directory.name + '.compact')
+            if compact_dir.exists():
+                shutil.rmtree(compact_dir)
+            compacted = SegmentStore(compact_dir, self.segment_size // (1024 * 1024), self.compression_level)
+            for key, compressed in live:
+                compacted._put_compressed(key, compressed)
+            compacted.save()
+            compacted.close()
+            shutil.rmtree(self.directory)
+            os.replace(compact_dir, self.directory)
+            self._index = {}
+            self._open()
+            after = sum(self._segment_path(s).stat().st_size for s in self._segments())
+        self.logger.info(f"Segmentos compactados: {before} -> {after} bytes")
+        return before, after
+
+    def merge(self, other: 'SegmentStore') -> int:
+        """
+        Copia al segmento activo los registros vigentes de otro almacén (el de un worker), sin descomprimirlos
+
+        Returns:
+            Número de registros copiados
+        """
+        keys = other.keys()
+        with self._lock:
+            for key in keys:
+                with other._lock:
+                    location = other._index[key]
+                self._put_compressed(key, other._read_record(location))
+            if self._writer is not None:
+                self._writer.flush()
+        return len(keys)
+
+    def _put_compressed(self, key: str, compressed: bytes) -> None:
+        """Agrega un registro ya comprimido al segmento activo"""
+        key_bytes = key.encode('utf-8')
+        record = HEADER.pack(MAGIC, len(key_bytes), len(compressed), zlib.crc32(compressed)) + key_bytes + compressed
+        with self._lock:
+            writer = self._get_writer()
+            if writer.tell() > 0 and writer.tell() + len(record) > self.segment_size:
+                self._roll()
+                writer = self._get_writer()
+            self._index[key] = (self._active, writer.tell(), len(record))
+            writer.write(record)
+
+    def _close_files(self) -> None:
+        """Cierra los mapas en memoria y los archivos abiertos"""
+        for mapped in self._maps.values():
+            mapped.close()
+        for reader in self._readers.values():
+            reader.close()
+        self._maps = {}
+        self._readers = {}
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def clear(self) -> None:
+        """Elimina todos los registros y los archivos de segmento"""
+        with self._lock:
+            self._close_files()
+            self._index = {}
+            if self.directory.exists():
+                shutil.rmtree(self.directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._active = 0
+
+    def close(self) -> None:
+        """Cierra los archivos del almacén"""
+        with self._lock:
+            self._close_files()
+
+
+class _RecordStream(io.RawIOBase):
+    """Lectura incremental de un registro: lee los bytes comprimidos por bloques y los descomprime"""
+
+    def __init__(self, store: SegmentStore, segment: int, start: int, end: int):
+        self._store = store
+        self._segment = segment
+        self._pos = start
+        self._end = end
+        self._inflate = zlib.decompressobj()
+        self._pending = b''
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._pending):
+            if self._pos >= self._end:
+                self._pending = self._inflate.flush()
+                self._offset = 0
+                if not self._pending:
+                    return 0
+                break
+            chunk_end = min(self._end, self._pos + STREAM_CHUNK)
+            chunk = self._store._read_range(self._segment, self._pos, chunk_end)
+            self._pos = chunk_end
+            self._pending = self._inflate.decompress(chunk)
+            self._offset = 0
+        size = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:size] = self._pending[self._offset:self._offset + size]
+        self._offset += size
+        return size
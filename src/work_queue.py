@@ -0,0 +1,215 @@
+"""
+Reparto de los académicos entre varios procesos o máquinas (main.py --shard i/n o --queue).
+
+Con --shard cada proceso toma una partición fija: los id_persona cuyo shard_of(id, n) es i.
+Con --queue los procesos toman lotes de una cola compartida en SQLite, con lease: un worker que
+muere deja de renovarlo y sus académicos vuelven a quedar disponibles para los demás.
+"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config import Config
+
+
+def shard_of(id_persona: int, shards: int) -> int:
+    """Shard (0 a shards-1) de un académico, estable entre procesos y máquinas (crc32 del id)"""
+    return zlib.crc32(str(id_persona).encode('utf-8')) % shards
+
+
+def default_worker_id() -> str:
+    """Nombre de worker único por proceso: máquina y pid"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Cola de académicos en SQLite compartida por los workers de --queue.
+    El primer worker que llega tras una publicación del roster (RosterIndex.publish, al final de
+    PROFESORES) la llena con todos los académicos activos. Cada worker toma lotes con claim(), que
+    quedan a su nombre hasta lease_seconds; heartbeat() los renueva mientras trabaja. Los lotes con
+    lease vencido (worker muerto) los vuelve a tomar cualquier otro worker.
+    Usa el journal por defecto de SQLite (no WAL), con lock del archivo en cada transacción, para
+    poder compartirla entre máquinas sobre un sistema de archivos con locks POSIX.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id_persona INTEGER PRIMARY KEY,
+            nombre_completo TEXT,
+            state TEXT NOT NULL DEFAULT 'pending',
+            owner TEXT,
+            lease_until REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_file: Path, lease_seconds: float = 300, batch_size: int = 1000):
+        self.db_file = Path(db_file)
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.logger = logging.getLogger('work_queue')
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level None: las transacciones se abren explícitamente con BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.db_file), timeout=60, isolation_level=None, check_same_thread=False)
+        with self._transaction():
+            for statement in self.SCHEMA.split(';'):
+                if statement.strip():
+                    self._conn.execute(statement)
+
+    @classmethod
+    def default(cls) -> 'WorkQueue':
+        """Cola configurada en la sección work_queue"""
+        work_queue = Config().work_queue
+        return cls(Path(work_queue.get('db_file', 'raw_data/work_queue.sqlite')),
+                   lease_seconds=work_queue.get('lease_seconds', 300))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transacción con lock de escritura tomado desde el inicio (entre procesos)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def fill(self, academicos: Iterable[Tuple[int, str]], generation: str) -> int:
+        """
+        Llena la cola con los académicos de una publicación del roster, si aún no se hizo
+
+        Args:
+            academicos: Pares (id_persona, nombre_completo)
+            generation: Identificador de la publicación (RosterIndex.generation)
+
+        Returns:
+            Académicos encolados (0 si la cola ya corresponde a esa publicación)
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+            if row is not None and row[0] == generation:
+                return 0
+            conn.execute("DELETE FROM tasks")
+            total = 0
+            batch: List[Tuple[int, str]] = []
+            for academico in academicos:
+                batch.append(academico)
+                if len(batch) >= self.batch_size:
+                    total += self._insert(conn, batch)
+                    batch = []
+            total += self._insert(conn, batch)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)", (generation,))
+        self.logger.info(f"Cola de trabajo llenada con {total} académicos")
+        return total
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, batch: List[Tuple[int, str]]) -> int:
+        conn.executemany("INSERT OR IGNORE INTO tasks (id_persona, nombre_completo) VALUES (?, ?)", batch)
+        return len(batch)
+
+    def claim(self, owner: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Toma hasta limit académicos pendientes o con lease vencido
+
+        Returns:
+            Pares (id_persona, nombre_completo) a nombre de owner por lease_seconds
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT id_persona, nombre_completo, state FROM tasks
+                WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?)
+                ORDER BY id_persona LIMIT ?
+                """,
+                (now, limit)
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE tasks SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1,
+                                 updated_at = ?
+                WHERE id_persona = ?
+                """,
+                [(owner, now + self.lease_seconds, now, row[0]) for row in rows]
+            )
+        expired = sum(1 for row in rows if row[2] == 'leased')
+        if expired:
+            self.logger.warning(f"Se retoman {expired} académicos con lease vencido")
+        return [(id_persona, nombre) for id_persona, nombre, _ in rows]
+
+    def complete(self, owner: str, ids: Iterable[int]) -> None:
+        """Marca académicos como terminados"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET state = 'done', owner = ?, lease_until = NULL, updated_at = ? WHERE id_persona = ?",
+                [(owner, now, id_persona) for id_persona in ids]
+            )
+
+    def renew(self, owner: str) -> int:
+        """Extiende el lease de los académicos tomados por owner; retorna cuántos"""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE state = 'leased' AND owner = ?",
+                (now + self.lease_seconds, owner)
+            ).rowcount
+
+    def release(self, owner: str) -> int:
+        """Devuelve a pendientes los académicos que owner tomó y no terminó; retorna cuántos"""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET state = 'pending', owner = NULL, lease_until = NULL WHERE state = 'leased' AND owner = ?",
+                (owner,)
+            ).rowcount
+
+    def next_expiry(self, owner: str) -> Optional[float]:
+        """Segundos hasta que vence el primer lease de otro worker; None si no hay tomados por otros"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(lease_until) FROM tasks WHERE state = 'leased' AND owner != ?", (owner,)
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def counts(self) -> Dict[str, int]:
+        """Cantidad de académicos por estado (pending, leased, done)"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+    @contextmanager
+    def heartbeat(self, owner: str, interval: float) -> Iterator[None]:
+        """Renueva en un hilo de fondo los leases de owner cada interval segundos mientras dura el bloque"""
+        stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.renew(owner)
+                except sqlite3.Error as e:
+                    self.logger.warning(f"No se pudo renovar el lease de {owner}: {str(e)}")
+
+        thread = threading.Thread(target=run, name='work-queue-heartbeat', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
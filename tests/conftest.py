@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los módulos de src/ se importan sin paquete, igual que en main.py
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -0,0 +1,44 @@
+import csv
+import threading
+from csv_writer import QueuedCsvWriter
+
+
+def test_rows_are_written_and_replace_previous_file(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("anterior\n", encoding='utf-8')
+    with QueuedCsvWriter(path, ['a', 'b'], max_pending=2) as writer:
+        for i in range(10):
+            writer.write_rows([[i, 'ñ'], [i, '%']])
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['a', 'b']
+    assert len(rows) == 21
+    assert writer.rows == 20
+    assert not path.with_suffix('.csv.tmp').exists()
+
+
+def test_writer_error_does_not_block_producer(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("anterior\n", encoding='utf-8')
+    finished = threading.Event()
+
+    def produce():
+        try:
+            with QueuedCsvWriter(path, ['a'], max_pending=1) as writer:
+                # Una fila que no es iterable hace fallar csv.writer (csv.Error) en el hilo escritor
+                writer.write_rows([1])
+                for i in range(50):
+                    try:
+                        writer.write_rows([[i]])
+                    except OSError:
+                        break
+        except OSError:
+            pass
+        finally:
+            finished.set()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    assert finished.wait(5), "el productor quedó bloqueado con la cola llena"
+    assert path.read_text(encoding='utf-8') == "anterior\n"
@@ -0,0 +1,47 @@
+import base64
+import pytest
+import decoder
+from decoder import DecodeError, decode_response, decode_response_reference, encode_response
+
+SAMPLE = {
+    'total_resultado': 3,
+    'academicos': [
+        {'id_persona': 100001, 'nombre_completo': 'José Ñuñoa', 'indice_h': 12.5, 'activo': True,
+         'descripcion': 'Investigación con 100% de dedicación', 'unidades': [1, 2], 'extra': None},
+        {'id_persona': 100002, 'nombre_completo': 'Verónica Müller', 'grande': 123456789012345678901234567890},
+        {'id_persona': 100003, 'nombre_completo': 'Andrés Pérez', 'texto': 'comillas " y barra \\ y %25'},
+    ],
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    if request.param == 'orjson':
+        if decoder.orjson is None:
+            pytest.skip("orjson no está instalado")
+    else:
+        monkeypatch.setattr(decoder, 'orjson', None)
+    return request.param
+
+
+def test_decode_response_matches_reference(backend):
+    encoded = encode_response(SAMPLE)
+    assert decode_response(encoded) == decode_response_reference(encoded) == SAMPLE
+    assert isinstance(decode_response(encoded)['academicos'][1]['grande'], int)
+
+
+def test_invalid_percent_sequence_falls_back_to_reference(backend):
+    # %C3%28 no es UTF-8 válido: la referencia lo reemplaza por U+FFFD en lugar de fallar
+    encoded = base64.b64encode(b'{"texto": "%C3%28"}').decode('ascii')[::-1]
+    assert decode_response(encoded) == decode_response_reference(encoded)
+
+
+@pytest.mark.parametrize('encoded', [
+    encode_response(SAMPLE)[:-40],  # cuerpo truncado
+    'no es base64 !!',
+    encode_response(SAMPLE)[::-1],
+])
+def test_undecodable_body_raises_instead_of_empty_dict(backend, encoded):
+    with pytest.raises(DecodeError):
+        decode_response(encoded)
+    assert decode_response_reference(encoded) == {}
@@ -0,0 +1,47 @@
+import json
+import threading
+from manifest import CrawlManifest
+
+
+def test_concurrent_update_and_save_keeps_file_readable(tmp_path):
+    manifest_file = tmp_path / "manifest.json"
+    manifest = CrawlManifest(manifest_file, save_every=5)
+    errors = []
+
+    def worker(worker_id):
+        try:
+            for i in range(300):
+                manifest.update('publicaciones', f"{worker_id}-{i % 50}", fetched_at=i, hash=f"h{i}")
+                manifest.update('publicaciones', f"{worker_id}-{i % 50}", loaded_hash=f"h{i}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manifest.save()
+
+    assert not errors
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f)['entries']
+    assert len(entries) == 8 * 50
+    reloaded = CrawlManifest(manifest_file)
+    assert reloaded.entries() == manifest.entries()
+    assert reloaded.get('publicaciones', '3-49') == {'fetched_at': 299, 'hash': 'h299', 'loaded_hash': 'h299'}
+    assert not manifest_file.with_suffix('.tmp').exists()
+
+
+def test_worker_manifest_reads_base_and_writes_own(tmp_path):
+    base = CrawlManifest(tmp_path / "base.json")
+    base.update('academicos', 1, fetched_at=1.0, hash='a', loaded_hash='a')
+    worker = CrawlManifest(tmp_path / "worker.json", base=base)
+
+    assert worker.get('academicos', 1)['hash'] == 'a'
+    worker.update('academicos', 1, fetched_at=2.0, hash='b')
+
+    assert worker.get('academicos', 1) == {'fetched_at': 2.0, 'hash': 'b', 'loaded_hash': 'a'}
+    assert base.get('academicos', 1)['hash'] == 'a'
+    assert base.merge(worker.entries()) == 1
+    assert base.get('academicos', 1)['hash'] == 'b'
@@ -0,0 +1,92 @@
+import threading
+from fetch_engine import ConcurrentFetcher
+from pipeline import StageGraph, Stream
+
+
+def test_stream_delivers_items_until_closed():
+    stream = Stream('numeros', maxsize=2)
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(stream))
+    consumer.start()
+    for i in range(100):
+        stream.put(i)
+    stream.close()
+    consumer.join(timeout=5)
+    assert received == list(range(100))
+    assert stream.items == 100
+    # Una segunda lectura del flujo cerrado también termina
+    assert list(stream) == []
+
+
+def test_stream_iter_idle_yields_idle_without_data():
+    stream = Stream('lento')
+    items = stream.iter_idle(0.01)
+    assert next(items) is ConcurrentFetcher.IDLE
+    stream.put('a')
+    stream.close()
+    assert list(items) == ['a']
+
+
+def test_graph_streams_between_stages_and_waits_dependencies():
+    stream = Stream('ids', maxsize=4)
+    order = []
+
+    def produce():
+        for i in range(50):
+            stream.put(i)
+        order.append('produce')
+        return True
+
+    def consume():
+        total = sum(stream)
+        order.append(f'consume:{total}')
+        return True
+
+    def report():
+        order.append('report')
+        return True
+
+    finished = []
+    graph = StageGraph(on_finish=lambda name, success, seconds: finished.append((name, success)))
+    graph.add('produce', produce, outputs=[stream])
+    graph.add('consume', consume, inputs=[stream])
+    graph.add('report', report, after=['produce', 'consume'])
+    assert graph.run()
+    assert order == ['produce', f'consume:{sum(range(50))}', 'report']
+    assert sorted(finished) == [('consume', True), ('produce', True), ('report', True)]
+    assert set(graph.timings) == {'produce', 'consume', 'report'}
+
+
+def test_failed_consumer_does_not_block_producer_and_skips_dependents():
+    stream = Stream('ids', maxsize=1)
+    ran = []
+
+    def consume():
+        next(iter(stream))
+        raise RuntimeError("falla el consumidor")
+
+    def produce():
+        for i in range(1000):
+            stream.put(i)
+        return True
+
+    graph = StageGraph()
+    graph.add('produce', produce, outputs=[stream])
+    graph.add('consume', consume, inputs=[stream])
+    graph.add('load', lambda: ran.append('load') or True, after=['consume'])
+    runner = threading.Thread(target=lambda: ran.append(graph.run()))
+    runner.start()
+    runner.join(timeout=10)
+    assert not runner.is_alive()
+    assert ran == [False]
+    assert graph.results == {'produce': True, 'consume': False, 'load': False}
+
+
+def test_add_rejects_unknown_dependency():
+    graph = StageGraph()
+    try:
+        graph.add('load', lambda: True, after=['fetch'])
+    except ValueError as e:
+        assert 'fetch' in str(e)
+    else:
+        raise AssertionError("se esperaba ValueError")
@@ -0,0 +1,89 @@
+import json
+import logging
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from processed_layer import ProcessedLayerBuilder, flatten_batch, unify_tables
+
+
+class FakeRawStore:
+    """Almacén crudo en memoria con la interfaz que usa ProcessedLayerBuilder"""
+
+    def __init__(self, entities):
+        self.entities = entities
+
+    def iter_ids(self, endpoint):
+        return iter(self.entities[endpoint])
+
+    def read_bytes(self, endpoint, entity_id):
+        return json.dumps(self.entities[endpoint][entity_id]).encode('utf-8')
+
+
+def publicaciones(*records):
+    return {'academicos': [{'publicaciones': list(records)}]}
+
+
+def make_builder(tmp_path, entities, **settings):
+    builder = ProcessedLayerBuilder.__new__(ProcessedLayerBuilder)
+    builder.logger = logging.getLogger('processed_layer')
+    builder.raw_store = FakeRawStore(entities)
+    builder.output_dir = tmp_path
+    builder.workers = 0
+    builder.batch_entities = settings.get('batch_entities', 1)
+    builder.row_group_size = settings.get('row_group_size', 100000)
+    builder.compression = 'zstd'
+    builder.csv_export = settings.get('csv_export', False)
+    builder.rows = {}
+    return builder
+
+
+ENTITIES = {
+    'publicaciones': {
+        1: publicaciones({'anio': 2020, 'titulo': 'a'}, {'anio': 2021, 'titulo': 'b'}),
+        2: publicaciones({'anio': 2022.5, 'autores': [{'nombre': 'x'}]}),
+        3: publicaciones({'anio': 2023, 'titulo': 7, 'extra': None}),
+        4: publicaciones(),
+        5: publicaciones({'anio': 2 ** 70}),
+    },
+    'proyectos': {},
+}
+
+
+def test_flatten_batch_types():
+    table = flatten_batch('publicaciones', [
+        (1, json.dumps(publicaciones({'n': 1, 'f': 1.5, 'b': True, 'o': {'k': 1}, 'm': 'x'},
+                                     {'n': 2, 'f': 2, 'b': None, 'o': None, 'm': 3})).encode()),
+    ])
+    assert table.column_names == ['id_persona', 'n', 'f', 'b', 'o', 'm']
+    assert table.schema.field('n').type == pa.int64()
+    assert table.schema.field('f').type == pa.float64()
+    assert table.schema.field('b').type == pa.bool_()
+    assert table.column('o').to_pylist() == ['{"k": 1}', None]
+    assert table.column('m').to_pylist() == ['x', '3']
+
+
+def test_build_streams_batches_into_unified_parquet(tmp_path):
+    builder = make_builder(tmp_path, ENTITIES, row_group_size=2, csv_export=True)
+    expected = unify_tables([
+        flatten_batch('publicaciones', [(i, builder.raw_store.read_bytes('publicaciones', i))])
+        for i in ENTITIES['publicaciones']
+    ])
+
+    assert builder.build('publicaciones') == 5
+    table = pq.read_table(tmp_path / 'publicaciones.parquet')
+    assert table.equals(expected)
+    assert table.schema.field('anio').type == pa.string()
+    assert table.schema.field('titulo').type == pa.string()
+    assert pq.ParquetFile(tmp_path / 'publicaciones.parquet').metadata.num_row_groups == 3
+    assert pa_csv.read_csv(tmp_path / 'todas_las_publicaciones.csv').num_rows == 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['publicaciones.parquet', 'todas_las_publicaciones.csv']
+
+
+def test_build_without_records_writes_empty_table(tmp_path):
+    builder = make_builder(tmp_path, ENTITIES)
+    assert builder.build('proyectos') == 0
+    table = pq.read_table(tmp_path / 'proyectos.parquet')
+    assert table.column_names == ['id_persona']
+    assert table.num_rows == 0
@@ -0,0 +1,32 @@
+import logging
+import socket
+import threading
+from profiler import SamplingProfiler
+
+DECODE = ('/repo/src/decoder.py', 10, 'decode_response')
+READ = (socket.__file__, 690, 'readinto')
+COND_WAIT = (threading.__file__, 290, 'wait')
+LOG_LOCK = (logging.__file__, 920, 'acquire')
+RATE_LIMIT = ('/repo/src/rate_limiter.py', 25, 'acquire')
+FETCH = ('/repo/src/api_client.py', 200, 'fetch')
+
+
+def test_blocked_leaves_are_wait_and_the_rest_cpu():
+    assert SamplingProfiler.is_wait(READ)
+    assert SamplingProfiler.is_wait(COND_WAIT)
+    assert SamplingProfiler.is_wait(LOG_LOCK)
+    assert SamplingProfiler.is_wait(RATE_LIMIT)
+    assert not SamplingProfiler.is_wait(DECODE)
+    assert not SamplingProfiler.is_wait(('/repo/src/segment_store.py', 1, 'wait'))
+
+
+def test_top_reports_cpu_and_wait_separately():
+    sampler = SamplingProfiler()
+    sampler.stacks.update({(FETCH, READ): 6, (FETCH, DECODE): 3, (FETCH, RATE_LIMIT): 1})
+    sampler.samples = 10
+
+    cpu, wait, cumulative = sampler.top(5)
+    assert cpu == [(DECODE, 3)]
+    assert wait == [(READ, 6), (RATE_LIMIT, 1)]
+    assert cumulative[0] == (FETCH, 10)
+    assert sampler.split() == (3, 7)
@@ -0,0 +1,110 @@
+import os
+import zlib
+from segment_store import SegmentStore
+
+
+def payload(i, version=0):
+    return f'{{"id": {i}, "version": {version}, "data": "{"x" * (i % 50)}"}}'.encode('utf-8')
+
+
+def make_store(path, segment_size=4096):
+    store = SegmentStore(path)
+    # Segmentos chicos para que el almacén use varios archivos
+    store.segment_size = segment_size
+    return store
+
+
+def test_write_read_round_trip(tmp_path):
+    store = make_store(tmp_path / "segments")
+    for i in range(200):
+        store.put(f"publicaciones:{i}", payload(i))
+
+    assert len(store) == 200
+    assert len(store._segments()) > 1
+    assert store.contains("publicaciones:7")
+    assert not store.contains("publicaciones:999")
+    assert store.get("publicaciones:999") is None
+    for i in range(200):
+        key = f"publicaciones:{i}"
+        assert store.get(key) == payload(i)
+        assert zlib.decompress(store.get_compressed(key)) == payload(i)
+        with store.open(key) as stream:
+            assert stream.read() == payload(i)
+    assert store.keys("publicaciones:1")[:2] == ["publicaciones:1", "publicaciones:10"]
+    assert dict(store.scan()) == {f"publicaciones:{i}": payload(i) for i in range(200)}
+    store.close()
+
+
+def test_reopen_with_saved_index_and_rebuilt_index(tmp_path):
+    directory = tmp_path / "segments"
+    store = make_store(directory)
+    for i in range(100):
+        store.put(f"proyectos:{i}", payload(i))
+    store.save()
+    store.close()
+
+    reopened = SegmentStore(directory)
+    assert len(reopened) == 100
+    assert reopened.get("proyectos:42") == payload(42)
+    reopened.close()
+
+    # Sin index.json el índice se reconstruye recorriendo los segmentos
+    os.remove(directory / SegmentStore.INDEX_FILE)
+    rebuilt = SegmentStore(directory)
+    assert {key: rebuilt.get(key) for key in rebuilt.keys()} == {f"proyectos:{i}": payload(i) for i in range(100)}
+    rebuilt.close()
+
+
+def test_truncated_record_is_discarded_on_rebuild(tmp_path):
+    directory = tmp_path / "segments"
+    store = SegmentStore(directory)
+    store.put("a:1", payload(1))
+    store.put("a:2", payload(2))
+    store.close()
+    segment = directory / "segment-00000.seg"
+    with open(segment, 'r+b') as f:
+        f.truncate(segment.stat().st_size - 3)
+
+    reopened = SegmentStore(directory)
+    assert reopened.keys() == ["a:1"]
+    assert reopened.get("a:1") == payload(1)
+    reopened.close()
+
+
+def test_compact_keeps_latest_versions_only(tmp_path):
+    directory = tmp_path / "segments"
+    store = make_store(directory)
+    for version in range(3):
+        for i in range(100):
+            store.put(f"publicaciones:{i}", payload(i, version))
+
+    before, after = store.compact()
+    assert after < before
+    assert len(store) == 100
+    for i in range(100):
+        assert store.get(f"publicaciones:{i}") == payload(i, 2)
+    assert not directory.with_name(directory.name + '.compact').exists()
+
+    # Lo compactado sobrevive a reabrir el almacén y admite nuevas escrituras
+    store.put("publicaciones:100", payload(100))
+    store.save()
+    store.close()
+    reopened = SegmentStore(directory)
+    assert len(reopened) == 101
+    assert reopened.get("publicaciones:5") == payload(5, 2)
+    assert reopened.get("publicaciones:100") == payload(100)
+    reopened.close()
+
+
+def test_merge_copies_worker_records(tmp_path):
+    main = SegmentStore(tmp_path / "main")
+    worker = SegmentStore(tmp_path / "worker")
+    main.put("tesis:1", payload(1))
+    worker.put("tesis:1", payload(1, 1))
+    worker.put("tesis:2", payload(2))
+
+    assert main.merge(worker) == 2
+    assert main.get("tesis:1") == payload(1, 1)
+    assert main.get("tesis:2") == payload(2)
+    main.close()
+    worker.close()
@@ -0,0 +1,98 @@
+import pytest
+import work_queue
+from work_queue import WorkQueue, shard_of
+
+ACADEMICOS = [(i, f"Académico {i}") for i in range(1, 11)]
+
+
+class Clock:
+    """Reloj controlado por la prueba en lugar de time.time"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def queues(tmp_path):
+    # Dos workers con su propia conexión al mismo archivo, como dos procesos de --queue
+    db_file = tmp_path / "work_queue.sqlite"
+    first = WorkQueue(db_file, lease_seconds=60, batch_size=3)
+    second = WorkQueue(db_file, lease_seconds=60, batch_size=3)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_fill_once_per_generation(queues):
+    first, second = queues
+    assert first.fill(ACADEMICOS, 'g1') == 10
+    assert second.fill(ACADEMICOS, 'g1') == 0
+    assert second.counts() == {'pending': 10}
+    assert second.fill(ACADEMICOS[:4], 'g2') == 4
+    assert first.counts() == {'pending': 4}
+
+
+def test_claims_do_not_overlap(queues, clock):
+    first, second = queues
+    first.fill(ACADEMICOS, 'g1')
+    a = first.claim('a', 4)
+    b = second.claim('b', 4)
+    assert [i for i, _ in a] == [1, 2, 3, 4]
+    assert [i for i, _ in b] == [5, 6, 7, 8]
+    first.complete('a', [i for i, _ in a])
+    assert first.counts() == {'done': 4, 'leased': 4, 'pending': 2}
+
+
+def test_expired_lease_is_reclaimed(queues, clock):
+    first, second = queues
+    first.fill(ACADEMICOS, 'g1')
+    claimed = first.claim('a', 3)
+    assert second.claim('b', 10) == ACADEMICOS[3:]
+    assert second.claim('b', 10) == []
+    assert second.next_expiry('b') == 60
+
+    # El worker a muere: no renueva ni completa, y su lease vence; b sigue renovando el suyo
+    clock.now += 50
+    assert second.renew('b') == 7
+    clock.now += 11
+    assert second.next_expiry('b') == 0
+    assert second.claim('b', 10) == claimed
+    second.complete('b', [i for i, _ in ACADEMICOS])
+    assert first.counts() == {'done': 10}
+    attempts = dict(first._conn.execute("SELECT id_persona, attempts FROM tasks").fetchall())
+    assert attempts[1] == 2 and attempts[4] == 1
+
+
+def test_renewed_lease_is_not_reclaimed(queues, clock):
+    first, second = queues
+    first.fill(ACADEMICOS, 'g1')
+    first.claim('a', 3)
+    clock.now += 50
+    assert first.renew('a') == 3
+    clock.now += 50
+    assert [i for i, _ in second.claim('b', 10)] == list(range(4, 11))
+
+
+def test_release_returns_unfinished_work(queues, clock):
+    first, second = queues
+    first.fill(ACADEMICOS, 'g1')
+    claimed = first.claim('a', 5)
+    first.complete('a', [claimed[0][0]])
+    assert first.release('a') == 4
+    assert second.claim('b', 4) == claimed[1:]
+
+
+def test_shard_of_is_stable_partition():
+    shards = [shard_of(i, 4) for i in range(1000)]
+    assert set(shards) == {0, 1, 2, 3}
+    assert shards == [shard_of(i, 4) for i in range(1000)]